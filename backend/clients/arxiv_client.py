@@ -5,15 +5,240 @@ arXiv 客户端
 负责与 arXiv 服务的网络交互，包括 PDF 下载等
 """
 
+import datetime as dt
 import os
+import re
 import tempfile
 import requests
 import time
-from typing import Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
 
+import pytz
+
+from backend.clients import rate_limiter
+from backend.clients.feed_cache import cached_get, fetched_at, is_fresh
 from backend.utils.pdf_parser import extract_arxiv_id_from_url
 
 
+# arXiv 导出 API：单页最多 2000 条，start + max_results 超过 30000 的结果无法获取
+ARXIV_API_MAX_PAGE_SIZE = 2000
+ARXIV_API_RESULT_CAP = 30000
+ARXIV_PAGE_SIZE = int(os.getenv("ARXIV_PAGE_SIZE", "500"))
+ARXIV_MAX_CONCURRENCY = int(os.getenv("ARXIV_MAX_CONCURRENCY", "3"))
+# 多分类导入：单个 OR 查询最多合并的分类数（控制 URL 长度）
+ARXIV_QUERY_MAX_CATEGORIES = int(os.getenv("ARXIV_QUERY_MAX_CATEGORIES", "10"))
+
+_TOTAL_RESULTS_RE = re.compile(rb"<opensearch:totalResults[^>]*>\s*(\d+)\s*<")
+
+
+def arxiv_api_base() -> str:
+    return os.getenv("ARXIV_API_BASE", "https://export.arxiv.org/api/query")
+
+
+def compute_announcement_window(target_date: dt.date) -> Tuple[dt.datetime, dt.datetime, dt.datetime, dt.datetime]:
+    """计算目标日期对应的提交窗口：前一日 20:00 ET ~ 当日 20:00 ET。
+
+    Returns:
+        (start_et, end_et, start_utc, end_utc)
+    """
+    et_tz = pytz.timezone("US/Eastern")
+    start_et = et_tz.localize(dt.datetime.combine(target_date - dt.timedelta(days=1), dt.time(20, 0)))
+    end_et = et_tz.localize(dt.datetime.combine(target_date, dt.time(20, 0)))
+    return start_et, end_et, start_et.astimezone(dt.timezone.utc), end_et.astimezone(dt.timezone.utc)
+
+
+def next_announcement_after(moment_utc: dt.datetime) -> dt.datetime:
+    """moment_utc 之后的下一次 arXiv 公告时间（UTC）：周日至周四 20:00 ET。
+
+    窗口末尾（14:00 ET 截止之后）的提交要到下一次公告才出现在 API 中，
+    周五、周六的窗口则要等到周日晚间。节假日停更不在此考虑。
+    """
+    et_tz = pytz.timezone("US/Eastern")
+    moment_et = moment_utc.astimezone(et_tz)
+    day = moment_et.date()
+    while True:
+        # weekday: 周一=0 … 周四=3，周日=6
+        if day.weekday() in (6, 0, 1, 2, 3):
+            announce_et = et_tz.localize(dt.datetime.combine(day, dt.time(20, 0)))
+            if announce_et > moment_et:
+                return announce_et.astimezone(dt.timezone.utc)
+        day += dt.timedelta(days=1)
+
+
+def configured_categories() -> List[str]:
+    """需要每日导入的分类列表（环境变量 ARXIV_CATEGORIES，逗号分隔）。"""
+    raw = os.getenv("ARXIV_CATEGORIES", "cs.CV,cs.LG,cs.AI")
+    return [c.strip() for c in raw.split(",") if c.strip()]
+
+
+def build_submitted_date_query(
+    category: Union[str, Sequence[str]], start_utc: dt.datetime, end_utc: dt.datetime
+) -> str:
+    """构造 `cat:<category> AND submittedDate:[start TO end]` 查询（已按 arXiv 习惯用 + 连接）。
+
+    传入多个分类时生成 `(cat:a OR cat:b) AND submittedDate:[...]`。
+    """
+    start_str = start_utc.strftime("%Y%m%d%H%M%S")
+    end_str = end_utc.strftime("%Y%m%d%H%M%S")
+    if isinstance(category, str):
+        cat_clause = f"cat:{category}"
+    elif len(category) == 1:
+        cat_clause = f"cat:{category[0]}"
+    else:
+        cat_clause = "%28" + "+OR+".join(f"cat:{c}" for c in category) + "%29"
+    return f"{cat_clause}+AND+submittedDate:[{start_str}+TO+{end_str}]"
+
+
+def build_multi_category_queries(
+    categories: Sequence[str], start_utc: dt.datetime, end_utc: dt.datetime
+) -> List[str]:
+    """把多个分类合并成尽量少的 OR 查询（每个查询最多 ARXIV_QUERY_MAX_CATEGORIES 个分类）。"""
+    uniq = list(dict.fromkeys(c for c in categories if c))
+    size = max(1, ARXIV_QUERY_MAX_CATEGORIES)
+    return [
+        build_submitted_date_query(uniq[i:i + size], start_utc, end_utc)
+        for i in range(0, len(uniq), size)
+    ]
+
+
+def build_query_url(search_query: str, start: int = 0, max_results: int = ARXIV_API_MAX_PAGE_SIZE) -> str:
+    return (
+        f"{arxiv_api_base()}?"
+        f"search_query={search_query}&"
+        "sortBy=submittedDate&sortOrder=descending&"
+        f"start={start}&max_results={max_results}"
+    )
+
+
+def parse_total_results(body: bytes) -> Optional[int]:
+    """从 feed 头部读取 opensearch:totalResults（出现在所有 entry 之前）。"""
+    m = _TOTAL_RESULTS_RE.search(body[:8192])
+    return int(m.group(1)) if m else None
+
+
+def count_feed_entries(body: bytes) -> int:
+    return body.count(b"<entry>") + body.count(b"<entry ")
+
+
+def set_export_rate(requests_per_second: Optional[float], burst: Optional[int] = None) -> None:
+    """设置进程内 arXiv 导出 API 请求的全局速率上限（None 或 <=0 表示不限速）。"""
+    rate_limiter.configure(rate_limiter.EXPORT_BUCKET, requests_per_second, burst)
+
+
+def fetch_query_page(
+    search_query: str,
+    start: int,
+    max_results: int,
+    timeout: float = 30,
+    refresh: bool = False,
+    not_before: Optional[float] = None,
+) -> bytes:
+    """获取查询结果的一页原始 XML（经过磁盘 feed 缓存，refresh=True 时绕过新鲜期，
+    not_before 给定时不使用更早抓取的缓存）。"""
+    return cached_get(
+        build_query_url(search_query, start, max_results),
+        timeout=timeout,
+        refresh=refresh,
+        rate_bucket=rate_limiter.EXPORT_BUCKET,
+        not_before=not_before,
+    )
+
+
+class ArxivQueryPages:
+    """
+    按 start/max_results 分页遍历一个 arXiv 查询
+
+    先取第一页得到 totalResults，再在并发预算内并行获取其余页面，
+    按页序依次产出每页的原始 XML。遍历结束后可通过 truncated 判断是否有结果缺失。
+
+    整个查询使用同一时刻的快照：第一页来自缓存时要求其余页都有不早于它的新鲜缓存，
+    否则第一页也重新抓取；其余页只使用不早于第一页抓取时间的缓存。
+    """
+
+    def __init__(
+        self,
+        search_query: str,
+        page_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: float = 30,
+    ):
+        self.search_query = search_query
+        self.page_size = max(1, min(page_size or ARXIV_PAGE_SIZE, ARXIV_API_MAX_PAGE_SIZE))
+        self.max_concurrency = max(1, max_concurrency or ARXIV_MAX_CONCURRENCY)
+        self.timeout = timeout
+        self.total_results: Optional[int] = None
+        self.received = 0
+        self.pages = 0
+        self.snapshot_at: Optional[float] = None
+
+    @property
+    def first_page_url(self) -> str:
+        return build_query_url(self.search_query, 0, self.page_size)
+
+    @property
+    def truncated(self) -> bool:
+        return self.total_results is not None and self.received < self.total_results
+
+    def _fetch(self, start: int) -> bytes:
+        body = fetch_query_page(self.search_query, start, self.page_size, self.timeout, not_before=self.snapshot_at)
+        # arXiv 偶尔对中间页返回空结果，重试一次
+        if count_feed_entries(body) == 0 and self.total_results and start < self.total_results:
+            print(f"[arXiv分页] start={start} 返回空页，重试一次")
+            body = fetch_query_page(self.search_query, start, self.page_size, self.timeout, refresh=True)
+        return body
+
+    def _accept(self, body: bytes) -> bytes:
+        self.pages += 1
+        self.received += count_feed_entries(body)
+        return body
+
+    def _later_starts(self) -> List[int]:
+        if self.total_results is None or self.total_results <= self.page_size:
+            return []
+        reachable = min(self.total_results, ARXIV_API_RESULT_CAP)
+        return list(range(self.page_size, reachable, self.page_size))
+
+    def __iter__(self) -> Iterator[bytes]:
+        requested_at = time.time()
+        first = fetch_query_page(self.search_query, 0, self.page_size, self.timeout)
+        self.snapshot_at = fetched_at(self.first_page_url)
+        self.total_results = parse_total_results(first)
+        if self.snapshot_at is not None and self.snapshot_at < requested_at and not all(
+            is_fresh(build_query_url(self.search_query, s, self.page_size), not_before=self.snapshot_at)
+            for s in self._later_starts()
+        ):
+            # 第一页命中缓存但其余页缓存不全：重新抓取第一页，其余页随之全部重新抓取
+            first = fetch_query_page(self.search_query, 0, self.page_size, self.timeout, refresh=True)
+            self.snapshot_at = fetched_at(self.first_page_url)
+            self.total_results = parse_total_results(first)
+        yield self._accept(first)
+
+        starts = self._later_starts()
+        if not starts:
+            return
+        print(f"[arXiv分页] 共 {self.total_results} 条，分 {len(starts) + 1} 页，并发 {self.max_concurrency}")
+
+        # 滑动窗口：最多同时缓冲 max_concurrency 页，按页序产出
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            pending = [executor.submit(self._fetch, s) for s in starts[:self.max_concurrency]]
+            next_idx = len(pending)
+            try:
+                while pending:
+                    body = pending.pop(0).result()
+                    if next_idx < len(starts):
+                        pending.append(executor.submit(self._fetch, starts[next_idx]))
+                        next_idx += 1
+                    yield self._accept(body)
+            finally:
+                for f in pending:
+                    f.cancel()
+
+    def report(self) -> None:
+        if self.truncated:
+            print(f"⚠️  [arXiv分页] 结果不完整：totalResults={self.total_results}，实际收到 {self.received} 条")
+
+
 def download_arxiv_pdf(arxiv_url: str, *, as_bytes: bool = True) -> Union[bytes, str]:
     """
     从 arXiv URL 下载 PDF 文件（高度优化性能）
@@ -46,21 +271,14 @@ def download_arxiv_pdf(arxiv_url: str, *, as_bytes: bool = True) -> Union[bytes,
     with requests.Session() as session:
         session.headers.update(headers)
         
-        # 1. 先HEAD请求检查文件大小，用于日志记录
-        try:
-            head_response = session.head(pdf_url, timeout=5)
-            content_length = head_response.headers.get('content-length')
-            if content_length:
-                size_mb = int(content_length) / (1024 * 1024)
-                print(f"[PDF下载] 预检文件大小: {size_mb:.1f}MB")
-        except Exception as e:
-            print(f"[PDF下载] ⚠️  预检失败，继续下载: {e}")
-        
-        # 2. 流式下载，设置较短超时
-        response = session.get(pdf_url, timeout=10, stream=True)  # 进一步缩短超时
+        # 1. 经 PDF 限速桶流式下载，设置较短超时（文件大小直接取响应头，不再单独发 HEAD 预检）
+        response = rate_limiter.limited_get(rate_limiter.PDF_BUCKET, pdf_url, session=session, timeout=10, stream=True)
         response.raise_for_status()
+        content_length = response.headers.get('content-length')
+        if content_length and content_length.isdigit():
+            print(f"[PDF下载] 文件大小: {int(content_length) / (1024 * 1024):.1f}MB")
         
-        # 3. 分块下载（无大小限制）
+        # 2. 分块下载（无大小限制）
         downloaded_bytes = 0
         temp_path = None
         
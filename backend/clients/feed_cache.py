@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+arXiv feed 响应缓存
+
+以规范化后的查询 URL 为键，把响应体 gzip 压缩后写入磁盘，并记录 ETag / Last-Modified：
+- 新鲜期（TTL）内直接返回磁盘上的响应，不发网络请求
+- 过期后发起条件请求，304 时沿用缓存并刷新时间戳
+- 分页查询的后续页可指定 not_before（首页的抓取时间），早于首页抓取的缓存视为过期，
+  避免新旧页面混用导致 start 偏移错位（结果按提交时间倒序，新提交会把旧结果往后挤）
+缓存目录可被多个进程共享（写入使用原子替换，同一键的抓取用文件锁串行化）。
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from backend.clients import rate_limiter
+
+try:
+    import fcntl
+except ImportError:  # Windows：只做进程内串行化
+    fcntl = None
+
+
+FEED_CACHE_ENABLED = os.getenv("ARXIV_FEED_CACHE", "true").lower() == "true"
+FEED_CACHE_DIR = os.getenv(
+    "ARXIV_FEED_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "arxiv-accelerator-feed-cache"),
+)
+FEED_CACHE_TTL = int(os.getenv("ARXIV_FEED_CACHE_TTL", "600"))  # 10分钟
+
+_key_locks: Dict[str, threading.Lock] = {}
+_key_locks_guard = threading.Lock()
+
+
+def normalize_url(url: str) -> str:
+    """规范化查询 URL：协议/主机小写、去掉默认端口、查询参数排序。"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "https" and netloc.endswith(":443")) or (scheme == "http" and netloc.endswith(":80")):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def cache_key(url: str) -> str:
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+def _paths(key: str) -> Dict[str, str]:
+    base = os.path.join(FEED_CACHE_DIR, key[:2], key)
+    return {"body": base + ".xml.gz", "meta": base + ".json", "lock": base + ".lock"}
+
+
+@contextmanager
+def _locked(key: str) -> Iterator[None]:
+    with _key_locks_guard:
+        lock = _key_locks.setdefault(key, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        lock_path = _paths(key)["lock"]
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        with open(lock_path, "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_meta(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_paths(key)["meta"], "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(key: str, meta: Dict[str, Any]) -> None:
+    _atomic_write(_paths(key)["meta"], json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+
+def _read_body(key: str) -> Optional[bytes]:
+    try:
+        with gzip.open(_paths(key)["body"], "rb") as fh:
+            return fh.read()
+    except (OSError, EOFError):
+        return None
+
+
+def _store(key: str, url: str, body: bytes, headers: Any) -> None:
+    # 先写响应体再写元数据：元数据存在即意味着响应体完整
+    _atomic_write(_paths(key)["body"], gzip.compress(body, compresslevel=6))
+    _write_meta(key, {
+        "url": normalize_url(url),
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+        "size": len(body),
+    })
+
+
+def _get(url: str, timeout: float, rate_bucket: Optional[str], headers: Optional[Dict[str, str]] = None) -> requests.Response:
+    if rate_bucket:
+        return rate_limiter.limited_get(rate_bucket, url, headers=headers, timeout=timeout)
+    return requests.get(url, headers=headers, timeout=timeout)
+
+
+def cached_get(
+    url: str,
+    timeout: float = 30,
+    ttl: Optional[int] = None,
+    refresh: bool = False,
+    rate_bucket: Optional[str] = None,
+    not_before: Optional[float] = None,
+) -> bytes:
+    """
+    带磁盘缓存的 GET，返回响应体
+
+    Args:
+        url: 请求地址
+        timeout: 网络请求超时（秒）
+        ttl: 新鲜期（秒），默认 ARXIV_FEED_CACHE_TTL
+        refresh: 为 True 时跳过新鲜期检查并发起非条件请求（用于怀疑缓存内容有误时）
+        rate_bucket: 网络请求经过的限速桶（见 rate_limiter），缓存命中不占用令牌
+        not_before: 只接受该时间戳（time.time()）之后抓取的缓存，更早的按过期处理
+
+    Raises:
+        requests.HTTPError: 请求失败且无法使用缓存时
+    """
+    if not FEED_CACHE_ENABLED:
+        resp = _get(url, timeout, rate_bucket)
+        resp.raise_for_status()
+        return resp.content
+
+    ttl = FEED_CACHE_TTL if ttl is None else ttl
+    key = cache_key(url)
+    with _locked(key):
+        meta = None if refresh else _read_meta(key)
+        fetched = meta.get("fetched_at", 0) if meta else 0
+        if meta and time.time() - fetched < ttl and (not_before is None or fetched >= not_before):
+            body = _read_body(key)
+            if body is not None:
+                print(f"[feed缓存] 命中 key={key[:12]} size={len(body)}")
+                return body
+            meta = None
+
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        resp = _get(url, timeout, rate_bucket, headers)
+        if resp.status_code == 304 and meta:
+            body = _read_body(key)
+            if body is not None:
+                meta["fetched_at"] = time.time()
+                _write_meta(key, meta)
+                print(f"[feed缓存] 304 未变化 key={key[:12]}")
+                return body
+            resp = _get(url, timeout, rate_bucket)
+
+        resp.raise_for_status()
+        body = resp.content
+        try:
+            _store(key, url, body, resp.headers)
+        except OSError as e:
+            print(f"[feed缓存] ⚠️  写入缓存失败: {e}")
+        return body
+
+
+def fetched_at(url: str) -> Optional[float]:
+    """url 对应缓存条目的抓取时间戳；缓存关闭或不存在时返回 None。"""
+    if not FEED_CACHE_ENABLED:
+        return None
+    meta = _read_meta(cache_key(url))
+    return meta.get("fetched_at") if meta else None
+
+
+def is_fresh(url: str, ttl: Optional[int] = None, not_before: Optional[float] = None) -> bool:
+    """url 是否有可直接使用的缓存（在新鲜期内，且不早于 not_before 抓取）。"""
+    fetched = fetched_at(url)
+    if fetched is None:
+        return False
+    ttl = FEED_CACHE_TTL if ttl is None else ttl
+    return time.time() - fetched < ttl and (not_before is None or fetched >= not_before)
+
+
+def clear_feed_cache(max_age: Optional[float] = None) -> int:
+    """删除缓存文件；max_age 给定时只删除早于该秒数的条目。返回删除的条目数。"""
+    removed = 0
+    if not os.path.isdir(FEED_CACHE_DIR):
+        return 0
+    now = time.time()
+    for dirpath, _, filenames in os.walk(FEED_CACHE_DIR):
+        for name in filenames:
+            if not name.endswith(".json"):
+                continue
+            key = name[:-len(".json")]
+            meta = _read_meta(key) or {}
+            if max_age is not None and now - meta.get("fetched_at", 0) < max_age:
+                continue
+            for path in _paths(key).values():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            removed += 1
+    return removed
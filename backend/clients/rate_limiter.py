@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+arXiv 请求全局限速器
+
+进程内共享的令牌桶，按主机类型分桶（export API / PDF），所有访问 arXiv 的请求
+在发出前取令牌；遇到 429/503 时遵循 Retry-After 暂停整个桶。
+令牌按到达顺序分配（GCRA 虚拟排程），等待中的请求数可通过 snapshot() 查看。
+"""
+
+import datetime as dt
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+
+
+EXPORT_BUCKET = "export"
+PDF_BUCKET = "pdf"
+
+_DEFAULTS = {
+    # arXiv 要求导出 API 不超过每 3 秒 1 次；允许少量突发以便分页并发
+    EXPORT_BUCKET: (float(os.getenv("ARXIV_EXPORT_RATE", str(1 / 3))), int(os.getenv("ARXIV_EXPORT_BURST", "3"))),
+    PDF_BUCKET: (float(os.getenv("ARXIV_PDF_RATE", "2")), int(os.getenv("ARXIV_PDF_BURST", "5"))),
+}
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("ARXIV_RATE_LIMIT_RETRIES", "3"))
+RETRY_AFTER_DEFAULT = 10.0   # 429/503 未给出 Retry-After 时的暂停秒数
+RETRY_AFTER_MAX = 300.0
+
+
+class TokenBucket:
+    """令牌桶（rate 个/秒，容量 burst），rate <= 0 表示不限速。"""
+
+    def __init__(self, name: str, rate: float, burst: int = 1):
+        self.name = name
+        self._lock = threading.Lock()
+        self.configure(rate, burst)
+        self._tat = 0.0              # 理论到达时间（GCRA）
+        self._blocked_until = 0.0    # Retry-After 暂停截止时间
+        self.waiting = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+
+    def configure(self, rate: float, burst: Optional[int] = None) -> None:
+        with self._lock:
+            self.rate = rate if rate and rate > 0 else 0.0
+            if burst is not None:
+                self.burst = max(1, int(burst))
+
+    def acquire(self) -> float:
+        """阻塞直到拿到令牌，返回等待秒数。"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._blocked_until)
+            if self.rate > 0:
+                interval = 1.0 / self.rate
+                tat = max(self._tat, start)
+                allowed_at = max(start, tat - (self.burst - 1) * interval)
+                self._tat = tat + interval
+            else:
+                allowed_at = start
+            wait = allowed_at - now
+            self.acquired += 1
+            if wait > 0:
+                self.waiting += 1
+        if wait <= 0:
+            return 0.0
+        try:
+            time.sleep(wait)
+            # 排队期间收到 Retry-After 时继续等待
+            while True:
+                with self._lock:
+                    extra = self._blocked_until - time.monotonic()
+                if extra <= 0:
+                    break
+                time.sleep(extra)
+                wait += extra
+        finally:
+            with self._lock:
+                self.waiting -= 1
+                self.total_wait += wait
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """暂停整个桶 seconds 秒（用于 Retry-After）。"""
+        with self._lock:
+            until = time.monotonic() + max(0.0, seconds)
+            if until > self._blocked_until:
+                self._blocked_until = until
+                self._tat = max(self._tat, until)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "burst": self.burst,
+                "waiting": self.waiting,
+                "paused_for": round(max(0.0, self._blocked_until - time.monotonic()), 1),
+                "acquired": self.acquired,
+                "avg_wait": round(self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+            }
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(name: str) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            rate, burst = _DEFAULTS.get(name, (0.0, 1))
+            bucket = _buckets[name] = TokenBucket(name, rate, burst)
+        return bucket
+
+
+def configure(name: str, rate: Optional[float], burst: Optional[int] = None) -> None:
+    """调整某个桶的速率（次/秒）与容量；rate 为 None 或 <=0 表示不限速。"""
+    get_bucket(name).configure(rate or 0.0, burst)
+
+
+def acquire(name: str) -> float:
+    return get_bucket(name).acquire()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After（秒数或 HTTP 日期）。"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (when - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+def observe(name: str, status_code: int, headers: Any) -> Optional[float]:
+    """根据响应状态更新桶：429/503 时按 Retry-After 暂停，返回暂停秒数。"""
+    if status_code not in (429, 503):
+        return None
+    seconds = parse_retry_after(headers.get("Retry-After") if headers is not None else None)
+    seconds = min(RETRY_AFTER_MAX, RETRY_AFTER_DEFAULT if seconds is None else seconds)
+    get_bucket(name).pause(seconds)
+    print(f"⏳ [限速] {name} 收到 {status_code}，暂停 {seconds:.0f}s")
+    return seconds
+
+
+def limited_request(
+    name: str,
+    method: str,
+    url: str,
+    session: Optional[requests.Session] = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """经限速器发出请求；429/503 时遵循 Retry-After 自动重试（最多 ARXIV_RATE_LIMIT_RETRIES 次）。"""
+    client = session or requests
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        acquire(name)
+        resp = client.request(method, url, **kwargs)
+        if observe(name, resp.status_code, resp.headers) is None or attempt == RATE_LIMIT_MAX_RETRIES:
+            return resp
+        resp.close()
+    return resp
+
+
+def limited_get(name: str, url: str, session: Optional[requests.Session] = None, **kwargs: Any) -> requests.Response:
+    return limited_request(name, "GET", url, session=session, **kwargs)
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """各桶当前状态（含排队中的请求数），用于健康检查。"""
+    for name in _DEFAULTS:
+        get_bucket(name)
+    with _buckets_lock:
+        buckets = list(_buckets.items())
+    return {name: bucket.snapshot() for name, bucket in buckets}
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+PostgREST 批量写入引擎
+
+repo 中的批量 upsert 共用：按行序列化后的字节数切块，块大小随观测延迟自适应
+（够快则加性增大，慢或超时则减半），同时最多提交 BULK_WRITE_CONCURRENCY 个块。
+
+失败处理分三类：
+- 连接重置/网关错误等瞬时错误：同一块指数退避重试，重试用尽后抛出（整体不可用，不再拆分）；
+- 请求体过大/语句超时：块对半拆开重提，并缩小后续块的字节预算；
+- 行数据错误（SQLSTATE 22xxx / 23xxx，如非空、类型、约束冲突）：块对半拆分直到单行，跳过每个出错的行并记录；
+- 其他错误（冲突目标不存在、缺列、权限/RLS 等 schema 或认证问题）：直接抛出，不拆分。
+
+调用方（repo 批量函数）在有行被跳过时抛 BulkWriteError，携带跳过的行（含被触发器静默跳过的行）与已写入部分的结果，供上层计入 errors。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+BULK_WRITE_CHUNK_BYTES = int(os.getenv("BULK_WRITE_CHUNK_BYTES", str(512 * 1024)))
+BULK_WRITE_MAX_CHUNK_BYTES = int(os.getenv("BULK_WRITE_MAX_CHUNK_BYTES", str(2 * 1024 * 1024)))
+BULK_WRITE_MAX_ROWS = int(os.getenv("BULK_WRITE_MAX_ROWS", "1000"))
+BULK_WRITE_TARGET_SECONDS = float(os.getenv("BULK_WRITE_TARGET_SECONDS", "3"))
+BULK_WRITE_CONCURRENCY = int(os.getenv("BULK_WRITE_CONCURRENCY", "4"))
+BULK_WRITE_RETRIES = int(os.getenv("BULK_WRITE_RETRIES", "3"))
+
+_MIN_CHUNK_BYTES = 16 * 1024
+
+_TRANSIENT_MARKERS = (
+    "connection reset", "server disconnected", "connection refused", "remoteprotocolerror",
+    "connecterror", "readerror", "writeerror", "pooltimeout",
+    "bad gateway", "service unavailable", "gateway timeout",
+)
+_TOO_LARGE_MARKERS = (
+    "payload too large", "request entity too large",
+    "57014", "statement timeout", "readtimeout", "writetimeout", "timed out",
+)
+# HTTP 状态码按整词匹配，避免误中 SQLSTATE（如 23502）
+_TRANSIENT_STATUS_RE = re.compile(r"\b50[234]\b")
+_TOO_LARGE_STATUS_RE = re.compile(r"\b413\b")
+_SQLSTATE_RE = re.compile(r"'code':\s*'([0-9A-Z]{5})'")
+# 22xxx 数据异常 / 23xxx 完整性约束：只与个别行有关，值得拆分定位
+_ROW_DATA_SQLSTATE_RE = re.compile(r"^2[23][0-9A-Z]{3}$")
+
+
+class BulkWriteError(RuntimeError):
+    """批量写入完成但有行未写入：failed 为因数据错误跳过的行，dropped 为请求成功但被触发器跳过的行
+    （如 sql/018 对已以其它日期存在的论文），result 为调用方已写入部分的返回值。"""
+
+    def __init__(self, label: str, failed: List[Any], result: Any = None, dropped: Optional[List[Any]] = None):
+        dropped = dropped or []
+        detail = f"，{len(dropped)} 行被触发器跳过" if dropped else ""
+        super().__init__(f"[{label}] {len(failed)} 行写入失败已跳过{detail}")
+        self.label = label
+        self.failed = failed
+        self.dropped = dropped
+        self.result = result
+
+    @property
+    def skipped(self) -> List[Any]:
+        """所有未写入的行（failed + dropped）。"""
+        return self.failed + self.dropped
+
+
+def _error_text(exc: BaseException) -> str:
+    return f"{type(exc).__name__} {exc}".lower()
+
+
+def _is_too_large(exc: BaseException) -> bool:
+    text = _error_text(exc)
+    return bool(_TOO_LARGE_STATUS_RE.search(text)) or any(m in text for m in _TOO_LARGE_MARKERS)
+
+
+def _is_transient(exc: BaseException) -> bool:
+    text = _error_text(exc)
+    return bool(_TRANSIENT_STATUS_RE.search(text)) or any(m in text for m in _TRANSIENT_MARKERS)
+
+
+def _sqlstate(exc: BaseException) -> Optional[str]:
+    code = getattr(exc, "code", None)  # postgrest.APIError
+    if isinstance(code, str) and code:
+        return code
+    match = _SQLSTATE_RE.search(str(exc))
+    return match.group(1) if match else None
+
+
+def _is_row_data_error(exc: BaseException) -> bool:
+    code = _sqlstate(exc)
+    return bool(code and _ROW_DATA_SQLSTATE_RE.match(code))
+
+
+def _row_bytes(row: Any) -> int:
+    return len(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8")) + 1
+
+
+def _send_timed(send: Callable[[List[Any]], Any], chunk: List[Any], delay: float) -> float:
+    if delay > 0:
+        time.sleep(delay)
+    start = time.time()
+    send(chunk)
+    return time.time() - start
+
+
+def write_chunks(
+    label: str,
+    rows: List[Any],
+    send: Callable[[List[Any]], Any],
+    *,
+    max_rows: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> Dict[str, Any]:
+    """分块并发执行 send(chunk)，返回 {"written", "requests", "failed", "seconds"}。
+
+    send 对一块行发起一次写请求（如 upsert），需幂等：重试与拆分都会重复提交同一批行。
+    failed 为拆到单行后仍因行数据错误失败而被跳过的行；瞬时错误重试用尽、schema/权限类等非行数据错误直接抛出。
+    """
+    stats: Dict[str, Any] = {"written": 0, "requests": 0, "failed": [], "seconds": 0.0}
+    if not rows:
+        return stats
+
+    started = time.time()
+    sizes = [_row_bytes(r) for r in rows]
+    row_cap = max(1, max_rows or BULK_WRITE_MAX_ROWS)
+    workers = max(1, concurrency or BULK_WRITE_CONCURRENCY)
+    budget = max(_MIN_CHUNK_BYTES, min(BULK_WRITE_CHUNK_BYTES, BULK_WRITE_MAX_CHUNK_BYTES))
+    step = max(_MIN_CHUNK_BYTES, BULK_WRITE_CHUNK_BYTES // 2)
+
+    # (lo, hi, attempt)：重试与拆分出的块优先于尚未切分的行
+    Span = Tuple[int, int, int]
+    pending: Deque[Span] = deque()
+    cursor = 0
+
+    def next_span() -> Optional[Span]:
+        nonlocal cursor
+        if pending:
+            return pending.popleft()
+        if cursor >= len(rows):
+            return None
+        lo = hi = cursor
+        used = 0
+        while hi < len(rows) and hi - lo < row_cap and (hi == lo or used + sizes[hi] <= budget):
+            used += sizes[hi]
+            hi += 1
+        cursor = hi
+        return lo, hi, 0
+
+    def split(lo: int, hi: int) -> None:
+        mid = (lo + hi) // 2
+        pending.appendleft((mid, hi, 0))
+        pending.appendleft((lo, mid, 0))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        inflight: Dict[Any, Span] = {}
+        while True:
+            while len(inflight) < workers:
+                span = next_span()
+                if span is None:
+                    break
+                lo, hi, attempt = span
+                delay = min(30.0, 2 ** attempt) * random.uniform(0.5, 1.0) if attempt else 0.0
+                inflight[executor.submit(_send_timed, send, rows[lo:hi], delay)] = span
+            if not inflight:
+                break
+
+            done, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+            for fut in done:
+                lo, hi, attempt = inflight.pop(fut)
+                stats["requests"] += 1
+                chunk_bytes = sum(sizes[lo:hi])
+                try:
+                    elapsed = fut.result()
+                except Exception as e:
+                    if _is_too_large(e) and hi - lo > 1:
+                        budget = max(_MIN_CHUNK_BYTES, min(budget, chunk_bytes) // 2)
+                        print(f"[{label}] {hi - lo} 行（{chunk_bytes // 1024}KB）请求过大或超时，拆分重试: {e}")
+                        split(lo, hi)
+                        continue
+                    if _is_too_large(e) or _is_transient(e):
+                        # 拆分先深入左半（appendleft），服务整体不可用时很快在单行上用尽重试并抛出
+                        if attempt >= BULK_WRITE_RETRIES:
+                            raise
+                        print(f"[{label}] {hi - lo} 行写入遇到瞬时错误，重试 {attempt + 1}/{BULK_WRITE_RETRIES}: {e}")
+                        pending.appendleft((lo, hi, attempt + 1))
+                        continue
+                    if not _is_row_data_error(e):
+                        # 冲突目标/缺列/权限等问题与具体行无关，拆分只会把每一行都失败一遍
+                        raise
+                    if hi - lo > 1:
+                        split(lo, hi)
+                        continue
+                    print(f"⚠️ [{label}] 跳过写入失败的行: {e}")
+                    stats["failed"].append(rows[lo])
+                    continue
+
+                stats["written"] += hi - lo
+                # AIMD：耗时低于目标的一半时加性增大预算，超过目标时减半
+                if elapsed > BULK_WRITE_TARGET_SECONDS:
+                    budget = max(_MIN_CHUNK_BYTES, min(budget, chunk_bytes) // 2)
+                    print(f"[{label}] {hi - lo} 行耗时 {elapsed:.2f}s，块预算降至 {budget // 1024}KB")
+                elif elapsed < BULK_WRITE_TARGET_SECONDS / 2 and chunk_bytes >= budget // 2:
+                    budget = min(BULK_WRITE_MAX_CHUNK_BYTES, budget + step)
+
+    stats["seconds"] = time.time() - started
+    if stats["requests"] > 1 or stats["failed"]:
+        failed = f"，跳过 {len(stats['failed'])} 行" if stats["failed"] else ""
+        print(f"[{label}] 写入 {stats['written']}/{len(rows)} 行，{stats['requests']} 次请求，"
+              f"耗时 {stats['seconds']:.2f}s{failed}")
+    return stats
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Postgres 直连后端（可选）
+
+默认所有读写都经 Supabase/PostgREST（HTTP）。设置 DB_BACKEND=postgres 后，
+repo 中的批量写入改为经连接池直连 Postgres：先 COPY 进临时表，
+再一条 INSERT … SELECT … ON CONFLICT 合并到正式表，每批只需一次事务。
+
+依赖 psycopg 3（pip install "psycopg[binary,pool]"），未安装或未配置连接串时
+自动回退到 PostgREST。连接串读取 DATABASE_URL，其次 SUPABASE_DB_URL；
+也可指向执行过 sql/ 迁移的本地 Postgres，用 `python -m backend.db.pg_backend` 自检。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import psycopg
+    from psycopg import sql
+    from psycopg_pool import ConnectionPool
+except ImportError:  # 可选依赖：未安装时只能使用 PostgREST
+    psycopg = None
+    sql = None
+    ConnectionPool = None
+
+
+DB_BACKEND = os.getenv("DB_BACKEND", "supabase").strip().lower()
+PG_POOL_SIZE = int(os.getenv("PG_POOL_SIZE", "4"))
+
+_pool: Optional["ConnectionPool"] = None
+_pool_lock = threading.Lock()
+_warned = False
+
+
+def _dsn() -> Optional[str]:
+    return os.getenv("DATABASE_URL") or os.getenv("SUPABASE_DB_URL")
+
+
+def enabled() -> bool:
+    """是否启用直连后端（DB_BACKEND=postgres 且依赖与连接串齐全）。"""
+    global _warned
+    if DB_BACKEND != "postgres":
+        return False
+    if psycopg is None or ConnectionPool is None or not _dsn():
+        if not _warned:
+            _warned = True
+            reason = "未安装 psycopg/psycopg_pool" if psycopg is None or ConnectionPool is None else "未配置 DATABASE_URL/SUPABASE_DB_URL"
+            print(f"⚠️  [PG直连] DB_BACKEND=postgres 但{reason}，回退到 PostgREST")
+        return False
+    return True
+
+
+def get_pool() -> "ConnectionPool":
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # prepare_threshold=None：兼容 Supabase 连接池（pgbouncer 事务模式）
+            _pool = ConnectionPool(
+                _dsn(),
+                min_size=1,
+                max_size=max(1, PG_POOL_SIZE),
+                kwargs={"prepare_threshold": None},
+                open=True,
+            )
+            print(f"🔌 [PG直连] 连接池已创建 max_size={PG_POOL_SIZE}")
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def _copy_merge(
+    cur: Any,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    conflict: Sequence[str],
+    returning: Sequence[str] = (),
+) -> List[Tuple[Any, ...]]:
+    """COPY rows 到临时表，再 INSERT … ON CONFLICT DO NOTHING 合并进 app.<table>。"""
+    stage = sql.Identifier(f"_stage_{table}")
+    cols = sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+    cur.execute(
+        sql.SQL("create temp table {} on commit drop as select {} from {} with no data").format(
+            stage, cols, sql.Identifier("app", table)
+        )
+    )
+    with cur.copy(sql.SQL("copy {} ({}) from stdin").format(stage, cols)) as copy:
+        for row in rows:
+            copy.write_row(row)
+    query = sql.SQL("insert into {} ({}) select {} from {} on conflict ({}) do nothing").format(
+        sql.Identifier("app", table),
+        cols,
+        cols,
+        stage,
+        sql.SQL(", ").join(sql.Identifier(c) for c in conflict),
+    )
+    if returning:
+        query = query + sql.SQL(" returning {}").format(sql.SQL(", ").join(sql.Identifier(c) for c in returning))
+    cur.execute(query)
+    return cur.fetchall() if returning else []
+
+
+_PAPER_COLUMNS = (
+    "arxiv_id", "title", "authors", "author_affiliation", "abstract",
+    "link", "update_date", "update_time", "primary_category",
+)
+
+
+def upsert_papers(rows: List[Dict[str, Any]], base_id_of: Any) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+    """批量写入 papers（已存在的同一论文不改动），返回 (请求中的 arxiv_id -> paper_id, 被触发器跳过的行)。
+
+    被跳过的行：写入前尚未登记、写入后却不在或以其它日期登记的论文（并发写入了同一论文的其它日期）。
+    """
+    if not rows:
+        return {}, []
+    by_base: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        if r.get("arxiv_id"):
+            by_base[base_id_of(r["arxiv_id"])] = r
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        cur.execute("select arxiv_base_id from app.paper_keys where arxiv_base_id = any(%s)", (list(by_base.keys()),))
+        registered = {b for (b,) in cur.fetchall()}
+        _copy_merge(
+            cur,
+            "papers",
+            _PAPER_COLUMNS,
+            ([r.get(c) for c in _PAPER_COLUMNS] for r in by_base.values()),
+            ("arxiv_base_id", "update_date"),
+        )
+        # paper_keys 未分区，按 base id 查找不必逐个月分区探索引（sql/018）
+        cur.execute(
+            "select arxiv_base_id, paper_id, update_date from app.paper_keys where arxiv_base_id = any(%s)",
+            (list(by_base.keys()),),
+        )
+        keys = {b: (pid, d) for b, pid, d in cur.fetchall()}
+    dropped = [
+        r for base, r in by_base.items()
+        if base not in registered and (base not in keys or str(keys[base][1]) != str(r.get("update_date")))
+    ]
+    mapping = {
+        r["arxiv_id"]: keys[base_id_of(r["arxiv_id"])][0]
+        for r in rows
+        if r.get("arxiv_id") and base_id_of(r["arxiv_id"]) in keys
+    }
+    return mapping, dropped
+
+
+def overwrite_papers(rows: List[Dict[str, Any]], base_id_of: Any) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+    """覆盖写入 papers：已存在的论文按 paper_keys 定位 (paper_id, update_date) 更新传入的字段，其余插入。
+
+    返回值同 upsert_papers。
+    """
+    if not rows:
+        return {}, []
+    by_base: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        if r.get("arxiv_id"):
+            by_base[base_id_of(r["arxiv_id"])] = r
+    # 只覆盖行中出现的列，避免把未提供的字段（如作者机构）清空
+    columns = [c for c in _PAPER_COLUMNS if any(c in r for r in by_base.values())]
+    stage = sql.Identifier("_stage_overwrite")
+    cols = sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            sql.SQL("create temp table {} on commit drop as select arxiv_base_id, {} from app.papers with no data").format(stage, cols)
+        )
+        with cur.copy(sql.SQL("copy {} (arxiv_base_id, {}) from stdin").format(stage, cols)) as copy:
+            for base, r in by_base.items():
+                copy.write_row([base] + [r.get(c) for c in columns])
+        cur.execute(
+            sql.SQL(
+                "update app.papers p set {} from {} s join app.paper_keys k on k.arxiv_base_id = s.arxiv_base_id "
+                "where p.paper_id = k.paper_id and p.update_date = k.update_date"
+            ).format(
+                sql.SQL(", ").join(sql.SQL("{} = s.{}").format(sql.Identifier(c), sql.Identifier(c)) for c in columns),
+                stage,
+            )
+        )
+    # 新论文插入（已存在的会被触发器跳过），并返回全部映射
+    return upsert_papers(rows, base_id_of)
+
+
+def upsert_paper_categories(pairs: List[Tuple[int, int]]) -> int:
+    """批量写入 paper_categories，返回新增的关联数。"""
+    if not pairs:
+        return 0
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        inserted = _copy_merge(
+            cur, "paper_categories", ("paper_id", "category_id"), sorted(set(pairs)),
+            ("paper_id", "category_id"), returning=("paper_id",),
+        )
+    return len(inserted)
+
+
+def paper_dates(paper_ids: List[int]) -> Dict[int, Any]:
+    """paper_id -> update_date（读 paper_keys）。"""
+    if not paper_ids:
+        return {}
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        cur.execute("select paper_id, update_date from app.paper_keys where paper_id = any(%s)", (list(paper_ids),))
+        return dict(cur.fetchall())
+
+
+def insert_analysis_results(rows: List[Dict[str, Any]]) -> Dict[int, int]:
+    """批量写入 analysis_results（rows 需带 update_date），(paper_id, prompt_id) 已存在的跳过；返回新插入的 paper_id -> analysis_id。"""
+    if not rows:
+        return {}
+    columns = ("paper_id", "prompt_id", "analysis_result", "created_by", "update_date")
+    values = (
+        (r["paper_id"], r["prompt_id"], json.dumps(r["analysis_result"], ensure_ascii=False), r.get("created_by"), r["update_date"])
+        for r in rows
+    )
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        inserted = _copy_merge(
+            cur, "analysis_results", columns, values,
+            ("paper_id", "prompt_id", "update_date"), returning=("paper_id", "analysis_id"),
+        )
+    return dict(inserted)
+
+
+def check() -> Dict[str, Any]:
+    """连接自检：返回服务器版本，并确认合并写入依赖的唯一约束存在。"""
+    with get_pool().connection() as conn, conn.cursor() as cur:
+        cur.execute("select version()")
+        version = cur.fetchone()[0]
+        cur.execute(
+            "select indexname from pg_indexes where schemaname = 'app' "
+            "and tablename in ('papers', 'paper_categories', 'analysis_results')"
+        )
+        indexes = sorted(r[0] for r in cur.fetchall())
+    return {"version": version, "has_base_id_index": "uq_papers_arxiv_base_id_date" in indexes, "indexes": indexes}
+
+
+if __name__ == "__main__":
+    if psycopg is None or ConnectionPool is None or not _dsn():
+        raise SystemExit("需要安装 psycopg[binary,pool] 并设置 DATABASE_URL")
+    print(json.dumps(check(), ensure_ascii=False, indent=2))
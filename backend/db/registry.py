@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+分类 / 提示词进程内注册表
+
+categories、prompts 这两张小表几乎不变，却在每个请求里被反复查询：
+分类名 → category_id，提示词名 → (prompt_id, 内容, 内容哈希)。
+这里做线程安全的进程内缓存，命中后不再访问数据库；
+提示词被修改后需调用 invalidate_prompts()（或 /api/clear_cache）显式失效。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from .client import app_schema
+
+
+_lock = threading.Lock()
+_category_ids: Dict[str, int] = {}
+_prompts: Dict[str, Dict[str, Any]] = {}   # prompt_name -> {prompt_id, content, content_hash}
+
+
+def _content_hash(content: Optional[str]) -> Optional[str]:
+    if content is None:
+        return None
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+
+def category_id(category_name: str) -> int:
+    """分类名 → category_id，不存在时创建（与原 upsert_category 语义一致）。"""
+    cached = _category_ids.get(category_name)
+    if cached is not None:
+        return cached
+    db = app_schema()
+    res = db.from_("categories").select("category_id").eq("category_name", category_name).limit(1).execute()
+    if not res.data:
+        db.from_("categories").insert({"category_name": category_name}).execute()
+        res = db.from_("categories").select("category_id").eq("category_name", category_name).limit(1).execute()
+    cid = res.data[0]["category_id"]
+    with _lock:
+        _category_ids[category_name] = cid
+    return cid
+
+
+def find_category_id(category_name: str) -> Optional[int]:
+    """分类名 → category_id，不存在时返回 None（只读，不创建分类；只缓存查到的结果）。"""
+    cached = _category_ids.get(category_name)
+    if cached is not None:
+        return cached
+    res = app_schema().from_("categories").select("category_id").eq("category_name", category_name).limit(1).execute()
+    if not res.data:
+        return None
+    cid = res.data[0]["category_id"]
+    with _lock:
+        _category_ids[category_name] = cid
+    return cid
+
+
+def remember_categories(name_to_id: Dict[str, int]) -> None:
+    """记录批量查询/写入得到的分类映射（如 upsert_categories_bulk 的结果）。"""
+    if not name_to_id:
+        return
+    with _lock:
+        _category_ids.update(name_to_id)
+
+
+def known_categories(names: Iterable[str]) -> Dict[str, int]:
+    """返回 names 中已缓存的分类映射（不访问数据库）。"""
+    with _lock:
+        return {n: _category_ids[n] for n in names if n in _category_ids}
+
+
+def get_prompt(prompt_name: str) -> Optional[Dict[str, Any]]:
+    """提示词名 → {prompt_id, content, content_hash}；不存在时返回 None（不缓存未命中）。"""
+    cached = _prompts.get(prompt_name)
+    if cached is not None:
+        return cached
+    db = app_schema()
+    res = (
+        db.from_("prompts")
+        .select("prompt_id, prompt_content")
+        .eq("prompt_name", prompt_name)
+        .limit(1)
+        .execute()
+    )
+    if not res.data:
+        return None
+    row = res.data[0]
+    entry = {
+        "prompt_id": row["prompt_id"],
+        "content": row.get("prompt_content"),
+        "content_hash": _content_hash(row.get("prompt_content")),
+    }
+    with _lock:
+        _prompts[prompt_name] = entry
+    return entry
+
+
+def invalidate_prompts(prompt_name: Optional[str] = None) -> None:
+    """提示词被修改后调用；不传名称时清空全部提示词缓存。"""
+    with _lock:
+        if prompt_name is None:
+            _prompts.clear()
+        else:
+            _prompts.pop(prompt_name, None)
+
+
+def invalidate_all() -> None:
+    with _lock:
+        _prompts.clear()
+        _category_ids.clear()
+
+
+def warm(categories: Iterable[str] = (), prompt_names: Iterable[str] = ("multi-modal-llm", "system_default")) -> Dict[str, Any]:
+    """启动时预热：一次批量查询分类，逐个加载提示词。"""
+    names: List[str] = sorted({c for c in categories if c})
+    if names:
+        rows = app_schema().from_("categories").select("category_id, category_name").in_("category_name", names).execute().data
+        remember_categories({r["category_name"]: r["category_id"] for r in rows})
+        for name in names:
+            category_id(name)
+    for name in prompt_names:
+        get_prompt(name)
+    return snapshot()
+
+
+def snapshot() -> Dict[str, Any]:
+    with _lock:
+        return {
+            "categories": len(_category_ids),
+            "prompts": {name: p["content_hash"] for name, p in _prompts.items()},
+        }
@@ -2,12 +2,24 @@ from __future__ import annotations
 
 import datetime as dt
 from typing import Any, Dict, List, Optional, Tuple
+import base64
 import json
+import os
+import re
 import time
 
+from . import bulk_writer, pg_backend, registry
 from .client import app_schema, get_client
 
 
+_ARXIV_VERSION_RE = re.compile(r"v\d+$")
+
+
+def arxiv_base_id(arxiv_id: str) -> str:
+    """去掉版本号的 arXiv ID（与 papers.arxiv_base_id 生成列一致）：2508.05636v2 -> 2508.05636"""
+    return _ARXIV_VERSION_RE.sub("", (arxiv_id or "").strip())
+
+
 def _ensure_date(value: str | dt.date) -> str:
     if isinstance(value, dt.date):
         return value.isoformat()
@@ -15,27 +27,17 @@ def _ensure_date(value: str | dt.date) -> str:
 
 
 def get_or_create_prompt(prompt_name: str) -> str:
-    db = app_schema()
-    # Try get
-    res = db.from_("prompts").select("prompt_id").eq("prompt_name", prompt_name).limit(1).execute()
-    if res.data:
-        return res.data[0]["prompt_id"]
+    prompt = registry.get_prompt(prompt_name)
+    if prompt:
+        return prompt["prompt_id"]
     # create empty placeholder; caller can update content later
-    db.from_("prompts").insert({"prompt_name": prompt_name, "prompt_content": ""}).execute()
-    res = db.from_("prompts").select("prompt_id").eq("prompt_name", prompt_name).limit(1).execute()
-    return res.data[0]["prompt_id"]
+    app_schema().from_("prompts").insert({"prompt_name": prompt_name, "prompt_content": ""}).execute()
+    return registry.get_prompt(prompt_name)["prompt_id"]
 
 
 def upsert_category(category_name: str) -> int:
-    db = app_schema()
-    # try select
-    res = db.from_("categories").select("category_id").eq("category_name", category_name).limit(1).execute()
-    if res.data:
-        return res.data[0]["category_id"]
-    # insert
-    db.from_("categories").insert({"category_name": category_name}).execute()
-    res = db.from_("categories").select("category_id").eq("category_name", category_name).limit(1).execute()
-    return res.data[0]["category_id"]
+    """分类名 → category_id（经进程内注册表缓存，首次查询时不存在则创建）。"""
+    return registry.category_id(category_name)
 
 
 def upsert_paper(
@@ -50,8 +52,8 @@ def upsert_paper(
     author_affiliation: Optional[str] = None,
 ) -> int:
     db = app_schema()
-    # check exists
-    res = db.from_("papers").select("paper_id").eq("arxiv_id", arxiv_id).limit(1).execute()
+    # check exists（按 base id，不同版本视为同一篇论文）
+    res = db.from_("papers").select("paper_id").eq("arxiv_base_id", arxiv_base_id(arxiv_id)).limit(1).execute()
     if res.data:
         paper_id = res.data[0]["paper_id"]
         # update lightweight fields (idempotent)
@@ -76,13 +78,13 @@ def upsert_paper(
         "primary_category": primary_category,
         "author_affiliation": author_affiliation,
     }).execute()
-    res = db.from_("papers").select("paper_id").eq("arxiv_id", arxiv_id).limit(1).execute()
+    res = db.from_("papers").select("paper_id").eq("arxiv_base_id", arxiv_base_id(arxiv_id)).limit(1).execute()
     return res.data[0]["paper_id"]
 
 
 def get_paper_id_by_arxiv_id(arxiv_id: str) -> Optional[int]:
     db = app_schema()
-    res = db.from_("papers").select("paper_id").eq("arxiv_id", arxiv_id).limit(1).execute()
+    res = db.from_("papers").select("paper_id").eq("arxiv_base_id", arxiv_base_id(arxiv_id)).limit(1).execute()
     if res.data:
         return res.data[0]["paper_id"]
     return None
@@ -99,6 +101,21 @@ def update_paper_author_affiliation(paper_id: int, author_affiliation: str) -> N
     db.from_("papers").update({"author_affiliation": author_affiliation}).eq("paper_id", paper_id).execute()
 
 
+def set_paper_affiliations(paper_id: int, affiliations: List[str]) -> None:
+    """写入论文作者机构：author_affiliation（JSON 文本）+ 规范化的 affiliations / paper_affiliations。
+
+    调用 SQL 函数 set_paper_affiliations（sql/019）在一个事务内完成；函数不可用时只更新
+    author_affiliation，之后执行 app.backfill_paper_affiliations() 即可补齐关联表。
+    """
+    names = [str(a).strip() for a in affiliations if a and str(a).strip()]
+    try:
+        app_schema().rpc("set_paper_affiliations", {"p_paper_id": int(paper_id), "p_affiliations": names}).execute()
+        return
+    except Exception as e:
+        print(f"[repo] 机构写入RPC失败，仅更新 author_affiliation: {e}")
+    update_paper_author_affiliation(int(paper_id), json.dumps(names, ensure_ascii=False))
+
+
 def link_paper_category(paper_id: int, category_name: str) -> None:
     db = app_schema()
     category_id = upsert_category(category_name)
@@ -130,50 +147,112 @@ def count_papers_by_date_category(date: str | dt.date, category: str) -> int:
 def get_arxiv_ids_from_api(date: str | dt.date, category: str) -> List[str]:
     """轻量级ArXiv API调用：只获取arxiv_id列表（用于智能导入判断）"""
     import feedparser
-    import requests
-    import datetime as dt
-    import pytz
+    import re
+    from backend.clients.arxiv_client import (
+        ArxivQueryPages,
+        build_submitted_date_query,
+        compute_announcement_window,
+    )
     
     target_date = dt.datetime.strptime(str(date), "%Y-%m-%d").date() if isinstance(date, str) else date
-    et_tz = pytz.timezone("US/Eastern")
-    
-    start_et = et_tz.localize(dt.datetime.combine(target_date - dt.timedelta(days=1), dt.time(20, 0)))
-    end_et = et_tz.localize(dt.datetime.combine(target_date, dt.time(20, 0)))
-    start_utc = start_et.astimezone(dt.timezone.utc)
-    end_utc = end_et.astimezone(dt.timezone.utc)
-    
-    start_date_str = start_utc.strftime("%Y%m%d%H%M%S")
-    end_date_str = end_utc.strftime("%Y%m%d%H%M%S")
-    
-    url = (
-        f"https://export.arxiv.org/api/query?"
-        f"search_query=cat:{category}+AND+submittedDate:[{start_date_str}+TO+{end_date_str}]&"
-        "sortBy=submittedDate&sortOrder=descending&max_results=2000"
-    )
+    _, _, start_utc, end_utc = compute_announcement_window(target_date)
+    pager = ArxivQueryPages(build_submitted_date_query(category, start_utc, end_utc), timeout=15)
     
     try:
-        resp = requests.get(url, timeout=15)
-        resp.raise_for_status()
-        feed = feedparser.parse(resp.text)
-        
         arxiv_ids = []
-        for entry in feed.entries:
-            # 快速解析ID，不处理其他字段
-            import re
-            candidates = [getattr(entry, "id", ""), getattr(entry, "link", "")]
-            for candidate in candidates:
-                m = re.search(r"/abs/([0-9]{4}\.[0-9]{5}(v\d+)?)(?:[?#].*)?$", candidate)
-                if m:
-                    arxiv_ids.append(m.group(1))
-                    break
+        for body in pager:
+            feed = feedparser.parse(body)
+            for entry in feed.entries:
+                # 快速解析ID，不处理其他字段
+                candidates = [getattr(entry, "id", ""), getattr(entry, "link", "")]
+                for candidate in candidates:
+                    m = re.search(r"/abs/([0-9]{4}\.[0-9]{5}(v\d+)?)(?:[?#].*)?$", candidate)
+                    if m:
+                        arxiv_ids.append(m.group(1))
+                        break
+        pager.report()
         
-        print(f"[智能导入] ArXiv API返回 {len(arxiv_ids)} 个ID")
+        print(f"[智能导入] ArXiv API返回 {len(arxiv_ids)} 个ID（共 {pager.pages} 页）")
         return arxiv_ids
     except Exception as e:
         print(f"[智能导入] ArXiv API调用失败: {e}")
         return []
 
 
+def get_ingest_watermark(date: str | dt.date, category: str) -> Optional[Dict[str, Any]]:
+    """获取 (日期, 分类) 的导入水位线；不存在（包括分类尚未登记）时返回 None。"""
+    db = app_schema()
+    date_str = _ensure_date(date)
+    try:
+        # 读路径：未知分类不创建
+        category_id = registry.find_category_id(category)
+        if category_id is None:
+            return None
+        res = (
+            db.from_("ingest_watermarks")
+            .select("last_submitted_at,window_end_at,paper_count,last_success_at")
+            .eq("update_date", date_str)
+            .eq("category_id", category_id)
+            .limit(1)
+            .execute()
+        )
+        return res.data[0] if res.data else None
+    except Exception as e:
+        print(f"[水位线] 读取失败 date={date_str} category={category}: {e}")
+        return None
+
+
+def set_ingest_watermarks(
+    date: str | dt.date,
+    categories: List[str],
+    last_submitted_at: Optional[dt.datetime],
+    window_end_at: dt.datetime,
+    paper_count: int,
+) -> None:
+    """批量写入多个分类同一日期的导入水位线（只前进不后退）。
+
+    last_submitted_at 为 None（本次没有新论文）时只刷新已有水位线的成功时间。
+    """
+    db = app_schema()
+    date_str = _ensure_date(date)
+    if not categories:
+        return
+    try:
+        name_to_id = upsert_categories_bulk(categories)
+        existing = (
+            db.from_("ingest_watermarks")
+            .select("category_id,last_submitted_at")
+            .eq("update_date", date_str)
+            .in_("category_id", list(name_to_id.values()))
+            .execute()
+        ).data or []
+        previous = {
+            r["category_id"]: _parse_ingest_time(r["last_submitted_at"]).replace(tzinfo=dt.timezone.utc)
+            for r in existing
+        }
+        now_iso = dt.datetime.now(dt.timezone.utc).isoformat()
+        rows = []
+        for cid in name_to_id.values():
+            mark = last_submitted_at
+            prev = previous.get(cid)
+            if prev is not None and (mark is None or prev > mark):
+                mark = prev
+            if mark is None:
+                continue
+            rows.append({
+                "update_date": date_str,
+                "category_id": cid,
+                "last_submitted_at": mark.isoformat(),
+                "window_end_at": window_end_at.isoformat(),
+                "paper_count": paper_count,
+                "last_success_at": now_iso,
+            })
+        if rows:
+            db.from_("ingest_watermarks").upsert(rows, on_conflict="update_date,category_id").execute()
+    except Exception as e:
+        print(f"[水位线] 写入失败 date={date_str} categories={categories}: {e}")
+
+
 def get_existing_arxiv_ids_by_date(date: str | dt.date, arxiv_ids: List[str]) -> List[str]:
     """高效检查：指定日期下已存在的arxiv_id列表"""
     if not arxiv_ids:
@@ -183,20 +262,25 @@ def get_existing_arxiv_ids_by_date(date: str | dt.date, arxiv_ids: List[str]) ->
     date_str = _ensure_date(date)
     
     try:
-        # 分批查询，避免IN子句过长
+        # 按 base id 分批查询，避免IN子句过长；返回调用方传入的ID形式
+        by_base: Dict[str, List[str]] = {}
+        for aid in arxiv_ids:
+            by_base.setdefault(arxiv_base_id(aid), []).append(aid)
+        bases = list(by_base)
         existing_ids = []
         chunk_size = 100
-        for i in range(0, len(arxiv_ids), chunk_size):
-            chunk = arxiv_ids[i:i + chunk_size]
+        for i in range(0, len(bases), chunk_size):
+            chunk = bases[i:i + chunk_size]
             result = (
                 db.from_("papers")
-                .select("arxiv_id")
+                .select("arxiv_base_id")
                 .eq("update_date", date_str)
-                .in_("arxiv_id", chunk)
+                .in_("arxiv_base_id", chunk)
                 .execute()
                 .data
             )
-            existing_ids.extend([r["arxiv_id"] for r in result])
+            for r in result:
+                existing_ids.extend(by_base.get(r["arxiv_base_id"], []))
         
         print(f"[智能导入] DB中已存在 {len(existing_ids)}/{len(arxiv_ids)} 个ID")
         return existing_ids
@@ -225,18 +309,22 @@ def smart_check_and_read(date: str | dt.date, category: str, arxiv_ids: List[str
         print(f"[一体化] 开始联合查询：存在性检查+完整数据读取")
         start_time = time.time()
         
-        # 🔧 修复：第一步，检查该日期下所有已存在的论文（不限分类关联）
+        # 🔧 修复：第一步，检查该日期下所有已存在的论文（不限分类关联，按 base id 匹配任意版本）
+        by_base: Dict[str, List[str]] = {}
+        for aid in arxiv_ids:
+            by_base.setdefault(arxiv_base_id(aid), []).append(aid)
+        bases = list(by_base)
         all_existing_papers = []
         chunk_size = 100
-        for i in range(0, len(arxiv_ids), chunk_size):
-            chunk = arxiv_ids[i:i + chunk_size]
+        for i in range(0, len(bases), chunk_size):
+            chunk = bases[i:i + chunk_size]
             
             # 查询该日期下所有已存在的论文
             papers_result = (
                 db.from_("papers")
-                .select("paper_id, arxiv_id, title, authors, abstract, link, author_affiliation")
+                .select("paper_id, arxiv_id, arxiv_base_id, title, authors, abstract, link, author_affiliation")
                 .eq("update_date", date_str)
-                .in_("arxiv_id", chunk)
+                .in_("arxiv_base_id", chunk)
                 .order("arxiv_id", desc=True)
                 .execute()
                 .data
@@ -244,7 +332,8 @@ def smart_check_and_read(date: str | dt.date, category: str, arxiv_ids: List[str
             all_existing_papers.extend(papers_result)
         
         existing_paper_ids = [p["paper_id"] for p in all_existing_papers]
-        existing_arxiv_ids = [p["arxiv_id"] for p in all_existing_papers]
+        # 以调用方传入的ID形式返回，便于与 API 返回的ID直接求差集
+        existing_arxiv_ids = [aid for p in all_existing_papers for aid in by_base.get(p["arxiv_base_id"], [])]
         
         # 🔧 修复：第二步，检查哪些论文已经建立了该分类关联
         linked_paper_ids = []
@@ -358,7 +447,56 @@ def list_papers_by_date_category_reliable(date: str | dt.date, category: str) ->
     
     return articles
 
+# PostgREST 单次响应的行数上限（Supabase 默认 max_rows=1000），RPC 结果按此分页读取
+RPC_PAGE_SIZE = 1000
+
+
+def _rpc_all_rows(function_name: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """调用返回集合的 RPC，按 RPC_PAGE_SIZE 分页读取全部行。"""
+    db = app_schema()
+    rows: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        batch = db.rpc(function_name, params).range(offset, offset + RPC_PAGE_SIZE - 1).execute().data or []
+        rows.extend(batch)
+        if len(batch) < RPC_PAGE_SIZE:
+            return rows
+        offset += RPC_PAGE_SIZE
+
+
+def _papers_to_articles(rows: List[Dict[str, Any]], start: int = 1) -> List[Dict[str, Any]]:
+    return [
+        {
+            "number": idx,
+            "id": r["arxiv_id"],
+            "title": r["title"],
+            "authors": r.get("authors") or "",
+            "abstract": r.get("abstract") or "",
+            "link": r.get("link") or "",
+            "author_affiliation": r.get("author_affiliation") or "",
+        }
+        for idx, r in enumerate(rows, start=start)
+    ]
+
+
+def list_papers_by_date_category_rpc(date: str | dt.date, category: str) -> List[Dict[str, Any]]:
+    """通过 SQL 函数 app.list_papers_by_date_category 一次查询获取当日该分类的论文（sql/010）。"""
+    rows = _rpc_all_rows("list_papers_by_date_category", {"p_date": _ensure_date(date), "p_category": category})
+    return _papers_to_articles(rows)
+
+
 def list_papers_by_date_category(date: str | dt.date, category: str) -> List[Dict[str, Any]]:
+    """获取某日期某分类的论文列表：优先走 RPC，函数不可用时回退到内联JOIN/可靠版本。"""
+    try:
+        articles = list_papers_by_date_category_rpc(date, category)
+        print(f"[repo] rpc rows for date={_ensure_date(date)}, category={category}: {len(articles)}")
+        return articles
+    except Exception as e:
+        print(f"[repo] RPC查询失败，回退到JOIN查询: {e}")
+        return list_papers_by_date_category_join(date, category)
+
+
+def list_papers_by_date_category_join(date: str | dt.date, category: str) -> List[Dict[str, Any]]:
     db = app_schema()
     date_str = _ensure_date(date)
     # 优先走一次请求的内联JOIN查询（通过外键自动关系），显著减少网络往返
@@ -419,20 +557,14 @@ def list_papers_by_date_category(date: str | dt.date, category: str) -> List[Dic
 
 
 def get_prompt_id_by_name(prompt_name: str = "system_default") -> Optional[str]:
-    db = app_schema()
-    res = db.from_("prompts").select("prompt_id").eq("prompt_name", prompt_name).limit(1).execute()
-    if res.data:
-        return res.data[0]["prompt_id"]
-    return None
+    prompt = registry.get_prompt(prompt_name)
+    return prompt["prompt_id"] if prompt else None
 
 
 def get_prompt_content_by_name(prompt_name: str = "multi-modal-llm") -> Optional[str]:
-    """根据提示词名称获取内容。"""
-    db = app_schema()
-    res = db.from_("prompts").select("prompt_content").eq("prompt_name", prompt_name).limit(1).execute()
-    if res.data:
-        return res.data[0]["prompt_content"]
-    return None
+    """根据提示词名称获取内容（经进程内注册表缓存）。"""
+    prompt = registry.get_prompt(prompt_name)
+    return prompt["content"] if prompt else None
 
 
 def get_system_prompt() -> str:
@@ -440,7 +572,6 @@ def get_system_prompt() -> str:
     # 优先从数据库读取 multi-modal-llm prompt
     db_prompt = get_prompt_content_by_name("multi-modal-llm")
     if db_prompt:
-        print("📋 [提示词] 从数据库读取 multi-modal-llm 提示词")
         return db_prompt
     
     # 回退方案：从文件读取（兼容旧版本）
@@ -455,6 +586,20 @@ def get_system_prompt() -> str:
 
 
 def list_unanalyzed_papers(date: str | dt.date, category: str, prompt_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """当天该分类下尚未被该 prompt 分析的论文（按 arxiv_id 升序）。
+
+    优先调用 SQL 函数 list_unanalyzed_papers（sql/012，一次反连接查询，limit 在库内生效）；
+    函数不可用时回退到分块查询的旧实现。
+    """
+    try:
+        params = {"p_date": _ensure_date(date), "p_category": category, "p_prompt_id": prompt_id, "p_limit": limit or None}
+        return _rpc_all_rows("list_unanalyzed_papers", params)
+    except Exception as e:
+        print(f"[repo] 未分析论文RPC查询失败，回退到分块查询: {e}")
+        return list_unanalyzed_papers_chunked(date, category, prompt_id, limit)
+
+
+def list_unanalyzed_papers_chunked(date: str | dt.date, category: str, prompt_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
     db = app_schema()
     date_str = _ensure_date(date)
     # paper ids by category - 使用分页避免截断
@@ -517,9 +662,49 @@ def list_unanalyzed_papers(date: str | dt.date, category: str, prompt_id: str, l
     return pending
 
 
+def get_paper_dates(paper_ids: List[int]) -> Dict[int, str]:
+    """paper_id -> update_date（读未分区的 paper_keys，sql/018）。
+
+    analysis_results 按 update_date 分区，写入时必须带上所属论文的日期。
+    """
+    ids = sorted({int(pid) for pid in paper_ids})
+    if pg_backend.enabled():
+        return pg_backend.paper_dates(ids)
+    dates: Dict[int, str] = {}
+    chunk_size = 500
+    for i in range(0, len(ids), chunk_size):
+        rows = (
+            app_schema()
+            .from_("paper_keys")
+            .select("paper_id, update_date")
+            .in_("paper_id", ids[i:i + chunk_size])
+            .execute()
+            .data
+        )
+        dates.update({r["paper_id"]: r["update_date"] for r in rows})
+    return dates
+
+
 def insert_analysis_result(
     *, paper_id: int, prompt_id: str, analysis_json: Dict[str, Any], created_by: Optional[str]
 ) -> Optional[int]:
+    update_date = get_paper_dates([paper_id]).get(paper_id)
+    if update_date is None:
+        print(f"[repo] 论文不存在，跳过写入分析结果 paper_id={paper_id}")
+        return None
+    if pg_backend.enabled():
+        try:
+            inserted = pg_backend.insert_analysis_results([{
+                "paper_id": paper_id,
+                "prompt_id": prompt_id,
+                "analysis_result": analysis_json,
+                "created_by": created_by,
+                "update_date": update_date,
+            }])
+            return inserted.get(paper_id)
+        except Exception as e:
+            print(f"[PG直连] 写入分析结果失败 paper_id={paper_id}: {e}")
+            return None
     db = app_schema()
     try:
         db.from_("analysis_results").insert({
@@ -527,9 +712,14 @@ def insert_analysis_result(
             "prompt_id": prompt_id,
             "analysis_result": analysis_json,
             "created_by": created_by,
+            "update_date": update_date,
         }).execute()
         # fetch id
-        res = db.from_("analysis_results").select("analysis_id").eq("paper_id", paper_id).eq("prompt_id", prompt_id).limit(1).execute()
+        res = (
+            db.from_("analysis_results").select("analysis_id")
+            .eq("paper_id", paper_id).eq("prompt_id", prompt_id).eq("update_date", update_date)
+            .limit(1).execute()
+        )
         if res.data:
             return res.data[0]["analysis_id"]
         return None
@@ -538,6 +728,61 @@ def insert_analysis_result(
         return None
 
 
+def insert_analysis_results_bulk(rows: List[Dict[str, Any]]) -> Dict[int, int]:
+    """批量写入分析结果，一次请求 + RETURNING，返回新插入的 paper_id -> analysis_id。
+
+    rows: [{paper_id, prompt_id, analysis_result, created_by}]；
+    同一批中重复的 (paper_id, prompt_id) 只保留第一条，库中已存在的跳过（不覆盖）。
+    update_date 按 paper_id 从 paper_keys 补齐（分区键），论文已不存在的行跳过。
+    """
+    unique: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    for r in rows:
+        unique.setdefault((r["paper_id"], r["prompt_id"]), r)
+    if not unique:
+        return {}
+    dates = get_paper_dates([pid for pid, _ in unique])
+    payload = [
+        {
+            "paper_id": r["paper_id"],
+            "prompt_id": r["prompt_id"],
+            "analysis_result": r["analysis_result"],
+            "created_by": r.get("created_by"),
+            "update_date": dates[r["paper_id"]],
+        }
+        for r in unique.values()
+        if r["paper_id"] in dates
+    ]
+    if not payload:
+        return {}
+    if pg_backend.enabled():
+        return pg_backend.insert_analysis_results(payload)
+    res = (
+        app_schema()
+        .from_("analysis_results")
+        .upsert(payload, on_conflict="paper_id,prompt_id,update_date", ignore_duplicates=True)
+        .execute()
+    )
+    return {r["paper_id"]: r["analysis_id"] for r in (res.data or [])}
+
+
+def _analysis_rows_to_articles(rows: List[Dict[str, Any]], start: int = 1) -> List[Dict[str, Any]]:
+    return [
+        {
+            "number": idx,
+            "id": r.get("arxiv_id", ""),
+            "paper_id": r.get("paper_id"),
+            "analysis_result": json.dumps(r["analysis_result"], ensure_ascii=False, separators=(",", ":")),
+            "title": r.get("title", ""),
+            "authors": r.get("authors", ""),
+            "abstract": r.get("abstract", ""),
+            "link": r.get("link", ""),
+            "author_affiliation": r.get("author_affiliation", ""),
+            "update_time": r.get("update_time", ""),
+        }
+        for idx, r in enumerate(rows, start=start)
+    ]
+
+
 def get_analysis_results(
     *, date: str | dt.date, category: str, prompt_id: str, limit: Optional[int] = None, order_by: str = "arxiv_id.asc",
     time_filter: Optional[str] = None, batch_filter: Optional[List[int]] = None
@@ -546,9 +791,257 @@ def get_analysis_results(
 
     - 仅返回当天该分类的论文分析（不会混入其它日期）
     - 元数据从 papers 表取（title/authors/abstract/link/author_affiliation）
-    - 顺序与搜索页一致（按 arxiv_id 升序）
+    - 顺序与搜索页一致（按 arxiv_id 降序）
     - limit 若提供，则在最终顺序上截断
+
+    优先调用 SQL 函数 list_analysis_results_by_date_category（sql/011），成本只与当天数据量有关；
+    函数不可用时回退到按分类全量扫描的旧实现。
+    """
+    try:
+        params = {
+            "p_date": _ensure_date(date),
+            "p_category": category,
+            "p_prompt_id": prompt_id,
+            "p_after_18": time_filter == "after_18",
+            "p_paper_ids": [int(pid) for pid in batch_filter] if batch_filter else None,
+            "p_limit": limit or None,
+        }
+        rows = _rpc_all_rows("list_analysis_results_by_date_category", params)
+        return _analysis_rows_to_articles(rows)
+    except Exception as e:
+        print(f"[repo] 分析结果RPC查询失败，回退到全量扫描: {e}")
+        return get_analysis_results_scan(
+            date=date, category=category, prompt_id=prompt_id, limit=limit,
+            time_filter=time_filter, batch_filter=batch_filter,
+        )
+
+
+# =====================
+# 游标分页（keyset on arxiv_id）
+# =====================
+
+PAGE_SIZE_DEFAULT = 100
+PAGE_SIZE_MAX = 500
+
+
+def encode_page_cursor(last_arxiv_id: str, last_number: int) -> str:
+    """不透明游标：上一页最后一行的 arxiv_id 与序号。"""
+    raw = json.dumps({"a": last_arxiv_id, "n": last_number}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_page_cursor(cursor: Optional[str]) -> Tuple[Optional[str], int]:
+    """解析游标，返回 (after_arxiv_id, 已返回行数)；无游标时为 (None, 0)，格式错误抛 ValueError。"""
+    if not cursor:
+        return None, 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        after, offset = str(data["a"]), int(data["n"])
+        if offset < 0:
+            raise ValueError("negative offset")
+        return after, offset
+    except Exception as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+def _clamp_page_size(page_size: Optional[int]) -> int:
+    return max(1, min(int(page_size or PAGE_SIZE_DEFAULT), PAGE_SIZE_MAX))
+
+
+def _page_result(rows: List[Dict[str, Any]], page_size: int, offset: int, to_articles: Any) -> Dict[str, Any]:
+    # 多取一行用于判断是否还有下一页
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    articles = to_articles(rows, start=offset + 1)
+    next_cursor = encode_page_cursor(rows[-1]["arxiv_id"], offset + len(rows)) if has_more and rows else None
+    return {"articles": articles, "next_cursor": next_cursor, "has_more": has_more}
+
+
+def _page_from_articles(articles: List[Dict[str, Any]], after: Optional[str], page_size: int, offset: int) -> Dict[str, Any]:
+    """回退路径：在完整的 arxiv_id 倒序列表上定位游标并切出一页。"""
+    if after is not None:
+        articles = [a for a in articles if a["id"] < after]
+    has_more = len(articles) > page_size
+    page = articles[:page_size]
+    for idx, a in enumerate(page, start=offset + 1):
+        a["number"] = idx
+    next_cursor = encode_page_cursor(page[-1]["id"], offset + len(page)) if has_more and page else None
+    return {"articles": page, "next_cursor": next_cursor, "has_more": has_more}
+
+
+def page_articles(
+    articles: List[Dict[str, Any]], cursor: Optional[str] = None, page_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """在已按 arxiv_id 倒序的完整列表（如服务端缓存）上按游标切页，返回格式与 list_papers_page 相同。
+
+    切出的文章为副本，不改动传入列表。
     """
+    after, offset = decode_page_cursor(cursor)
+    ordered = sorted((dict(a) for a in articles), key=lambda a: a["id"], reverse=True)
+    return _page_from_articles(ordered, after, _clamp_page_size(page_size), offset)
+
+
+def list_papers_page(
+    date: str | dt.date, category: str, cursor: Optional[str] = None, page_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """按 arxiv_id 倒序分页返回当天该分类的论文：{articles, next_cursor, has_more}。
+
+    调用 SQL 函数 list_papers_page（sql/016），每次只读取一页；函数不可用时在完整列表上切页。
+    """
+    after, offset = decode_page_cursor(cursor)
+    size = _clamp_page_size(page_size)
+    try:
+        rows = (
+            app_schema()
+            .rpc("list_papers_page", {
+                "p_date": _ensure_date(date),
+                "p_category": category,
+                "p_after_arxiv_id": after,
+                "p_limit": size + 1,
+            })
+            .execute()
+            .data
+        ) or []
+        return _page_result(rows, size, offset, _papers_to_articles)
+    except Exception as e:
+        print(f"[repo] 论文分页RPC查询失败，回退到完整列表切页: {e}")
+        return _page_from_articles(list_papers_by_date_category(date, category), after, size, offset)
+
+
+def get_analysis_results_page(
+    *, date: str | dt.date, category: str, prompt_id: str, cursor: Optional[str] = None, page_size: Optional[int] = None,
+    time_filter: Optional[str] = None, batch_filter: Optional[List[int]] = None
+) -> Dict[str, Any]:
+    """按 arxiv_id 倒序分页返回分析结果：{articles, next_cursor, has_more}。
+
+    调用 SQL 函数 list_analysis_results_page（sql/016）；函数不可用时在完整结果上切页。
+    """
+    after, offset = decode_page_cursor(cursor)
+    size = _clamp_page_size(page_size)
+    try:
+        rows = (
+            app_schema()
+            .rpc("list_analysis_results_page", {
+                "p_date": _ensure_date(date),
+                "p_category": category,
+                "p_prompt_id": prompt_id,
+                "p_after_18": time_filter == "after_18",
+                "p_paper_ids": [int(pid) for pid in batch_filter] if batch_filter else None,
+                "p_after_arxiv_id": after,
+                "p_limit": size + 1,
+            })
+            .execute()
+            .data
+        ) or []
+        return _page_result(rows, size, offset, _analysis_rows_to_articles)
+    except Exception as e:
+        print(f"[repo] 分析结果分页RPC查询失败，回退到完整结果切页: {e}")
+        articles = get_analysis_results(
+            date=date, category=category, prompt_id=prompt_id, time_filter=time_filter, batch_filter=batch_filter,
+        )
+        return _page_from_articles(articles, after, size, offset)
+
+
+# =====================
+# 全文检索（标题 + 摘要）
+# =====================
+
+def _search_rows_to_articles(rows: List[Dict[str, Any]], start: int = 1) -> List[Dict[str, Any]]:
+    articles = _papers_to_articles(rows, start=start)
+    for article, r in zip(articles, rows):
+        article["update_date"] = r.get("update_date")
+        article["rank"] = r.get("rank")
+        article["pass_filter"] = r.get("pass_filter")
+    return articles
+
+
+def fulltext_search_papers(
+    query: str, *, date_from: Optional[str | dt.date] = None, date_to: Optional[str | dt.date] = None,
+    category: Optional[str] = None, prompt_id: Optional[str] = None, pass_filter: Optional[bool] = None,
+    cursor: Optional[str] = None, page_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """按相关度分页检索标题/摘要：{articles, next_cursor, has_more}。
+
+    调用 SQL 函数 fulltext_search_papers（sql/017），由 papers.search_vector 上的 GIN 索引取匹配行；
+    相关度排序无法按键续读，游标中的行数即下一页的 offset。query 为空时抛 ValueError。
+    """
+    query = (query or "").strip()
+    if not query:
+        raise ValueError("请输入检索关键词")
+    _, offset = decode_page_cursor(cursor)
+    size = _clamp_page_size(page_size)
+    try:
+        rows = (
+            app_schema()
+            .rpc("fulltext_search_papers", {
+                "p_query": query,
+                "p_date_from": _ensure_date(date_from) if date_from else None,
+                "p_date_to": _ensure_date(date_to) if date_to else None,
+                "p_category": category or None,
+                "p_prompt_id": prompt_id,
+                "p_pass_filter": pass_filter,
+                "p_offset": offset,
+                "p_limit": size + 1,
+            })
+            .execute()
+            .data
+        ) or []
+    except Exception as e:
+        # 没有可回退的实现：未建 search_vector 时按标题/摘要模糊匹配会扫描全表
+        print(f"[repo] 全文检索RPC查询失败: {e}")
+        raise RuntimeError("全文检索不可用，请先执行 sql/017_fulltext_search.sql") from e
+    return _page_result(rows, size, offset, _search_rows_to_articles)
+
+
+def _affiliation_rows_to_articles(rows: List[Dict[str, Any]], start: int = 1) -> List[Dict[str, Any]]:
+    articles = _papers_to_articles(rows, start=start)
+    for article, r in zip(articles, rows):
+        article["paper_id"] = r.get("paper_id")
+        article["update_date"] = r.get("update_date")
+        article["matched_affiliations"] = r.get("affiliations") or []
+    return articles
+
+
+def papers_by_affiliation(
+    affiliation: str, *, date_from: Optional[str | dt.date] = None, date_to: Optional[str | dt.date] = None,
+    cursor: Optional[str] = None, page_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """按作者机构分页查询论文（日期倒序）：{articles, next_cursor, has_more}。
+
+    调用 SQL 函数 papers_by_affiliation（sql/019）：机构名按规范化后的整词匹配，
+    经 paper_affiliations 索引取论文；游标中的行数即下一页的 offset。机构名为空时抛 ValueError。
+    """
+    affiliation = (affiliation or "").strip()
+    if not affiliation:
+        raise ValueError("请输入机构名称")
+    _, offset = decode_page_cursor(cursor)
+    size = _clamp_page_size(page_size)
+    try:
+        rows = (
+            app_schema()
+            .rpc("papers_by_affiliation", {
+                "p_affiliation": affiliation,
+                "p_date_from": _ensure_date(date_from) if date_from else None,
+                "p_date_to": _ensure_date(date_to) if date_to else None,
+                "p_offset": offset,
+                "p_limit": size + 1,
+            })
+            .execute()
+            .data
+        ) or []
+    except Exception as e:
+        # 不回退：按 author_affiliation 文本模糊匹配需要扫描全部论文
+        print(f"[repo] 按机构查询RPC失败: {e}")
+        raise RuntimeError("按机构查询不可用，请先执行 sql/019_affiliations.sql") from e
+    return _page_result(rows, size, offset, _affiliation_rows_to_articles)
+
+
+def get_analysis_results_scan(
+    *, date: str | dt.date, category: str, prompt_id: str, limit: Optional[int] = None,
+    time_filter: Optional[str] = None, batch_filter: Optional[List[int]] = None
+) -> List[Dict[str, Any]]:
+    """旧实现：读取分类下全部 paper_id 与该 prompt 的全部分析结果后在内存中过滤（RPC 不可用时的回退）。"""
     db = app_schema()
     date_str = _ensure_date(date)
     category_id = upsert_category(category)
@@ -750,7 +1243,38 @@ def _parse_ingest_time(timestamp_str: str) -> datetime:
     return datetime.fromisoformat(clean_ts)
 
 def get_ingest_batches(date: str | dt.date, category: str) -> Dict[str, Any]:
-    """获取指定日期和分类的ingest批次信息"""
+    """获取指定日期和分类的ingest批次信息（同一小时内导入的论文为一批）
+
+    优先调用 SQL 函数 list_ingest_batches（sql/015，分组在库内完成，每批一行）；
+    函数不可用时回退到读取全部论文后在 Python 中分组的旧实现。
+    """
+    date_str = _ensure_date(date)
+    try:
+        rows = _rpc_all_rows("list_ingest_batches", {"p_date": date_str, "p_category": category})
+    except Exception as e:
+        print(f"[repo] 批次分组RPC查询失败，回退到逐行分组: {e}")
+        return get_ingest_batches_scan(date, category)
+
+    batch_info = []
+    for i, r in enumerate(rows, 1):
+        batch_start = _parse_ingest_time(r["start_time"])
+        batch_info.append({
+            'batch_id': i,
+            'batch_label': batch_start.strftime('%m-%d %H:%M'),
+            'start_time': batch_start.isoformat(),
+            'paper_count': r["paper_count"],
+            'paper_ids': r["paper_ids"],
+        })
+    return {
+        'date': date_str,
+        'category': category,
+        'total_papers': sum(b['paper_count'] for b in batch_info),
+        'batch_count': len(batch_info),
+        'batches': batch_info
+    }
+
+
+def get_ingest_batches_scan(date: str | dt.date, category: str) -> Dict[str, Any]:
     from datetime import datetime, timedelta
     
     db = app_schema()
@@ -1130,13 +1654,46 @@ def get_analysis_status_optimized(date: str | dt.date, category: str, prompt_id:
 
 
 def get_analysis_status(date: str | dt.date, category: str, prompt_id: str) -> Dict[str, int]:
-    """获取指定日期和分类的分析进度状态（入口函数）。"""
-    # 回退到原始版本，确保功能正确性优先
-    return get_analysis_status_original(date, category, prompt_id)
+    """获取指定日期和分类的分析进度状态（入口函数）。
+
+    优先读取触发器维护的计数表（sql/013，RPC get_analysis_status_counts，主键查找）；
+    计数表不可用时回退到原始版本逐行统计。
+    """
+    try:
+        rows = (
+            app_schema()
+            .rpc("get_analysis_status_counts", {"p_date": _ensure_date(date), "p_category": category, "p_prompt_id": prompt_id})
+            .execute()
+            .data
+        )
+        if not rows:
+            return {"total": 0, "completed": 0, "pending": 0}
+        row = rows[0]
+        return {"total": int(row["total"]), "completed": int(row["completed"]), "pending": int(row["pending"])}
+    except Exception as e:
+        print(f"[repo] 进度计数表查询失败，回退到逐行统计: {e}")
+        return get_analysis_status_original(date, category, prompt_id)
+
+
+def list_available_date_counts() -> List[Dict[str, Any]]:
+    """可用日期及各分类论文数（日期降序）：[{date, category_counts: {分类: 篇数}}]。
+
+    读取计数表汇总（sql/014，RPC list_available_dates），行数只与日期数相关。
+    """
+    rows = _rpc_all_rows("list_available_dates", {})
+    return [{"date": r["update_date"], "category_counts": r.get("category_counts") or {}} for r in rows]
 
 
 def list_available_dates() -> List[str]:
     """Return distinct update_date values (as ISO strings) sorted desc."""
+    try:
+        return [r["date"] for r in list_available_date_counts()]
+    except Exception as e:
+        print(f"[repo] 日期汇总RPC查询失败，回退到扫描 papers: {e}")
+        return list_available_dates_scan()
+
+
+def list_available_dates_scan() -> List[str]:
     db = app_schema()
     rows = db.from_("papers").select("update_date").order("update_date", desc=True).execute().data
     seen: set[str] = set()
@@ -1152,27 +1709,69 @@ def list_available_dates() -> List[str]:
     return result
 
 
+# =====================
+# 月度分区维护（sql/018）
+# =====================
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+
+
+def ensure_partitions(date_from: Optional[str | dt.date] = None, months_ahead: Optional[int] = None) -> int:
+    """确保 papers / analysis_results 从 date_from 所在月（默认当前月）到之后 months_ahead 个月都有分区。
+
+    调用 SQL 函数 ensure_monthly_partitions（幂等，已存在的分区跳过），返回新建的分区数；
+    失败时只打印警告：缺少分区的数据会落入默认分区，建好分区后自动搬入。
+    """
+    try:
+        created = (
+            app_schema()
+            .rpc("ensure_monthly_partitions", {
+                "p_from": _ensure_date(date_from) if date_from else None,
+                "p_months_ahead": PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead,
+            })
+            .execute()
+            .data
+        ) or 0
+    except Exception as e:
+        print(f"⚠️  [分区] 检查月分区失败: {e}")
+        return 0
+    if created:
+        print(f"🗂️  [分区] 新建 {created} 个月分区")
+    return int(created)
+
+
 # =====================
 # 批量写入/查询 加速接口
 # =====================
 
 def get_papers_by_arxiv_ids(arxiv_ids: List[str]) -> List[Dict[str, Any]]:
+    """按 base id 查找论文（任意版本都能命中）。
+
+    每个命中的传入ID返回一行 {paper_id, arxiv_id(传入形式), stored_arxiv_id(库中形式)}，
+    调用方可以直接用传入的ID建立映射。
+    """
     db = app_schema()
     if not arxiv_ids:
         return []
+    by_base: Dict[str, List[str]] = {}
+    for aid in arxiv_ids:
+        by_base.setdefault(arxiv_base_id(aid), []).append(aid)
+    bases = list(by_base)
     # PostgREST in() 最多参数可能有限制，做一下分块
     result: List[Dict[str, Any]] = []
     chunk_size = 500
-    for i in range(0, len(arxiv_ids), chunk_size):
-        chunk = arxiv_ids[i:i + chunk_size]
+    for i in range(0, len(bases), chunk_size):
+        chunk = bases[i:i + chunk_size]
         rows = (
             db.from_("papers")
-            .select("paper_id, arxiv_id")
-            .in_("arxiv_id", chunk)
+            .select("paper_id, arxiv_id, arxiv_base_id")
+            .in_("arxiv_base_id", chunk)
             .execute()
             .data
         )
-        result.extend(rows)
+        for r in rows:
+            for requested in dict.fromkeys(by_base.get(r["arxiv_base_id"], [])):
+                result.append({"paper_id": r["paper_id"], "arxiv_id": requested, "stored_arxiv_id": r["arxiv_id"]})
     return result
 
 
@@ -1181,59 +1780,104 @@ def upsert_papers_bulk(rows: List[Dict[str, Any]]) -> Dict[str, int]:
 
     策略：
       1) 先查已有 arxiv_id → paper_id（一次或分块）
-      2) 仅对缺失的执行批量 upsert/insert（带 returning），再整体 select 一次获得完整映射
+      2) 仅对缺失的执行批量 upsert（经 bulk_writer 自适应分块并发写入），再整体 select 一次获得完整映射
+
+    有行因数据错误被跳过，或请求成功但被 sql/018 的触发器跳过（同一论文已以其它日期登记）时，
+    抛 bulk_writer.BulkWriteError（failed / dropped 分别列出），其 result 为已写入部分的映射。
     """
-    import time
-    db = app_schema()
     if not rows:
         return {}
+    if pg_backend.enabled():
+        mapping, dropped = pg_backend.upsert_papers(rows, arxiv_base_id)
+        if dropped:
+            raise bulk_writer.BulkWriteError("论文写入", [], mapping, dropped=dropped)
+        return mapping
+    db = app_schema()
 
     all_arxiv_ids = [r["arxiv_id"] for r in rows if r.get("arxiv_id")]
     existing = get_papers_by_arxiv_ids(all_arxiv_ids)
     arxiv_to_id: Dict[str, int] = {r["arxiv_id"]: r["paper_id"] for r in existing}
 
-    missing_rows = [r for r in rows if r["arxiv_id"] not in arxiv_to_id]
+    # 同一批中同一论文的多个版本只写一行（保留最后出现的），避免 upsert 冲突同一行两次
+    missing_by_base: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        if r["arxiv_id"] not in arxiv_to_id:
+            missing_by_base[arxiv_base_id(r["arxiv_id"])] = r
+    missing_rows = list(missing_by_base.values())
+    failed: List[Dict[str, Any]] = []
     if missing_rows:
-        # 🚀 对大量论文进行分块处理，避免单次请求过大
-        chunk_size = 50  # 减小论文写入的分块大小
-        
-        if len(missing_rows) > chunk_size:
-            print(f"[论文写入] 分块处理 {len(missing_rows)} 条新论文")
-        
-        for i in range(0, len(missing_rows), chunk_size):
-            chunk = missing_rows[i:i + chunk_size]
-            chunk_start = time.time()
-            
-            # 添加重试机制
-            retry_count = 0
-            max_retries = 3
-            while retry_count < max_retries:
-                try:
-                    db.from_("papers").upsert(chunk, on_conflict="arxiv_id").execute()
-                    break
-                except Exception as e:
-                    retry_count += 1
-                    if "Connection reset by peer" in str(e) and retry_count < max_retries:
-                        print(f"[论文写入] 块 {i//chunk_size + 1} 连接重置，重试 {retry_count}/{max_retries}")
-                        time.sleep(2)
-                        continue
-                    elif retry_count >= max_retries:
-                        # 最后尝试使用insert
-                        try:
-                            db.from_("papers").insert(chunk).execute()
-                            break
-                        except Exception:
-                            raise e
-                    else:
-                        raise e
-            
-            chunk_time = time.time() - chunk_start
-            if chunk_time > 3:
-                print(f"[论文写入] 块 {i//chunk_size + 1} 完成，耗时: {chunk_time:.2f}s")
+        failed = bulk_writer.write_chunks(
+            "论文写入",
+            missing_rows,
+            lambda chunk: db.from_("papers").upsert(chunk, on_conflict="arxiv_base_id,update_date").execute(),
+        )["failed"]
 
     # 统一再 select 一次，得到完整映射
     final_rows = get_papers_by_arxiv_ids(all_arxiv_ids)
     final_map: Dict[str, int] = {r["arxiv_id"]: r["paper_id"] for r in final_rows}
+    dropped = _dropped_rows([r for r in missing_rows if not any(r is f for f in failed)], final_map)
+    if failed or dropped:
+        raise bulk_writer.BulkWriteError("论文写入", failed, final_map, dropped=dropped)
+    return final_map
+
+
+def _dropped_rows(sent: List[Dict[str, Any]], final_map: Dict[str, int]) -> List[Dict[str, Any]]:
+    """写入请求成功、但论文不存在或以其它日期登记的行（被 sql/018 的 BEFORE INSERT 触发器跳过）。"""
+    if not sent:
+        return []
+    dates = get_paper_dates([final_map[r["arxiv_id"]] for r in sent if r["arxiv_id"] in final_map])
+    return [
+        r for r in sent
+        if r["arxiv_id"] not in final_map or str(dates.get(final_map[r["arxiv_id"]])) != str(r.get("update_date"))
+    ]
+
+
+def overwrite_papers_bulk(rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """覆盖写入 papers（导入 skip_if_exists=False），返回 arxiv_id -> paper_id 的映射。
+
+    papers 按月分区后，BEFORE INSERT 触发器会跳过 base id 已登记的行（sql/018），upsert 无法覆盖已有论文：
+    已存在的论文由 SQL 函数 overwrite_papers（sql/020）按 paper_keys 定位后成批 update 传入字段
+    （日期变化时行随之移动分区），不存在的交给 upsert_papers_bulk 插入。
+    有行未写入时抛 bulk_writer.BulkWriteError（result 为映射）。
+    """
+    if not rows:
+        return {}
+    if pg_backend.enabled():
+        mapping, dropped = pg_backend.overwrite_papers(rows, arxiv_base_id)
+        if dropped:
+            raise bulk_writer.BulkWriteError("论文覆盖", [], mapping, dropped=dropped)
+        return mapping
+    db = app_schema()
+
+    # 同一论文的多个版本只保留最后出现的一行
+    by_base: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        if r.get("arxiv_id"):
+            by_base[arxiv_base_id(r["arxiv_id"])] = r
+
+    updated = set()  # overwrite_papers 返回的已更新 base id
+
+    def send(chunk: List[Dict[str, Any]]) -> None:
+        res = db.rpc("overwrite_papers", {"p_rows": chunk}).execute()
+        updated.update(r["arxiv_base_id"] for r in (res.data or []))
+
+    stats = bulk_writer.write_chunks("论文覆盖", list(by_base.values()), send)
+    failed: List[Dict[str, Any]] = list(stats["failed"])
+    dropped: List[Dict[str, Any]] = []
+
+    failed_bases = {arxiv_base_id(r["arxiv_id"]) for r in failed}
+    new_rows = [row for base, row in by_base.items() if base not in updated and base not in failed_bases]
+    if new_rows:
+        try:
+            upsert_papers_bulk(new_rows)
+        except bulk_writer.BulkWriteError as e:
+            failed.extend(e.failed)
+            dropped.extend(e.dropped)
+
+    final_rows = get_papers_by_arxiv_ids([r["arxiv_id"] for r in rows if r.get("arxiv_id")])
+    final_map = {r["arxiv_id"]: r["paper_id"] for r in final_rows}
+    if failed or dropped:
+        raise bulk_writer.BulkWriteError("论文覆盖", failed, final_map, dropped=dropped)
     return final_map
 
 
@@ -1257,10 +1901,13 @@ def get_categories_by_names(names: List[str]) -> List[Dict[str, Any]]:
 
 
 def upsert_categories_bulk(names: List[str]) -> Dict[str, int]:
-    db = app_schema()
     if not names:
         return {}
     uniq = sorted({n for n in names if n})
+    known = registry.known_categories(uniq)
+    if len(known) == len(uniq):
+        return known
+    db = app_schema()
     existing = get_categories_by_names(uniq)
     name_to_id: Dict[str, int] = {r["category_name"]: r["category_id"] for r in existing}
 
@@ -1275,57 +1922,26 @@ def upsert_categories_bulk(names: List[str]) -> Dict[str, int]:
     # fetch all
     final_rows = get_categories_by_names(uniq)
     final_map: Dict[str, int] = {r["category_name"]: r["category_id"] for r in final_rows}
+    registry.remember_categories(final_map)
     return final_map
 
 
 def upsert_paper_categories_bulk(pairs: List[Tuple[int, int]]) -> None:
-    """批量 upsert paper_categories，pairs 为 (paper_id, category_id)。"""
-    import time
-    db = app_schema()
+    """批量 upsert paper_categories，pairs 为 (paper_id, category_id)；有关联被跳过时抛 bulk_writer.BulkWriteError。"""
     if not pairs:
         return
-    rows = [{"paper_id": p, "category_id": c} for p, c in pairs]
-    
-    # 🚀 优化：对大量关联进行分块处理，避免单次请求过大
-    chunk_size = 100  # 进一步减小分块，避免超时
-    total_chunks = (len(rows) + chunk_size - 1) // chunk_size
-    
-    if len(rows) > chunk_size:
-        print(f"[批处理] 分 {total_chunks} 块处理 {len(rows)} 个分类关联")
-    
-    for i in range(0, len(rows), chunk_size):
-        chunk = rows[i:i + chunk_size]
-        chunk_start = time.time()
-        try:
-            # 添加超时重试机制
-            retry_count = 0
-            max_retries = 3
-            while retry_count < max_retries:
-                try:
-                    db.from_("paper_categories").upsert(chunk, on_conflict="paper_id,category_id").execute()
-                    break
-                except Exception as e:
-                    retry_count += 1
-                    if "Connection reset by peer" in str(e) and retry_count < max_retries:
-                        print(f"[批处理] 块 {i//chunk_size + 1} 连接重置，重试 {retry_count}/{max_retries}")
-                        time.sleep(2)  # 等待2秒后重试
-                        continue
-                    else:
-                        raise e
-            
-            chunk_time = time.time() - chunk_start
-            if chunk_time > 5:  # 如果单块耗时超过5秒，记录日志
-                print(f"[批处理] 块 {i//chunk_size + 1}/{total_chunks} 完成，耗时: {chunk_time:.2f}s")
-                
-        except Exception as e:
-            # 退化：逐条插入，遇到重复则忽略
-            print(f"[批处理] 块 {i//chunk_size + 1} upsert失败，退化为逐条插入: {e}")
-            for row in chunk:
-                try:
-                    db.from_("paper_categories").insert([row]).execute()
-                except Exception:
-                    # 忽略重复错误
-                    pass
+    if pg_backend.enabled():
+        pg_backend.upsert_paper_categories(pairs)
+        return
+    db = app_schema()
+    rows = [{"paper_id": p, "category_id": c} for p, c in dict.fromkeys(pairs)]
+    failed = bulk_writer.write_chunks(
+        "批处理",
+        rows,
+        lambda chunk: db.from_("paper_categories").upsert(chunk, on_conflict="paper_id,category_id").execute(),
+    )["failed"]
+    if failed:
+        raise bulk_writer.BulkWriteError("批处理", failed)
 
 
 def count_analyzed_papers_by_ids(paper_ids: List[int], prompt_id: str) -> int:
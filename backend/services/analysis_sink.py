@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+分析结果批量写入服务
+
+分析线程调用 add() 只把结果放进内存缓冲区，不访问数据库；
+后台刷写线程在攒够 batch_size 条或距上次刷写超过 flush_interval 秒时
+调用 repo.insert_analysis_results_bulk 一次写入整批。任务结束时 close() 做最后一次刷写。
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.db import repo as db_repo
+
+
+ANALYSIS_SINK_BATCH_SIZE = int(os.getenv("ANALYSIS_SINK_BATCH_SIZE", "20"))
+ANALYSIS_SINK_FLUSH_SECONDS = float(os.getenv("ANALYSIS_SINK_FLUSH_SECONDS", "2"))
+
+
+class AnalysisResultSink:
+    """分析结果缓冲区 + 后台刷写线程（可用作 with 上下文）。"""
+
+    def __init__(self, batch_size: Optional[int] = None, flush_interval: Optional[float] = None, name: str = "analysis"):
+        self.batch_size = max(1, batch_size or ANALYSIS_SINK_BATCH_SIZE)
+        self.flush_interval = flush_interval if flush_interval is not None else ANALYSIS_SINK_FLUSH_SECONDS
+        self.name = name
+        self._buffer: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self.analysis_ids: Dict[int, int] = {}
+        self.stats = {"queued": 0, "written": 0, "skipped": 0, "failed": 0, "batches": 0}
+        self._thread = threading.Thread(target=self._loop, name=f"analysis-sink-{name}", daemon=True)
+        self._thread.start()
+
+    def add(self, *, paper_id: int, prompt_id: str, analysis_json: Dict[str, Any], created_by: Optional[str] = None) -> None:
+        """加入缓冲区（不阻塞等待数据库）；同一 (paper_id, prompt_id) 只保留第一条。"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("AnalysisResultSink 已关闭")
+            key = (paper_id, prompt_id)
+            if key in self._buffer:
+                return
+            self._buffer[key] = {
+                "paper_id": paper_id,
+                "prompt_id": prompt_id,
+                "analysis_result": analysis_json,
+                "created_by": created_by,
+            }
+            self.stats["queued"] += 1
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not self._closed and len(self._buffer) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def flush(self) -> int:
+        """立即写出缓冲区中的全部结果，返回本次写入的条数。"""
+        with self._flush_lock:
+            with self._cond:
+                rows: List[Dict[str, Any]] = list(self._buffer.values())
+                self._buffer = {}
+            if not rows:
+                return 0
+            start = time.time()
+            failed = 0
+            try:
+                inserted = db_repo.insert_analysis_results_bulk(rows)
+            except Exception as e:
+                # 批量失败：逐条写入，单条失败只计数不影响其它结果
+                print(f"⚠️  [结果写入] {self.name} 批量写入 {len(rows)} 条失败，改为逐条写入: {e}")
+                inserted = {}
+                for row in rows:
+                    analysis_id = db_repo.insert_analysis_result(
+                        paper_id=row["paper_id"],
+                        prompt_id=row["prompt_id"],
+                        analysis_json=row["analysis_result"],
+                        created_by=row["created_by"],
+                    )
+                    if analysis_id is not None:
+                        inserted[row["paper_id"]] = analysis_id
+                    else:
+                        failed += 1
+            self.analysis_ids.update(inserted)
+            self.stats["written"] += len(inserted)
+            self.stats["failed"] += failed
+            self.stats["skipped"] += len(rows) - len(inserted) - failed   # 库中已存在
+            self.stats["batches"] += 1
+            print(f"💾 [结果写入] {self.name} 写入 {len(inserted)}/{len(rows)} 条，耗时 {time.time() - start:.2f}s")
+            return len(inserted)
+
+    def close(self) -> Dict[str, int]:
+        """停止刷写线程并写出剩余结果（任务结束时调用），返回统计。"""
+        with self._cond:
+            if self._closed:
+                return dict(self.stats)
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+        return dict(self.stats)
+
+    def __enter__(self) -> "AnalysisResultSink":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
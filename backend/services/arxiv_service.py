@@ -6,15 +6,38 @@ arXiv 数据导入服务
 """
 
 import datetime as dt
+import io
 import os
+import queue
 import re
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+import time
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
+from typing import List, Dict, Any, Callable, Iterator, Optional, Sequence, Tuple
 
 import feedparser
-import pytz
-import requests
 
+from backend.clients.arxiv_client import (
+    ArxivQueryPages,
+    build_multi_category_queries,
+    build_submitted_date_query,
+    compute_announcement_window,
+    configured_categories,
+    next_announcement_after,
+)
 from backend.db import repo as db_repo
+from backend.db.bulk_writer import BulkWriteError
+
+
+_ATOM_NS = "{http://www.w3.org/2005/Atom}"
+_ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+
+# 流式导入：每批写库的行数
+STREAM_BATCH_SIZE = int(os.getenv("ARXIV_STREAM_BATCH_SIZE", "200"))
+# 增量导入：水位线回看时长（容忍 arXiv 索引延迟），以及窗口结束后的下一次公告之后多久视为当日数据已定型
+WATERMARK_OVERLAP = dt.timedelta(minutes=int(os.getenv("ARXIV_WATERMARK_OVERLAP_MINUTES", "30")))
+WATERMARK_SETTLE = dt.timedelta(hours=float(os.getenv("ARXIV_WATERMARK_SETTLE_HOURS", "2")))
 
 
 def _extract_arxiv_id(entry: Any) -> Optional[str]:
@@ -68,11 +91,309 @@ def _extract_all_categories(entry: Any) -> List[str]:
     return cats
 
 
+def _entry_to_row(entry: Any, target_date_str: str) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+    """将一条 feed entry 转换为 papers 行及其全部分类；无法解析 arxiv_id 时返回 None。"""
+    arxiv_id = _extract_arxiv_id(entry)
+    if not arxiv_id:
+        return None
+    title = (entry.title or "").strip().replace("\n", " ")
+    authors = ", ".join(a.name for a in getattr(entry, "authors", []) if getattr(a, "name", None))
+    abstract = (entry.summary or "").strip().replace("\n", " ")
+    link = getattr(entry, "link", f"https://arxiv.org/abs/{arxiv_id}")
+
+    row: Dict[str, Any] = {
+        "arxiv_id": arxiv_id,
+        "title": title,
+        "authors": authors,
+        "abstract": abstract,
+        "link": link,
+        "update_date": target_date_str,
+        "primary_category": _extract_primary_category(entry),
+    }
+    if getattr(entry, "updated_parsed", None):
+        t = dt.datetime(*entry.updated_parsed[:6])  # naive UTC
+        row["update_time"] = t.time().isoformat()
+    return row, _extract_all_categories(entry)
+
+
+def _element_text(elem: ET.Element, tag: str) -> str:
+    child = elem.find(tag)
+    return child.text if child is not None and child.text else ""
+
+
+def _parse_atom_time(value: str) -> Optional[time.struct_time]:
+    if not value:
+        return None
+    try:
+        return time.strptime(value.strip(), "%Y-%m-%dT%H:%M:%SZ")
+    except ValueError:
+        return None
+
+
+def _element_to_entry(elem: ET.Element) -> SimpleNamespace:
+    """把 <entry> 元素转换为与 feedparser entry 同形的对象，便于复用上面的提取函数。"""
+    link = ""
+    for link_elem in elem.findall(f"{_ATOM_NS}link"):
+        if link_elem.get("rel", "alternate") == "alternate" and link_elem.get("href"):
+            link = link_elem.get("href")
+            break
+
+    primary = elem.find(f"{_ARXIV_NS}primary_category")
+    entry = SimpleNamespace(
+        id=_element_text(elem, f"{_ATOM_NS}id"),
+        title=_element_text(elem, f"{_ATOM_NS}title"),
+        summary=_element_text(elem, f"{_ATOM_NS}summary"),
+        authors=[
+            SimpleNamespace(name=_element_text(a, f"{_ATOM_NS}name"))
+            for a in elem.findall(f"{_ATOM_NS}author")
+        ],
+        published_parsed=_parse_atom_time(_element_text(elem, f"{_ATOM_NS}published")),
+        updated_parsed=_parse_atom_time(_element_text(elem, f"{_ATOM_NS}updated")),
+        arxiv_primary_category={"term": primary.get("term")} if primary is not None else None,
+        tags=[{"term": c.get("term")} for c in elem.findall(f"{_ATOM_NS}category") if c.get("term")],
+    )
+    if link:
+        entry.link = link
+    return entry
+
+
+def _iter_feed_entries(body: bytes) -> Iterator[SimpleNamespace]:
+    """增量解析一页 Atom feed：边解析边产出 entry，已产出的元素立即从树上释放，不构建整页的元素树。"""
+    root: Optional[ET.Element] = None
+    for event, elem in ET.iterparse(io.BytesIO(body), events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag == f"{_ATOM_NS}entry":
+            yield _element_to_entry(elem)
+            # 只保留正在解析的节点，丢弃已处理的 entry
+            root.clear()
+
+
+def _iter_pager_entries(pager: ArxivQueryPages) -> Iterator[SimpleNamespace]:
+    # 每页响应经 feed 缓存整体落盘后才返回，解析在整页下载完成后进行
+    for body in pager:
+        yield from _iter_feed_entries(body)
+
+
+def _skipped_rows(write: Callable[[], Any]) -> int:
+    """执行一次 repo 批量写入，返回未写入的行数（数据错误或被触发器跳过）；其他异常照常抛出。"""
+    try:
+        write()
+    except BulkWriteError as e:
+        print(f"⚠️ {e}")
+        return len(e.skipped)
+    return 0
+
+
+def _write_rows_batch(
+    rows: List[Dict[str, Any]],
+    arxiv_to_categories: Dict[str, List[str]],
+    target_date_str: str,
+    skip_if_exists: bool,
+    cat_name_to_id: Dict[str, int],
+) -> Tuple[int, int, int]:
+    """写入一批已解析的论文及其分类关联，返回 (upsert 数, 关联数, 跳过的行数)。
+
+    cat_name_to_id 在批次间共享，只对新出现的分类名调用 upsert_categories_bulk。
+    """
+    from backend.db.client import app_schema
+
+    ids = [r["arxiv_id"] for r in rows]
+    existing_set = {r["arxiv_id"] for r in db_repo.get_papers_by_arxiv_ids(ids)}
+
+    skipped = 0
+    if skip_if_exists:
+        items_for_write = [r for r in rows if r["arxiv_id"] not in existing_set]
+        if items_for_write:
+            skipped += _skipped_rows(lambda: db_repo.upsert_papers_bulk(items_for_write))
+        if existing_set:
+            try:
+                existing_bases = sorted({db_repo.arxiv_base_id(aid) for aid in existing_set})
+                app_schema().from_("papers").update({"update_date": target_date_str}).in_("arxiv_base_id", existing_bases).execute()
+            except Exception as e:
+                print(f"轻量更新 existing papers.update_date 失败: {e}")
+    else:
+        items_for_write = rows
+        skipped += _skipped_rows(lambda: db_repo.overwrite_papers_bulk(rows))
+
+    arxiv_to_paper_id = {r["arxiv_id"]: r["paper_id"] for r in db_repo.get_papers_by_arxiv_ids(ids)}
+
+    new_names = sorted({c for aid in ids for c in arxiv_to_categories.get(aid, []) if c not in cat_name_to_id})
+    if new_names:
+        cat_name_to_id.update(db_repo.upsert_categories_bulk(new_names))
+
+    pairs: List[Tuple[int, int]] = []
+    for aid in ids:
+        pid = arxiv_to_paper_id.get(aid)
+        if not pid:
+            continue
+        for cat in arxiv_to_categories.get(aid, []):
+            cid = cat_name_to_id.get(cat)
+            if cid:
+                pairs.append((pid, cid))
+    if pairs:
+        skipped += _skipped_rows(lambda: db_repo.upsert_paper_categories_bulk(pairs))
+    return len(items_for_write), len(pairs), skipped
+
+
+def _import_arxiv_papers_stream(
+    pagers: Sequence[ArxivQueryPages],
+    target_date_str: str,
+    start_utc: dt.datetime,
+    end_utc: dt.datetime,
+    limit: Optional[int],
+    skip_if_exists: bool,
+) -> Dict[str, Any]:
+    """流式导入：逐页解析响应体，攒满一批即交给写库线程。
+
+    重叠发生在页与页之间：每页整体下载完成后才解析，解析与写库期间后续页面在分页窗口内并行下载。
+    分页窗口与写库队列均有界，峰值内存只与页大小、批大小有关。
+    传入多个查询时依次遍历，跨查询重复的论文只处理一次。
+    """
+    start_time = time.time()
+    batch_queue: "queue.Queue[Optional[Tuple[List[Dict[str, Any]], Dict[str, List[str]]]]]" = queue.Queue(maxsize=2)
+    totals = {"upsert": 0, "link": 0, "skipped": 0}
+    writer_errors: List[BaseException] = []
+    cat_name_to_id: Dict[str, int] = {}
+    first_write_at: List[float] = []
+
+    def writer() -> None:
+        while True:
+            item = batch_queue.get()
+            if item is None:
+                return
+            if writer_errors:
+                continue  # 已失败：继续取空队列，避免生产者阻塞
+            rows, cats = item
+            try:
+                upserted, linked, skipped = _write_rows_batch(rows, cats, target_date_str, skip_if_exists, cat_name_to_id)
+                totals["upsert"] += upserted
+                totals["link"] += linked
+                totals["skipped"] += skipped
+                if not first_write_at:
+                    first_write_at.append(time.time() - start_time)
+            except BaseException as e:  # 交给主线程处理
+                writer_errors.append(e)
+
+    writer_thread = threading.Thread(target=writer, name="arxiv-stream-writer", daemon=True)
+    writer_thread.start()
+
+    kept = 0
+    seen = 0
+    limited = False
+    errors = 0
+    batches = 0
+    rows: List[Dict[str, Any]] = []
+    cats: Dict[str, List[str]] = {}
+    seen_ids = set()
+    category_counts: Dict[str, int] = {}
+    max_published: Optional[dt.datetime] = None
+
+    def flush() -> None:
+        nonlocal rows, cats, batches
+        if rows:
+            batch_queue.put((rows, cats))
+            batches += 1
+            rows, cats = [], {}
+
+    try:
+        for entry in (e for pager in pagers for e in _iter_pager_entries(pager)):
+            if writer_errors:
+                break
+            seen += 1
+            if not entry.published_parsed:
+                continue
+            pub_utc = dt.datetime(*entry.published_parsed[:6], tzinfo=dt.timezone.utc)
+            if not (start_utc <= pub_utc <= end_utc):
+                continue
+            if limit is not None and kept >= limit:
+                print(f"按limit截断为 {kept} 条")
+                limited = True
+                break
+            kept += 1
+            if max_published is None or pub_utc > max_published:
+                max_published = pub_utc
+            try:
+                parsed = _entry_to_row(entry, target_date_str)
+            except Exception as e:
+                errors += 1
+                print(f"[{seen}] ❌ 预处理失败: {e}")
+                continue
+            if parsed is None:
+                print(f"[{seen}] 跳过：无法解析arxiv_id | id={getattr(entry, 'id', '')}")
+                continue
+            row, all_categories = parsed
+            if row["arxiv_id"] in seen_ids:
+                kept -= 1
+                continue
+            seen_ids.add(row["arxiv_id"])
+            for cat in all_categories:
+                category_counts[cat] = category_counts.get(cat, 0) + 1
+            rows.append(row)
+            cats[row["arxiv_id"]] = all_categories
+            if len(rows) >= STREAM_BATCH_SIZE:
+                flush()
+        flush()
+    finally:
+        batch_queue.put(None)
+        writer_thread.join()
+
+    if writer_errors:
+        raise writer_errors[0]
+    if not limited:
+        for pager in pagers:
+            pager.report()
+
+    total_time = time.time() - start_time
+    first_write = f"{first_write_at[0]:.2f}s" if first_write_at else "-"
+    print(
+        f"⏱️  [导入性能] 流式导入完成，耗时: {total_time:.2f}s | 首批写入: {first_write} | "
+        f"读取 {seen} 条，保留 {kept} 条，{batches} 批 | upsert={totals['upsert']} link={totals['link']}"
+    )
+    return {
+        "total_upsert": totals["upsert"],
+        "total_link": totals["link"],
+        "errors": errors + totals["skipped"],
+        "processed": kept,
+        "truncated": any(p.truncated for p in pagers) and not limited,
+        "category_counts": category_counts,
+        "max_published": max_published,
+        "source": "api",
+    }
+
+
+def _parse_db_time(value: str) -> dt.datetime:
+    """解析 PostgREST 返回的 timestamptz 字符串为 UTC aware datetime。"""
+    parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+    return parsed.astimezone(dt.timezone.utc)
+
+
+def _advance_watermarks(
+    target_date_str: str, categories: List[str], stats: Dict[str, Any], end_utc: dt.datetime
+) -> None:
+    """完整导入成功后推进水位线（没有新论文时只刷新成功时间）。
+
+    结果被截断、有错误，或数据并非来自分页 API（如 feedparser 回退只取到第一页）时不写入，
+    避免空结果把当日误标为已定型。
+    """
+    if stats.get("truncated") or stats.get("errors") or stats.get("source") != "api":
+        return
+    db_repo.set_ingest_watermarks(
+        target_date_str, categories, stats.get("max_published"), end_utc, stats.get("processed", 0)
+    )
+
+
 def import_arxiv_papers(
     target_date_str: str,
     category: str = "cs.CV",
     limit: Optional[int] = None,
     skip_if_exists: bool = True,
+    stream: Optional[bool] = None,
+    incremental: bool = False,
 ) -> Dict[str, Any]:
     """
     从 arXiv 导入指定日期和分类的论文数据
@@ -82,59 +403,73 @@ def import_arxiv_papers(
         category: arXiv 分类 (如 cs.CV)
         limit: 限制导入数量
         skip_if_exists: 是否跳过已存在的论文
+        stream: 是否使用流式导入（边下载边解析边写库）；默认读取环境变量 ARXIV_STREAM_INGEST（默认开启）
+        incremental: 是否按导入水位线增量导入（只查询上次成功导入之后的提交）
         
     Returns:
-        Dict: 导入统计信息
+        Dict: 导入统计信息（增量导入时 processed 只统计本次新增部分）
     """
-    import time
     target_date = dt.datetime.strptime(target_date_str, "%Y-%m-%d").date()
-    et_tz = pytz.timezone("US/Eastern")
-
-    start_et = et_tz.localize(dt.datetime.combine(target_date - dt.timedelta(days=1), dt.time(20, 0)))
-    end_et = et_tz.localize(dt.datetime.combine(target_date, dt.time(20, 0)))
-
-    start_utc = start_et.astimezone(dt.timezone.utc)
-    end_utc = end_et.astimezone(dt.timezone.utc)
-
-    start_date_str = start_utc.strftime("%Y%m%d%H%M%S")
-    end_date_str = end_utc.strftime("%Y%m%d%H%M%S")
-
-    base = os.getenv("ARXIV_API_BASE", "https://export.arxiv.org/api/query")
-    url = (
-        f"{base}?"
-        f"search_query=cat:{category}+AND+submittedDate:[{start_date_str}+TO+{end_date_str}]&"
-        "sortBy=submittedDate&sortOrder=descending&"
-        "max_results=2000"
-    )
+    start_et, end_et, start_utc, end_utc = compute_announcement_window(target_date)
+
+    query_start_utc = start_utc
+    if incremental:
+        watermark = db_repo.get_ingest_watermark(target_date_str, category)
+        if watermark:
+            last_success = _parse_db_time(watermark["last_success_at"])
+            # 窗口末尾的提交要到下一次公告才进入 API，之后完成过导入才算定型
+            if last_success >= next_announcement_after(end_utc) + WATERMARK_SETTLE:
+                print(f"⚡ [增量导入] {target_date_str} {category} 已在窗口公告后完成导入，跳过 arXiv 查询")
+                return {"total_upsert": 0, "total_link": 0, "errors": 0, "processed": 0, "truncated": False, "incremental": True}
+            mark = _parse_db_time(watermark["last_submitted_at"])
+            query_start_utc = max(start_utc, mark - WATERMARK_OVERLAP)
+            print(f"📈 [增量导入] 水位线: {mark} | 查询起点(UTC): {query_start_utc}")
+
+    pager = ArxivQueryPages(build_submitted_date_query(category, query_start_utc, end_utc))
+    url = pager.first_page_url
 
     print(f"目标日期(ET): {target_date} | 分类: {category}")
     print(f"窗口(ET): {start_et} ~ {end_et}")
     print(f"窗口(UTC): {start_utc} ~ {end_utc}")
     print(f"URL: {url}")
 
+    if stream is None:
+        stream = os.getenv("ARXIV_STREAM_INGEST", "true").lower() == "true"
+    if stream:
+        try:
+            stats = _import_arxiv_papers_stream([pager], target_date_str, start_utc, end_utc, limit, skip_if_exists)
+            if limit is None:
+                _advance_watermarks(target_date_str, [category], stats, end_utc)
+            return stats
+        except Exception as e:
+            # upsert 幂等，部分写入后回退全量路径也是安全的
+            print(f"⚠️  [导入性能] 流式导入失败，回退到整包解析: {e}")
+
     start_time = time.time()
+    pager = ArxivQueryPages(pager.search_query)
+    entries: List[Any] = []
+    fetch_failed = False
     try:
-        resp = requests.get(url, timeout=30)
-        resp.raise_for_status()
-        feed = feedparser.parse(resp.text)
+        for body in pager:
+            entries.extend(feedparser.parse(body).entries)
+        pager.report()
     except Exception as e:
-        print(f"requests获取失败，将尝试feedparser直连: {e}")
-        try:
-            feed = feedparser.parse(url)
-        except Exception as e2:
-            # 尝试http回退
-            http_url = url.replace("https://", "http://")
-            print(f"feedparser直连失败，尝试HTTP回退: {e2}")
-            feed = feedparser.parse(http_url)
-    api_time = time.time() - start_time if 'start_time' in locals() else 0
-    print(f"⏱️  [导入性能] API调用完成，耗时: {api_time:.2f}s | 返回 {len(feed.entries)} 条")
+        # 所有请求都经 ArxivQueryPages 走限流器；已取得的整页保留，
+        # 结果标记为不完整并计入 errors，不推进水位线
+        fetch_failed = True
+        print(f"⚠️  [arXiv分页] 第 {pager.pages + 1} 页获取失败，保留已收到的 {len(entries)} 条，结果不完整: {e}")
+    api_time = time.time() - start_time
+    print(f"⏱️  [导入性能] API调用完成，耗时: {api_time:.2f}s | 返回 {len(entries)} 条")
 
     filter_start = time.time()
     kept: List[Any] = []
-    for i, entry in enumerate(feed.entries):
+    max_published: Optional[dt.datetime] = None
+    for i, entry in enumerate(entries):
         pub_utc = dt.datetime(*entry.published_parsed[:6], tzinfo=dt.timezone.utc)
         if start_utc <= pub_utc <= end_utc:
             kept.append(entry)
+            if max_published is None or pub_utc > max_published:
+                max_published = pub_utc
 
     filter_time = time.time() - filter_start
     print(f"⏱️  [导入性能] 筛选完成，耗时: {filter_time:.2f}s | 保留 {len(kept)} 条")
@@ -149,40 +484,17 @@ def import_arxiv_papers(
     parse_start = time.time()
     parsed_items: List[Dict[str, Any]] = []
     arxiv_to_categories: Dict[str, List[str]] = {}
-    errors = 0
+    errors = 1 if fetch_failed else 0
 
     for idx, entry in enumerate(kept, start=1):
         try:
-            arxiv_id = _extract_arxiv_id(entry)
-            if not arxiv_id:
+            parsed = _entry_to_row(entry, target_date_str)
+            if parsed is None:
                 print(f"[{idx}] 跳过：无法解析arxiv_id | id={getattr(entry, 'id', '')}")
                 continue
-            title = (entry.title or "").strip().replace("\n", " ")
-            authors = ", ".join(a.name for a in getattr(entry, "authors", []) if getattr(a, "name", None))
-            abstract = (entry.summary or "").strip().replace("\n", " ")
-            link = getattr(entry, "link", f"https://arxiv.org/abs/{arxiv_id}")
-            primary_category = _extract_primary_category(entry)
-            all_categories = _extract_all_categories(entry)
-
-            upd_time = None
-            if getattr(entry, "updated_parsed", None):
-                t = dt.datetime(*entry.updated_parsed[:6])  # naive UTC
-                upd_time = t.time().isoformat()
-
-            row: Dict[str, Any] = {
-                "arxiv_id": arxiv_id,
-                "title": title,
-                "authors": authors,
-                "abstract": abstract,
-                "link": link,
-                "update_date": target_date_str,
-                "primary_category": primary_category,
-            }
-            if upd_time:
-                row["update_time"] = upd_time
-
+            row, all_categories = parsed
             parsed_items.append(row)
-            arxiv_to_categories[arxiv_id] = all_categories
+            arxiv_to_categories[row["arxiv_id"]] = all_categories
         except Exception as e:
             errors += 1
             print(f"[{idx}] ❌ 预处理失败: {e}")
@@ -206,14 +518,13 @@ def import_arxiv_papers(
     # 3) 批量 upsert/insert papers
     arxiv_to_paper_id: Dict[str, int] = {}
     if items_for_write:
+        # 映射在下方统一重新查询；被跳过的行计入 errors
         if skip_if_exists:
             # 仅补缺
-            arxiv_to_paper_id.update(db_repo.upsert_papers_bulk(items_for_write))
+            errors += _skipped_rows(lambda: db_repo.upsert_papers_bulk(items_for_write))
         else:
-            # 覆盖更新：直接 upsert 全量，再查询映射
-            from backend.db.client import app_schema
-            app_schema().from_("papers").upsert(items_for_write, on_conflict="arxiv_id").execute()
-            arxiv_to_paper_id.update({r["arxiv_id"]: r["paper_id"] for r in db_repo.get_papers_by_arxiv_ids(all_ids)})
+            # 覆盖更新：已存在的按 (paper_id, update_date) 更新，缺失的插入
+            errors += _skipped_rows(lambda: db_repo.overwrite_papers_bulk(items_for_write))
 
     # 对于已存在的 arxiv，仍需要：
     #  - 更新 update_date 为目标日（确保当天列表统计准确）
@@ -221,7 +532,8 @@ def import_arxiv_papers(
     if skip_if_exists and existing_set:
         try:
             from backend.db.client import app_schema
-            app_schema().from_("papers").update({"update_date": target_date_str}).in_("arxiv_id", list(existing_set)).execute()
+            existing_bases = sorted({db_repo.arxiv_base_id(aid) for aid in existing_set})
+            app_schema().from_("papers").update({"update_date": target_date_str}).in_("arxiv_base_id", existing_bases).execute()
         except Exception as e:
             print(f"轻量更新 existing papers.update_date 失败: {e}")
 
@@ -254,7 +566,7 @@ def import_arxiv_papers(
             print(f"⏱️  [导入性能] 为 {len(items_for_write)} 条新论文 + {len(all_ids) - len(items_for_write)} 条已存在论文建立 {len(pairs)} 个分类关联")
         else:
             print(f"⏱️  [导入性能] 为 {len(all_ids)} 条已存在论文补建 {len(pairs)} 个分类关联（可能有重复会被自动跳过）")
-        db_repo.upsert_paper_categories_bulk(pairs)
+        errors += _skipped_rows(lambda: db_repo.upsert_paper_categories_bulk(pairs))
     else:
         print(f"⚡ [导入性能] 无需建立分类关联")
     
@@ -284,12 +596,70 @@ def import_arxiv_papers(
     else:
         print(f"⏭️  [导入性能] 跳过详细日志输出（{total}条记录，如需查看设置 DEBUG_IMPORT=true）")
 
-    return {
+    stats = {
         "total_upsert": total_upsert,
         "total_link": total_link,
         "errors": errors,
         "processed": len(kept),
+        "truncated": pager.truncated or fetch_failed,
+        "max_published": max_published,
+        "source": "api",
     }
+    if limit is None:
+        _advance_watermarks(target_date_str, [category], stats, end_utc)
+    return stats
+
+
+def import_arxiv_papers_multi(
+    target_date_str: str,
+    categories: Optional[Sequence[str]] = None,
+    skip_if_exists: bool = True,
+) -> Dict[str, Any]:
+    """
+    一次导入多个分类某日的论文
+
+    多个分类合并为尽量少的 OR 查询，每篇论文只下载、解析、写库一次，
+    再按其全部分类建立关联，跨分类论文不会被重复处理。
+
+    Args:
+        target_date_str: 目标日期 (YYYY-MM-DD)
+        categories: 分类列表；默认读取环境变量 ARXIV_CATEGORIES
+        skip_if_exists: 是否跳过已存在的论文
+
+    Returns:
+        Dict: 导入统计信息，per_category 为各请求分类当日的论文数
+    """
+    categories = list(dict.fromkeys(categories or configured_categories()))
+    target_date = dt.datetime.strptime(target_date_str, "%Y-%m-%d").date()
+    start_et, end_et, start_utc, end_utc = compute_announcement_window(target_date)
+    queries = build_multi_category_queries(categories, start_utc, end_utc)
+
+    print(f"目标日期(ET): {target_date} | 分类: {', '.join(categories)} | 查询数: {len(queries)}")
+    print(f"窗口(ET): {start_et} ~ {end_et}")
+
+    try:
+        stats = _import_arxiv_papers_stream(
+            [ArxivQueryPages(q) for q in queries], target_date_str, start_utc, end_utc, None, skip_if_exists
+        )
+    except Exception as e:
+        # 合并查询失败时逐个分类走整包解析路径
+        print(f"⚠️  [导入性能] 多分类导入失败，回退到逐分类导入: {e}")
+        stats = {"total_upsert": 0, "total_link": 0, "errors": 0, "processed": 0, "truncated": False}
+        per_category = {}
+        for cat in categories:
+            one = import_arxiv_papers(target_date_str, cat, skip_if_exists=skip_if_exists, stream=False)
+            for k in ("total_upsert", "total_link", "errors", "processed"):
+                stats[k] += one.get(k, 0)
+            stats["truncated"] = stats["truncated"] or one.get("truncated", False)
+            per_category[cat] = one.get("processed", 0)
+        stats["per_category"] = per_category
+        return stats
+
+    counts = stats.pop("category_counts", {})
+    stats["per_category"] = {cat: counts.get(cat, 0) for cat in categories}
+    _advance_watermarks(target_date_str, categories, stats, end_utc)
+    print(f"📊 [多分类导入] {target_date_str} 各分类论文数: {stats['per_category']}")
+    return stats
 
 
 # 向后兼容的别名
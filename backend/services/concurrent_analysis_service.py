@@ -13,6 +13,7 @@ from typing import Dict, Any, List, Optional, Callable
 
 from backend.services.analysis_service import analyze_paper
 from backend.services.affiliation_service import get_author_affiliations
+from backend.services.analysis_sink import AnalysisResultSink
 from backend.clients.ai_client import DoubaoClient
 from backend.db import repo as db_repo
 
@@ -71,6 +72,9 @@ class ConcurrentAnalysisService:
         
         print(f"🚀 [并发分析] 启动 {self.max_workers} 路并发分析，总计 {total_papers} 篇论文")
         
+        # 分析结果先进缓冲区，由后台线程批量写库，工作线程不等待数据库
+        result_sink = AnalysisResultSink(name=task_id)
+        
         def analyze_single_paper(paper_data: Dict) -> Dict[str, Any]:
             """分析单篇论文的工作函数"""
             thread_id = threading.current_thread().ident
@@ -106,8 +110,8 @@ class ConcurrentAnalysisService:
                 except Exception:
                     analysis_result = {'raw': result}
                 
-                # 2. 保存分析结果到数据库
-                db_repo.insert_analysis_result(
+                # 2. 保存分析结果（批量写库）
+                result_sink.add(
                     paper_id=paper_id,
                     prompt_id=prompt_id,
                     analysis_json=analysis_result,
@@ -133,8 +137,7 @@ class ConcurrentAnalysisService:
                         )
                         
                         if affiliations:
-                            aff_json = json.dumps(affiliations, ensure_ascii=False)
-                            db_repo.update_paper_author_affiliation(paper_id, aff_json)
+                            db_repo.set_paper_affiliations(paper_id, affiliations)
                             print(f"✅ [线程-{thread_id}] 机构信息更新完成: {len(affiliations)} 个机构")
                         
                     except Exception as aff_error:
@@ -180,7 +183,7 @@ class ConcurrentAnalysisService:
         # 使用线程池执行并发分析
         overall_start_time = time.time()
         
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        with result_sink, ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             # 提交所有任务
             future_to_paper = {
                 executor.submit(analyze_single_paper, paper): paper 
@@ -237,7 +240,8 @@ class ConcurrentAnalysisService:
             'error_count': error_count,
             'total_elapsed_time': total_elapsed_time,
             'average_time_per_paper': total_elapsed_time / total_papers if total_papers > 0 else 0,
-            'concurrent_workers': self.max_workers
+            'concurrent_workers': self.max_workers,
+            'write_stats': dict(result_sink.stats)
         }
         
         with self.progress_lock:
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+定时预导入服务
+
+每天在 arXiv 提交窗口截止（20:00 US/Eastern）之后，自动导入配置分类当日的论文，
+并通过回调让调用方预热搜索缓存，使用户打开当日数据时无需等待 arXiv 拉取与入库。
+"""
+
+import datetime as dt
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import pytz
+
+from backend.clients.arxiv_client import configured_categories
+from backend.db import repo as db_repo
+from backend.services.arxiv_service import import_arxiv_papers_multi
+
+
+PREINGEST_DELAY_MINUTES = int(os.getenv("PREINGEST_DELAY_MINUTES", "15"))   # 截止后延迟，等待 arXiv 数据可查
+PREINGEST_RETRY_MINUTES = int(os.getenv("PREINGEST_RETRY_MINUTES", "20"))   # 无数据/失败时的重试间隔
+PREINGEST_MAX_RETRIES = int(os.getenv("PREINGEST_MAX_RETRIES", "6"))
+
+_ET = pytz.timezone("US/Eastern")
+_CUTOFF = dt.time(20, 0)
+
+
+def latest_closed_date(now_utc: Optional[dt.datetime] = None) -> dt.date:
+    """最近一个已截止提交窗口对应的目标日期（ET 日期）。"""
+    now_et = (now_utc or dt.datetime.now(dt.timezone.utc)).astimezone(_ET)
+    if now_et.time() >= _CUTOFF:
+        return now_et.date()
+    return now_et.date() - dt.timedelta(days=1)
+
+
+def next_run_at(now_utc: Optional[dt.datetime] = None) -> dt.datetime:
+    """下一次预导入的时间（UTC）：下一个 20:00 ET 截止 + PREINGEST_DELAY_MINUTES。"""
+    now_utc = now_utc or dt.datetime.now(dt.timezone.utc)
+    now_et = now_utc.astimezone(_ET)
+    day = now_et.date()
+    while True:
+        run_et = _ET.localize(dt.datetime.combine(day, _CUTOFF)) + dt.timedelta(minutes=PREINGEST_DELAY_MINUTES)
+        if run_et > now_et:
+            return run_et.astimezone(dt.timezone.utc)
+        day += dt.timedelta(days=1)
+
+
+def is_complete(stats: Dict[str, Any]) -> bool:
+    """导入结果是否完整：有论文、未被截断、没有错误。"""
+    return stats.get("processed", 0) > 0 and not stats.get("truncated") and not stats.get("errors")
+
+
+class PreIngestScheduler:
+    """预导入调度线程"""
+
+    def __init__(
+        self,
+        categories: Optional[List[str]] = None,
+        on_ingested: Optional[Callable[[str, List[str], Dict[str, Any]], None]] = None,
+        run_on_start: bool = True,
+    ):
+        """
+        Args:
+            categories: 预导入的分类列表，默认读取 ARXIV_CATEGORIES
+            on_ingested: 导入完成后的回调 (date_str, categories, stats)，用于预热缓存
+            run_on_start: 启动时是否立即补导最近一个已截止的日期
+        """
+        self.categories = categories or configured_categories()
+        self.on_ingested = on_ingested
+        self.run_on_start = run_on_start
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_run: Dict[str, Any] = {}
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._loop, name="arxiv-preingest", daemon=True)
+        self._thread.start()
+        print(f"⏰ [预导入] 调度已启动 | 分类: {', '.join(self.categories)} | 下次运行: {next_run_at().astimezone(_ET)}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_once(self, date_str: str) -> Dict[str, Any]:
+        """导入指定日期，结果完整时触发回调，返回导入统计。"""
+        start = time.time()
+        # 月初之前提前建好后续月份的分区（幂等，已存在时不做任何事）
+        db_repo.ensure_partitions()
+        stats = import_arxiv_papers_multi(date_str, self.categories)
+        elapsed = time.time() - start
+        print(f"✅ [预导入] {date_str} 导入完成，耗时: {elapsed:.2f}s | processed={stats.get('processed', 0)} upsert={stats.get('total_upsert', 0)}")
+        # 空结果（arXiv 尚未公告）、截断或有错误时不预热：交互搜索需要自行导入
+        if self.on_ingested and is_complete(stats):
+            try:
+                self.on_ingested(date_str, self.categories, stats)
+            except Exception as e:
+                print(f"⚠️  [预导入] 缓存预热失败: {e}")
+        self.last_run = {"date": date_str, "finished_at": time.time(), "elapsed": round(elapsed, 2), "stats": stats}
+        return stats
+
+    def _run_with_retries(self, date_str: str) -> None:
+        for attempt in range(PREINGEST_MAX_RETRIES + 1):
+            if self._stop.is_set():
+                return
+            try:
+                stats = self.run_once(date_str)
+                if is_complete(stats):
+                    return
+                if stats.get("processed", 0) > 0:
+                    print(f"⚠️  [预导入] {date_str} 结果不完整 | truncated={stats.get('truncated', False)} errors={stats.get('errors', 0)}")
+                else:
+                    print(f"📭 [预导入] {date_str} arXiv 暂无数据")
+            except Exception as e:
+                print(f"❌ [预导入] {date_str} 导入失败: {e}")
+            if attempt < PREINGEST_MAX_RETRIES:
+                print(f"🔁 [预导入] {PREINGEST_RETRY_MINUTES} 分钟后重试 ({attempt + 1}/{PREINGEST_MAX_RETRIES})")
+                if self._stop.wait(PREINGEST_RETRY_MINUTES * 60):
+                    return
+
+    def _loop(self) -> None:
+        if self.run_on_start:
+            self._run_with_retries(latest_closed_date().isoformat())
+        while not self._stop.is_set():
+            run_at = next_run_at()
+            wait = (run_at - dt.datetime.now(dt.timezone.utc)).total_seconds()
+            if self._stop.wait(max(0.0, wait)):
+                return
+            self._run_with_retries(latest_closed_date().isoformat())
+
+
+_scheduler: Optional[PreIngestScheduler] = None
+
+
+def start_preingest_scheduler(
+    on_ingested: Optional[Callable[[str, List[str], Dict[str, Any]], None]] = None,
+) -> Optional[PreIngestScheduler]:
+    """按环境变量 PREINGEST_ENABLED 启动全局调度线程（重复调用只启动一次）。"""
+    global _scheduler
+    if os.getenv("PREINGEST_ENABLED", "true").lower() != "true":
+        print("⏸️  [预导入] 已禁用（PREINGEST_ENABLED=false）")
+        return None
+    if _scheduler is None:
+        run_on_start = os.getenv("PREINGEST_ON_START", "true").lower() == "true"
+        _scheduler = PreIngestScheduler(on_ingested=on_ingested, run_on_start=run_on_start)
+    _scheduler.start()
+    return _scheduler
+
+
+def get_preingest_scheduler() -> Optional[PreIngestScheduler]:
+    return _scheduler
@@ -4,13 +4,13 @@
 """
 
 import re
-import urllib.request
 import urllib.parse
 from typing import List, Dict, Any, Tuple
 import xml.etree.ElementTree as ET
 from datetime import datetime
-import time
+from ..clients import rate_limiter
 from ..db import repo as db_repo
+from ..db.bulk_writer import BulkWriteError
 
 def extract_arxiv_ids(text: str) -> List[str]:
     """
@@ -32,7 +32,7 @@ def extract_arxiv_ids(text: str) -> List[str]:
     unique_ids = []
     for match in matches:
         # 去掉版本号，只保留基础ID
-        base_id = match.split('v')[0]
+        base_id = db_repo.arxiv_base_id(match)
         if base_id not in seen:
             seen.add(base_id)
             unique_ids.append(base_id)
@@ -75,7 +75,7 @@ def parse_arxiv_xml(xml_content: str) -> Dict[str, Any]:
         id_elem = entry.find('atom:id', namespaces)
         if id_elem is not None:
             arxiv_url = id_elem.text
-            clean_id = arxiv_url.split('/')[-1].replace('v1', '').replace('v2', '').replace('v3', '')
+            clean_id = db_repo.arxiv_base_id(arxiv_url.split('/')[-1])
             paper_info['arxiv_id'] = clean_id
             paper_info['id'] = clean_id  # 兼容前端字段名
             paper_info['paper_id'] = None  # 智能搜索的文章没有数据库ID
@@ -143,15 +143,15 @@ def parse_arxiv_xml(xml_content: str) -> Dict[str, Any]:
         print(f"解析XML失败: {e}")
         return None
 
-def fetch_arxiv_papers_batch(arxiv_ids: List[str], timeout: int = 30, batch_size: int = 50, delay: float = 3.5) -> Dict[str, Any]:
+def fetch_arxiv_papers_batch(arxiv_ids: List[str], timeout: int = 30, batch_size: int = 50, delay: float = None) -> Dict[str, Any]:
     """
-    通过arXiv API批量获取多篇论文详细信息，支持分批请求和延迟
+    通过arXiv API批量获取多篇论文详细信息，分批请求，请求节奏由全局限速器控制
 
     Args:
         arxiv_ids: arXiv论文ID列表
         timeout: 单次请求超时时间（秒）
         batch_size: 每批次请求的论文数量（默认50，符合arXiv限制）
-        delay: 批次间延迟时间（秒，默认3.5秒，符合arXiv要求）
+        delay: 已废弃（批次间隔由 rate_limiter 的 export 桶统一控制），保留参数以兼容旧调用
 
     Returns:
         包含状态和内容的字典
@@ -175,7 +175,7 @@ def fetch_arxiv_papers_batch(arxiv_ids: List[str], timeout: int = 30, batch_size
 
     # 计算批次数
     num_batches = (total_ids + batch_size - 1) // batch_size
-    print(f"📦 [批量查询] 将分 {num_batches} 批处理，每批 {batch_size} 篇，批次间延迟 {delay}s")
+    print(f"📦 [批量查询] 将分 {num_batches} 批处理，每批 {batch_size} 篇")
 
     for batch_num in range(num_batches):
         start_idx = batch_num * batch_size
@@ -202,9 +202,10 @@ def fetch_arxiv_papers_batch(arxiv_ids: List[str], timeout: int = 30, batch_size
 
                 url = base_url + urllib.parse.urlencode(params)
 
-                # 发送批量请求
-                with urllib.request.urlopen(url, timeout=timeout) as response:
-                    xml_content = response.read().decode('utf-8')
+                # 发送批量请求（经全局限速器，429/503 时按 Retry-After 等待）
+                response = rate_limiter.limited_get(rate_limiter.EXPORT_BUCKET, url, timeout=timeout)
+                response.raise_for_status()
+                xml_content = response.content.decode('utf-8')
 
                 # 解析XML获取论文信息
                 batch_result = parse_arxiv_batch_xml(xml_content, batch_ids)
@@ -219,11 +220,6 @@ def fetch_arxiv_papers_batch(arxiv_ids: List[str], timeout: int = 30, batch_size
                     print(f"❌ [批次 {batch_num + 1}/{num_batches}] 失败: {batch_result.get('message', '未知错误')}")
                     batch_success = True  # 解析失败也算完成，不再重试
 
-                # 批次间延迟（最后一批不需要延迟）
-                if batch_success and batch_num < num_batches - 1:
-                    print(f"⏸️  [批次延迟] 等待 {delay}s 后继续...")
-                    time.sleep(delay)
-
             except Exception as e:
                 error_msg = str(e)
                 retry_count += 1
@@ -234,20 +230,18 @@ def fetch_arxiv_papers_batch(arxiv_ids: List[str], timeout: int = 30, batch_size
                 should_retry = (is_rate_limit or is_timeout) and retry_count <= max_retries
 
                 if should_retry:
-                    # 指数退避：基础延迟 * 2^重试次数
-                    retry_delay = delay * (2 ** retry_count)
+                    # 指数退避经限速器执行：暂停 export 桶（429 已按 Retry-After 暂停，取两者较长者），
+                    # 下一次 limited_get 取令牌时等待，超时的端点不会被紧密循环重试
+                    backoff = min(rate_limiter.RETRY_AFTER_MAX, 2.0 ** retry_count)
+                    rate_limiter.get_bucket(rate_limiter.EXPORT_BUCKET).pause(backoff)
                     print(f"⚠️  [批次 {batch_num + 1}/{num_batches}] 第 {retry_count} 次失败: {error_msg}")
-                    print(f"🔄 [重试机制] 将在 {retry_delay:.1f}s 后进行第 {retry_count + 1} 次重试...")
-                    time.sleep(retry_delay)
+                    print(f"🔄 [重试机制] {backoff:.0f}s 后进行第 {retry_count + 1} 次重试...")
                 else:
                     # 不再重试，记录错误
                     print(f"❌ [批次 {batch_num + 1}/{num_batches}] 最终失败: {error_msg} (重试 {retry_count - 1} 次)")
                     all_error_ids.extend([{'arxiv_id': id, 'error': error_msg} for id in batch_ids])
                     batch_success = True  # 标记为完成，继续下一批
 
-                    # 失败后等待一段时间
-                    time.sleep(delay)
-
     # 汇总结果
     print(f"🎯 [批量查询] 全部完成 - 成功: {len(all_found_papers)} 篇，未找到: {len(all_not_exist_ids)} 篇，错误: {len(all_error_ids)} 篇")
 
@@ -340,7 +334,7 @@ def parse_single_entry_xml(entry, namespaces: Dict[str, str]) -> Dict[str, Any]:
         id_elem = entry.find('atom:id', namespaces)
         if id_elem is not None:
             arxiv_url = id_elem.text
-            clean_id = arxiv_url.split('/')[-1].replace('v1', '').replace('v2', '').replace('v3', '')
+            clean_id = db_repo.arxiv_base_id(arxiv_url.split('/')[-1])
             paper_info['arxiv_id'] = clean_id
             paper_info['id'] = clean_id  # 兼容前端字段名
             paper_info['paper_id'] = None  # 智能搜索的文章没有数据库ID
@@ -432,8 +426,9 @@ def fetch_arxiv_paper_info(arxiv_id: str, timeout: int = 10) -> Dict[str, Any]:
     
     try:
         # 发送请求
-        with urllib.request.urlopen(url, timeout=timeout) as response:
-            xml_content = response.read().decode('utf-8')
+        response = rate_limiter.limited_get(rate_limiter.EXPORT_BUCKET, url, timeout=timeout)
+        response.raise_for_status()
+        xml_content = response.content.decode('utf-8')
         
         # 检查是否找到论文
         if '<entry>' in xml_content and '</entry>' in xml_content:
@@ -504,7 +499,11 @@ def batch_save_papers_to_db(found_papers: List[Dict[str, Any]]) -> List[Dict[str
             paper_rows.append(paper_row)
         
         # 2. 批量upsert论文，获取arxiv_id -> paper_id映射
-        arxiv_to_paper_id = db_repo.upsert_papers_bulk(paper_rows)
+        try:
+            arxiv_to_paper_id = db_repo.upsert_papers_bulk(paper_rows)
+        except BulkWriteError as e:
+            print(f"⚠️ [批量保存] {e}")
+            arxiv_to_paper_id = e.result or {}
         print(f"✅ [批量保存] 论文批量upsert完成，共处理 {len(arxiv_to_paper_id)} 条")
         
         # 3. 收集所有分类
@@ -532,7 +531,10 @@ def batch_save_papers_to_db(found_papers: List[Dict[str, Any]]) -> List[Dict[str
             
             # 6. 批量关联论文分类
             if paper_category_pairs:
-                db_repo.upsert_paper_categories_bulk(paper_category_pairs)
+                try:
+                    db_repo.upsert_paper_categories_bulk(paper_category_pairs)
+                except BulkWriteError as e:
+                    print(f"⚠️ [批量保存] {e}")
                 print(f"✅ [批量保存] 论文分类关联完成，共处理 {len(paper_category_pairs)} 个关联")
         
         # 7. 更新paper_id到found_papers中（保留原有的update_date）
@@ -0,0 +1 @@
+# Tools 命令行工具
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+历史数据回填工具
+
+按日期区间批量导入 arXiv 论文（每天一次多分类导入），支持并发、全局限速与断点续跑。
+
+用法:
+    python -m backend.tools.backfill --from 2025-05-01 --to 2025-07-31 \
+        --categories cs.CV,cs.LG --workers 2 --rate 0.33 --checkpoint backfill.json
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from backend.clients.arxiv_client import configured_categories, set_export_rate
+from backend.services.arxiv_service import import_arxiv_papers_multi
+
+
+def _date_range(start: dt.date, end: dt.date) -> List[str]:
+    days = (end - start).days
+    step = 1 if days >= 0 else -1
+    return [(start + dt.timedelta(days=i * step)).isoformat() for i in range(abs(days) + 1)]
+
+
+class Checkpoint:
+    """JSON 断点文件：记录已完成/失败的日期，原子写入。"""
+
+    def __init__(self, path: str, categories: List[str]):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data: Dict[str, Any] = {"categories": categories, "completed": {}, "failed": {}}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as fh:
+                loaded = json.load(fh)
+            if sorted(loaded.get("categories", [])) != sorted(categories):
+                print(f"⚠️  [回填] 断点文件分类 {loaded.get('categories')} 与本次 {categories} 不一致，将按本次分类重新导入")
+            else:
+                self.data.update(loaded)
+                self.data["failed"] = {}
+
+    def is_done(self, date_str: str) -> bool:
+        return date_str in self.data["completed"]
+
+    def mark(self, date_str: str, stats: Dict[str, Any] = None, error: str = None) -> None:
+        with self.lock:
+            if error is None:
+                self.data["completed"][date_str] = stats
+                self.data["failed"].pop(date_str, None)
+            else:
+                self.data["failed"][date_str] = error
+            self._save()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(self.data, fh, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def _import_day(date_str: str, categories: List[str]) -> Dict[str, Any]:
+    start = time.time()
+    stats = import_arxiv_papers_multi(date_str, categories)
+    elapsed = time.time() - start
+    processed = stats.get("processed", 0)
+    return {
+        "processed": processed,
+        "total_upsert": stats.get("total_upsert", 0),
+        "total_link": stats.get("total_link", 0),
+        "errors": stats.get("errors", 0),
+        "truncated": stats.get("truncated", False),
+        "per_category": stats.get("per_category", {}),
+        "elapsed": round(elapsed, 2),
+        "papers_per_sec": round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def _incomplete_reason(stats: Dict[str, Any]) -> Optional[str]:
+    """导入结果不完整的原因；截断、有错误或 0 篇论文的日期不能记为已完成。"""
+    if stats["truncated"]:
+        return "结果被截断"
+    if stats["errors"]:
+        return f"{stats['errors']} 个错误"
+    if not stats["processed"]:
+        return "0 篇论文"
+    return None
+
+
+def run_backfill(
+    start: dt.date,
+    end: dt.date,
+    categories: List[str],
+    workers: int = 2,
+    rate: float = None,
+    checkpoint_path: str = None,
+) -> Dict[str, Any]:
+    """
+    回填日期区间内的论文
+
+    Args:
+        start/end: 起止日期（含），end 早于 start 时倒序回填
+        categories: 分类列表
+        workers: 同时导入的天数
+        rate: arXiv 查询请求的全局速率上限（次/秒），None 时沿用 ARXIV_EXPORT_RATE
+        checkpoint_path: 断点文件路径，已完成的日期会被跳过
+
+    Returns:
+        Dict: 汇总统计
+    """
+    if rate is not None:
+        set_export_rate(rate)
+    checkpoint = Checkpoint(checkpoint_path, categories)
+    dates = [d for d in _date_range(start, end) if not checkpoint.is_done(d)]
+    skipped = len(_date_range(start, end)) - len(dates)
+    print(f"🚚 [回填] {start} ~ {end} | 分类: {', '.join(categories)} | 待导入 {len(dates)} 天，已完成跳过 {skipped} 天 | workers={workers} rate={rate if rate is not None else '默认'}")
+
+    run_start = time.time()
+    total_papers = 0
+    failed: List[str] = []
+    done = 0
+    interrupted = False
+    workers = max(1, workers)
+    # 按需提交，最多 workers 天在途：Ctrl-C 后不再开始新的日期，只等在途日期完成并写入断点
+    queue = list(dates)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        inflight: Dict[Any, str] = {}
+        while True:
+            while queue and not interrupted and len(inflight) < workers:
+                date_str = queue.pop(0)
+                inflight[executor.submit(_import_day, date_str, categories)] = date_str
+            if not inflight:
+                break
+            try:
+                finished, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+            except KeyboardInterrupt:
+                interrupted = True
+                print(f"⏹️  [回填] 收到中断，不再开始新的日期，等待进行中的 {len(inflight)} 天完成并写入断点")
+                continue
+            for future in finished:
+                date_str = inflight.pop(future)
+                done += 1
+                try:
+                    stats = future.result()
+                except Exception as e:
+                    failed.append(date_str)
+                    checkpoint.mark(date_str, error=str(e))
+                    print(f"❌ [回填] {date_str} 失败: {e} ({done}/{len(dates)})")
+                    continue
+                total_papers += stats["processed"]
+                reason = _incomplete_reason(stats)
+                if reason:
+                    failed.append(date_str)
+                    checkpoint.mark(date_str, error=reason)
+                    print(f"⚠️  [回填] {date_str} 不完整（{reason}），未记为完成 ({done}/{len(dates)}) | {stats['processed']} 篇")
+                    continue
+                checkpoint.mark(date_str, stats)
+                print(
+                    f"📅 [回填] {date_str} 完成 ({done}/{len(dates)}) | {stats['processed']} 篇 "
+                    f"{stats['elapsed']:.1f}s {stats['papers_per_sec']} 篇/秒 | 各分类: {stats['per_category']}"
+                )
+
+    elapsed = time.time() - run_start
+    summary = {
+        "days": len(dates),
+        "skipped": skipped,
+        "failed": sorted(failed),
+        "pending": len(queue),
+        "interrupted": interrupted,
+        "papers": total_papers,
+        "elapsed": round(elapsed, 1),
+        "papers_per_sec": round(total_papers / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    print(f"🏁 [回填] 完成 | {summary}")
+    if failed or queue:
+        print(f"   失败与未开始的日期可直接重跑同一命令继续: 失败 {', '.join(sorted(failed)) or '无'}，未开始 {len(queue)} 天")
+    return summary
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="按日期区间回填 arXiv 论文")
+    parser.add_argument("--from", dest="start", required=True, help="起始日期 YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", required=True, help="结束日期 YYYY-MM-DD（含）")
+    parser.add_argument("--categories", default=None, help="逗号分隔的分类，默认读取 ARXIV_CATEGORIES")
+    parser.add_argument("--workers", type=int, default=2, help="同时导入的天数（默认 2）")
+    parser.add_argument("--rate", type=float, default=None, help="arXiv 查询全局速率上限，次/秒（默认沿用 ARXIV_EXPORT_RATE，0 表示不限）")
+    parser.add_argument("--checkpoint", default="backfill_checkpoint.json", help="断点文件路径")
+    args = parser.parse_args(argv)
+
+    start = dt.datetime.strptime(args.start, "%Y-%m-%d").date()
+    end = dt.datetime.strptime(args.end, "%Y-%m-%d").date()
+    categories = [c.strip() for c in args.categories.split(",") if c.strip()] if args.categories else configured_categories()
+    summary = run_backfill(start, end, categories, args.workers, args.rate, args.checkpoint)
+    return 1 if summary["failed"] or summary["interrupted"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+论文列表查询基准测试
+
+对比某日期+分类论文列表的三种实现：SQL 函数 RPC、PostgREST 内联JOIN、分步可靠版本，
+输出各自耗时（中位数/最小值）与返回行数，并校验结果是否一致。
+
+用法:
+    python -m backend.tools.bench_listing --date 2025-08-07 --category cs.CV --repeat 5
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from backend.db import repo as db_repo
+
+
+def _time_calls(fn: Callable[[], List[Dict[str, Any]]], repeat: int) -> Dict[str, Any]:
+    timings: List[float] = []
+    rows: List[Dict[str, Any]] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "rows": len(rows),
+        "ids": [r["id"] for r in rows],
+    }
+
+
+def run_benchmark(date: str, category: str, repeat: int = 5) -> Dict[str, Dict[str, Any]]:
+    variants = {
+        "rpc": lambda: db_repo.list_papers_by_date_category_rpc(date, category),
+        "join": lambda: db_repo.list_papers_by_date_category_join(date, category),
+        "reliable": lambda: db_repo.list_papers_by_date_category_reliable(date, category),
+    }
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, fn in variants.items():
+        try:
+            results[name] = _time_calls(fn, repeat)
+        except Exception as e:
+            results[name] = {"error": str(e)}
+
+    print(f"\n📊 [基准测试] date={date} category={category} repeat={repeat}")
+    print(f"{'实现':<10}{'中位数(ms)':>12}{'最小(ms)':>12}{'行数':>8}")
+    for name, r in results.items():
+        if "error" in r:
+            print(f"{name:<10}  ❌ {r['error']}")
+        else:
+            print(f"{name:<10}{r['median_ms']:>12}{r['min_ms']:>12}{r['rows']:>8}")
+
+    ok = [r for r in results.values() if "ids" in r]
+    if len(ok) > 1:
+        reference = ok[0]["ids"]
+        same = all(r["ids"] == reference for r in ok[1:])
+        print("✅ 各实现结果一致" if same else "⚠️  各实现结果不一致（行数或顺序不同）")
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="对比论文列表查询的 RPC / JOIN / 可靠版本耗时")
+    parser.add_argument("--date", required=True, help="日期 YYYY-MM-DD")
+    parser.add_argument("--category", default="cs.CV", help="分类（默认 cs.CV）")
+    parser.add_argument("--repeat", type=int, default=5, help="每种实现的执行次数（默认 5）")
+    args = parser.parse_args(argv)
+    results = run_benchmark(args.date, args.category, max(1, args.repeat))
+    return 1 if any("error" in r for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+arXiv 元数据快照离线导入工具
+
+逐行流式读取 arXiv 公开元数据快照（JSON Lines，支持 .gz），映射为 papers 行后
+按大批次交给多个写库线程并行写入，全程不访问 arXiv，内存占用与文件大小无关。
+
+用法:
+    python -m backend.tools.import_snapshot arxiv-metadata-oai-snapshot.json \
+        --categories cs.CV,cs.LG --from 2024-01-01 --batch-size 1000 --writers 4
+"""
+
+import argparse
+import datetime as dt
+import gzip
+import io
+import json
+import queue
+import re
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import pytz
+
+from backend.db import repo as db_repo
+from backend.db.bulk_writer import BulkWriteError
+
+
+_ET = pytz.timezone("US/Eastern")
+_WS_RE = re.compile(r"\s+")
+
+
+def _clean(text: Optional[str]) -> str:
+    return _WS_RE.sub(" ", text or "").strip()
+
+
+def _announcement_date(submitted_utc: dt.datetime) -> dt.date:
+    """按导入服务的窗口规则（前一日 20:00 ET ~ 当日 20:00 ET）计算提交时间对应的目标日期。"""
+    submitted_et = submitted_utc.astimezone(_ET)
+    if submitted_et.time() >= dt.time(20, 0):
+        return submitted_et.date() + dt.timedelta(days=1)
+    return submitted_et.date()
+
+
+def _format_authors(record: Dict[str, Any]) -> str:
+    parsed = record.get("authors_parsed")
+    if parsed:
+        names = []
+        for parts in parsed:
+            last = parts[0] if len(parts) > 0 else ""
+            first = parts[1] if len(parts) > 1 else ""
+            suffix = parts[2] if len(parts) > 2 else ""
+            name = _clean(" ".join(p for p in (first, last, suffix) if p))
+            if name:
+                names.append(name)
+        if names:
+            return ", ".join(names)
+    return _clean(record.get("authors"))
+
+
+def record_to_row(record: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+    """将一条快照记录映射为 papers 行及其全部分类；缺少必要字段时返回 None。
+
+    arxiv_id 带最新版本号（与 API 导入一致），update_date 取 v1 提交时间所属的公告窗口日期。
+    """
+    base_id = (record.get("id") or "").strip()
+    versions = record.get("versions") or []
+    if not base_id or not versions:
+        return None
+    try:
+        first_submitted = parsedate_to_datetime(versions[0]["created"])
+        latest_submitted = parsedate_to_datetime(versions[-1]["created"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    latest_version = versions[-1].get("version") or f"v{len(versions)}"
+    arxiv_id = f"{base_id}{latest_version}"
+    categories = [c for c in (record.get("categories") or "").split() if c]
+
+    row: Dict[str, Any] = {
+        "arxiv_id": arxiv_id,
+        "title": _clean(record.get("title")),
+        "authors": _format_authors(record),
+        "abstract": _clean(record.get("abstract")),
+        "link": f"http://arxiv.org/abs/{arxiv_id}",
+        "update_date": _announcement_date(first_submitted).isoformat(),
+        "update_time": latest_submitted.astimezone(dt.timezone.utc).time().isoformat(),
+        "primary_category": categories[0] if categories else None,
+    }
+    return row, categories
+
+
+def _open_snapshot(path: str) -> io.TextIOBase:
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def iter_snapshot_rows(
+    path: str,
+    categories: Optional[Set[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[Tuple[Dict[str, Any], List[str]]]:
+    """逐行读取快照并按分类/日期过滤，产出 (row, categories)。"""
+    stats = stats if stats is not None else {}
+    with _open_snapshot(path) as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            stats["lines"] = stats.get("lines", 0) + 1
+            try:
+                parsed = record_to_row(json.loads(line))
+            except ValueError:
+                parsed = None
+            if parsed is None:
+                stats["bad"] = stats.get("bad", 0) + 1
+                continue
+            row, cats = parsed
+            if categories and not categories.intersection(cats):
+                continue
+            if date_from and row["update_date"] < date_from:
+                continue
+            if date_to and row["update_date"] > date_to:
+                continue
+            yield row, cats
+
+
+class _CategoryMap:
+    """分类名 → category_id 的进程内缓存，只对新出现的分类调用 upsert_categories_bulk。"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, names: Set[str]) -> Dict[str, int]:
+        missing = sorted(n for n in names if n not in self._ids)
+        if missing:
+            with self._lock:
+                missing = [n for n in missing if n not in self._ids]
+                if missing:
+                    self._ids.update(db_repo.upsert_categories_bulk(missing))
+        return self._ids
+
+
+def _write_batch(batch: List[Tuple[Dict[str, Any], List[str]]], category_map: _CategoryMap) -> Tuple[int, int, int]:
+    """写入一批论文及分类关联，返回 (写入论文数, 关联数, 未写入的论文与关联数)。"""
+    rows = [row for row, _ in batch]
+    skipped_papers = skipped_links = 0
+    try:
+        arxiv_to_paper_id = db_repo.upsert_papers_bulk(rows)
+    except BulkWriteError as e:
+        print(f"⚠️ [快照导入] {e}")
+        arxiv_to_paper_id = e.result or {}
+        skipped_papers = len(e.skipped)
+    cat_ids = category_map.resolve({c for _, cats in batch for c in cats})
+    pairs = [
+        (arxiv_to_paper_id[row["arxiv_id"]], cat_ids[c])
+        for row, cats in batch
+        if row["arxiv_id"] in arxiv_to_paper_id
+        for c in cats
+        if c in cat_ids
+    ]
+    if pairs:
+        try:
+            db_repo.upsert_paper_categories_bulk(pairs)
+        except BulkWriteError as e:
+            print(f"⚠️ [快照导入] {e}")
+            skipped_links = len(e.failed)
+    return len(rows) - skipped_papers, len(pairs) - skipped_links, skipped_papers + skipped_links
+
+
+def import_snapshot(
+    path: str,
+    categories: Optional[Set[str]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    batch_size: int = 1000,
+    writers: int = 4,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    导入快照文件
+
+    读取线程解析并攒批，批次经有界队列交给 writers 个写库线程，解析与写库并行进行。
+
+    Returns:
+        Dict: 导入统计信息
+    """
+    start_time = time.time()
+    read_stats: Dict[str, int] = {}
+    totals = {"rows": 0, "links": 0, "batches": 0, "skipped": 0}
+    totals_lock = threading.Lock()
+    errors: List[BaseException] = []
+    batch_queue: "queue.Queue[Optional[List[Tuple[Dict[str, Any], List[str]]]]]" = queue.Queue(maxsize=max(1, writers) * 2)
+    category_map = _CategoryMap()
+    earliest: Optional[str] = None
+    if date_from and not dry_run:
+        # 先建好导入范围内的月分区，论文直接写入对应分区（sql/018）
+        db_repo.ensure_partitions(date_from)
+
+    def writer() -> None:
+        while True:
+            batch = batch_queue.get()
+            if batch is None:
+                return
+            if errors:
+                continue  # 已失败：继续取空队列，避免读取线程阻塞
+            try:
+                written, linked, skipped = (len(batch), 0, 0) if dry_run else _write_batch(batch, category_map)
+            except BaseException as e:
+                errors.append(e)
+                continue
+            with totals_lock:
+                totals["rows"] += written
+                totals["links"] += linked
+                totals["skipped"] += skipped
+                totals["batches"] += 1
+                if totals["batches"] % 20 == 0:
+                    elapsed = time.time() - start_time
+                    print(f"📦 [快照导入] 已写入 {totals['rows']} 篇 | 读取 {read_stats.get('lines', 0)} 行 | {totals['rows'] / elapsed:.0f} 篇/秒")
+
+    threads = [threading.Thread(target=writer, name=f"snapshot-writer-{i}", daemon=True) for i in range(max(1, writers))]
+    for t in threads:
+        t.start()
+
+    kept = 0
+    batch: List[Tuple[Dict[str, Any], List[str]]] = []
+    try:
+        for item in iter_snapshot_rows(path, categories, date_from, date_to, read_stats):
+            if errors:
+                break
+            batch.append(item)
+            kept += 1
+            if earliest is None or item[0]["update_date"] < earliest:
+                earliest = item[0]["update_date"]
+            if len(batch) >= batch_size:
+                batch_queue.put(batch)
+                batch = []
+            if limit is not None and kept >= limit:
+                break
+        if batch and not errors:
+            batch_queue.put(batch)
+    finally:
+        for _ in threads:
+            batch_queue.put(None)
+        for t in threads:
+            t.join()
+
+    if errors:
+        raise errors[0]
+
+    if earliest and not date_from and not dry_run:
+        # 未指定 --from 时无法预先建分区：导入后补建，落入默认分区的月份会被搬入新分区
+        db_repo.ensure_partitions(earliest)
+
+    elapsed = time.time() - start_time
+    summary = {
+        "lines": read_stats.get("lines", 0),
+        "bad_records": read_stats.get("bad", 0),
+        "matched": kept,
+        "written": totals["rows"],
+        "links": totals["links"],
+        "skipped": totals["skipped"],
+        "elapsed": round(elapsed, 1),
+        "rows_per_sec": round(totals["rows"] / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    print(f"🏁 [快照导入] 完成 | {summary}")
+    return summary
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="从 arXiv 元数据快照（JSON Lines）离线导入论文")
+    parser.add_argument("path", help="快照文件路径（.json/.jsonl/.gz，- 表示标准输入）")
+    parser.add_argument("--categories", default=None, help="只导入包含这些分类之一的论文（逗号分隔）")
+    parser.add_argument("--from", dest="date_from", default=None, help="只导入该日期（含）之后的论文 YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", default=None, help="只导入该日期（含）之前的论文 YYYY-MM-DD")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批写库的论文数（默认 1000）")
+    parser.add_argument("--writers", type=int, default=4, help="写库线程数（默认 4）")
+    parser.add_argument("--limit", type=int, default=None, help="最多导入条数")
+    parser.add_argument("--dry-run", action="store_true", help="只解析不写库")
+    args = parser.parse_args(argv)
+
+    categories = {c.strip() for c in args.categories.split(",") if c.strip()} if args.categories else None
+    import_snapshot(
+        args.path,
+        categories=categories,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        batch_size=args.batch_size,
+        writers=args.writers,
+        limit=args.limit,
+        dry_run=args.dry_run,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
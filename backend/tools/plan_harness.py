@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+"""
+查询计划回归检测工具
+
+在本地 Postgres 上按 sql/ 迁移建库并生成可配置规模的合成数据，对 repo 各访问路径
+对应的 SQL 执行 EXPLAIN (ANALYZE, BUFFERS)，标记大表顺序扫描与行数估计严重偏差，
+并把计划与耗时保存为 JSON 基线；之后每次运行都与基线对比，出现回归时返回非 0。
+
+用法:
+    # 建库 + 生成 30 天 × 每天 2000 篇的数据（会清空论文相关表，只能指向临时库）
+    python -m backend.tools.plan_harness --dsn postgresql://postgres@localhost/plans \
+        --setup --seed --days 30 --papers-per-day 2000 --baseline plan_baseline.json --update-baseline
+    # 修改索引/查询后重跑对比（覆盖导入等写路径在回滚的事务中检测，失败同样返回非 0）
+    python -m backend.tools.plan_harness --dsn postgresql://postgres@localhost/plans --baseline plan_baseline.json
+"""
+
+import argparse
+import datetime as dt
+import glob
+import json
+import os
+import re
+import statistics
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import psycopg
+    from psycopg import sql
+except ImportError:  # 可选依赖，与 backend.db.pg_backend 相同
+    psycopg = None
+    sql = None
+
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sql")
+SEED_CATEGORIES = ["cs.CV", "cs.LG", "cs.AI"]
+PROMPT_NAME = "multi-modal-llm"
+# 合成标题/摘要的主题词：每个词约命中 1/len 的论文，使全文检索用例具有真实的选择性
+SEED_TOPICS = [
+    "diffusion", "segmentation", "transformer", "detection", "retrieval", "reinforcement",
+    "graph", "tracking", "video", "language", "reasoning", "robotics",
+    "depth", "pruning", "distillation", "benchmark",
+]
+# 通过筛选的论文写入两个合成机构（实验室 + 大学），每个实验室约占 1/SEED_LABS
+SEED_LABS = 200
+
+# 本地库没有 Supabase 的 auth schema 与角色，建库前补齐迁移依赖的对象
+_PRELUDE = """
+create extension if not exists pgcrypto;
+create schema if not exists auth;
+create table if not exists auth.users (id uuid primary key);
+do $$
+begin
+  if not exists (select 1 from pg_roles where rolname = 'service_role') then create role service_role; end if;
+  if not exists (select 1 from pg_roles where rolname = 'anon') then create role anon; end if;
+  if not exists (select 1 from pg_roles where rolname = 'authenticated') then create role authenticated; end if;
+end
+$$;
+"""
+
+
+# (名称, 对应的 repo 函数, SQL)；SQL 与 sql/ 中函数体或 PostgREST 生成的查询等价，
+# {date} {month_start} {category} {category_id} {prompt_id} {base_ids} {affiliation} 在运行时以字面量替换
+CASES: List[Tuple[str, str, str]] = [
+    (
+        "list_papers_by_date_category",
+        "repo.list_papers_by_date_category (sql/010)",
+        """
+        select p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation
+        from app.papers p
+        join app.paper_categories pc on pc.paper_id = p.paper_id
+        join app.categories c on c.category_id = pc.category_id
+        where p.update_date = {date} and c.category_name = {category}
+        order by p.arxiv_id desc
+        """,
+    ),
+    (
+        "list_papers_by_date_category_join",
+        "repo.list_papers_by_date_category_join (PostgREST 内联 JOIN)",
+        """
+        select p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation
+        from app.paper_categories pc
+        join app.papers p on p.paper_id = pc.paper_id
+        where pc.category_id = {category_id} and p.update_date = {date}
+        order by p.arxiv_id desc
+        """,
+    ),
+    (
+        "get_analysis_status_counts",
+        "repo.get_analysis_status (sql/013)",
+        """
+        select coalesce(d.paper_count, 0), coalesce(s.completed, 0)
+        from app.categories c
+        left join app.category_day_counts d on d.update_date = {date} and d.category_id = c.category_id
+        left join app.analysis_status_counts s
+          on s.update_date = {date} and s.category_id = c.category_id and s.prompt_id = {prompt_id}
+        where c.category_name = {category}
+        """,
+    ),
+    (
+        "get_analysis_status_fast",
+        "repo.get_analysis_status_fast (PostgREST 内联 JOIN)",
+        """
+        select p.paper_id, ar.analysis_id
+        from app.paper_categories pc
+        join app.papers p on p.paper_id = pc.paper_id
+        left join app.analysis_results ar on ar.paper_id = p.paper_id and ar.prompt_id = {prompt_id}
+        where pc.category_id = {category_id} and p.update_date = {date}
+        """,
+    ),
+    (
+        "get_analysis_status_original",
+        "repo.get_analysis_status_original / list_unanalyzed_papers_chunked（第一步：分类下全部 paper_id）",
+        """
+        select paper_id from app.paper_categories where category_id = {category_id}
+        """,
+    ),
+    (
+        "list_unanalyzed_papers",
+        "repo.list_unanalyzed_papers (sql/012)",
+        """
+        select p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation
+        from app.papers p
+        join app.paper_categories pc on pc.paper_id = p.paper_id
+        join app.categories c on c.category_id = pc.category_id
+        where p.update_date = {date} and c.category_name = {category}
+          and not exists (
+            select 1 from app.analysis_results ar
+            where ar.paper_id = p.paper_id and ar.prompt_id = {prompt_id} and ar.update_date = {date}
+          )
+        order by p.arxiv_id
+        limit 5
+        """,
+    ),
+    (
+        "get_analysis_results",
+        "repo.get_analysis_results (sql/011)",
+        """
+        select p.paper_id, p.arxiv_id, p.title, p.update_time, ar.analysis_result
+        from app.papers p
+        join app.paper_categories pc on pc.paper_id = p.paper_id
+        join app.categories c on c.category_id = pc.category_id
+        join app.analysis_results ar on ar.paper_id = p.paper_id and ar.prompt_id = {prompt_id} and ar.update_date = {date}
+        where p.update_date = {date} and c.category_name = {category}
+        order by p.arxiv_id desc
+        """,
+    ),
+    (
+        "list_ingest_batches",
+        "repo.get_ingest_batches (sql/015)",
+        """
+        select date_trunc('hour', p.ingest_at at time zone 'UTC'), min(p.ingest_at at time zone 'UTC'),
+               count(*), array_agg(p.paper_id order by p.ingest_at, p.paper_id)
+        from app.papers p
+        join app.paper_categories pc on pc.paper_id = p.paper_id
+        join app.categories c on c.category_id = pc.category_id
+        where p.update_date = {date} and c.category_name = {category}
+        group by 1
+        order by 1
+        """,
+    ),
+    (
+        "list_available_dates",
+        "repo.list_available_dates (sql/014)",
+        """
+        select d.update_date, jsonb_object_agg(c.category_name, d.paper_count)
+        from app.category_day_counts d
+        join app.categories c on c.category_id = d.category_id
+        where d.paper_count > 0
+        group by d.update_date
+        order by d.update_date desc
+        """,
+    ),
+    (
+        "list_available_dates_scan",
+        "repo.list_available_dates_scan",
+        """
+        select update_date from app.papers order by update_date desc
+        """,
+    ),
+    (
+        "fulltext_search_papers",
+        "repo.fulltext_search_papers (sql/017)",
+        """
+        select p.paper_id, p.arxiv_id, ts_rank(p.search_vector, q.query) as rank
+        from websearch_to_tsquery('english', 'diffusion segmentation') as q(query)
+        join app.papers p on p.search_vector @@ q.query
+        where exists (
+          select 1 from app.paper_categories pc join app.categories c on c.category_id = pc.category_id
+          where pc.paper_id = p.paper_id and c.category_name = {category}
+        )
+        order by rank desc, p.paper_id desc
+        limit 21
+        """,
+    ),
+    (
+        "papers_by_affiliation",
+        "repo.papers_by_affiliation (sql/019，本月至今)",
+        """
+        with matched as (
+          select a.affiliation_id, a.name from app.affiliations a
+          where (' ' || a.name_key || ' ') like '% ' || app.affiliation_key({affiliation}) || ' %'
+        ),
+        hits as (
+          select pk.paper_id, pk.update_date, array_agg(m.name order by pa.position) as affiliations
+          from matched m
+          join app.paper_affiliations pa on pa.affiliation_id = m.affiliation_id
+          join app.paper_keys pk on pk.paper_id = pa.paper_id
+          where pk.update_date >= {month_start} and pk.update_date <= {date}
+          group by pk.paper_id, pk.update_date
+          order by pk.update_date desc, pk.paper_id desc
+          limit 101
+        )
+        select p.paper_id, p.arxiv_id, p.title, p.update_date, h.affiliations
+        from hits h join app.papers p on p.paper_id = h.paper_id and p.update_date = h.update_date
+        order by h.update_date desc, h.paper_id desc
+        """,
+    ),
+    (
+        "get_papers_by_arxiv_ids",
+        "repo.get_papers_by_arxiv_ids（导入时按 base id 查已有论文）",
+        """
+        select paper_id, arxiv_id, arxiv_base_id from app.papers where arxiv_base_id = any({base_ids})
+        """,
+    ),
+]
+
+
+def _strip_concurrently(text: str) -> str:
+    # 迁移整文件作为一条多语句查询执行（隐式事务），CONCURRENTLY 在其中不可用；空库建索引无需并发
+    return re.sub(r"\bconcurrently\b", "", text, flags=re.IGNORECASE)
+
+
+def setup_schema(conn: Any) -> List[str]:
+    """在空库上执行补齐对象 + sql/NNN_*.sql 全部迁移，返回执行过的文件名。"""
+    applied = []
+    conn.execute(_PRELUDE)
+    for path in sorted(glob.glob(os.path.join(SQL_DIR, "[0-9][0-9][0-9]_*.sql"))):
+        with open(path, "r", encoding="utf-8") as fh:
+            conn.execute(_strip_concurrently(fh.read()))
+        applied.append(os.path.basename(path))
+        print(f"🧱 [计划检测] 已执行迁移 {os.path.basename(path)}")
+    return applied
+
+
+def seed(conn: Any, days: int, papers_per_day: int, categories: int, crosslist: float, analyzed: float, start: dt.date) -> Dict[str, Any]:
+    """清空论文相关表并生成合成数据（固定随机种子，结果可复现）。"""
+    names = SEED_CATEGORIES + [f"syn.{i:02d}" for i in range(max(0, categories - len(SEED_CATEGORIES)))]
+    names = names[:max(1, categories)]
+    conn.execute(
+        "truncate app.papers, app.paper_keys, app.paper_categories, app.analysis_results, "
+        "app.paper_affiliations, app.affiliations restart identity cascade"
+    )
+    conn.execute("truncate app.category_day_counts, app.analysis_status_counts")
+    # 合成数据的月份需要有分区，否则全部落入默认分区（sql/018）
+    conn.execute("select app.ensure_monthly_partitions(%s)", (start,))
+    conn.execute("select setseed(0.42)")
+    conn.execute(
+        "insert into app.categories (category_name) select unnest(%s::text[]) on conflict (category_name) do nothing",
+        (names,),
+    )
+    conn.execute(
+        "insert into app.prompts (prompt_name, prompt_content) values (%s, 'synthetic') on conflict (prompt_name) do nothing",
+        (PROMPT_NAME,),
+    )
+    conn.execute(
+        """
+        insert into app.papers (arxiv_id, title, authors, abstract, link, update_date, update_time, primary_category, ingest_at)
+        select
+          format('%%s.%%s', to_char(d.day, 'YYMM'), lpad(g.n::text, 6, '0')) || 'v1',
+          format('Synthetic paper %%s on %%s %%s', g.n, t.topics[1 + g.n %% t.k], t.topics[1 + (g.n / t.k) %% t.k]),
+          'Author A, Author B, Author C',
+          repeat('synthetic abstract text ', 40) || t.topics[1 + (g.n / 7) %% t.k],
+          'http://arxiv.org/abs/' || g.n,
+          d.day,
+          time '00:00' + (g.n %% 1440) * interval '1 minute',
+          'cs.CV',
+          d.day::timestamp + interval '21 hours' + (g.n %% 4) * interval '1 hour'
+        from generate_series(0, %(days)s - 1) as i
+        cross join lateral (select %(start)s::date + i as day) d
+        cross join lateral generate_series(i * %(ppd)s + 1, (i + 1) * %(ppd)s) as g(n)
+        cross join (select %(topics)s::text[] as topics, cardinality(%(topics)s::text[]) as k) t
+        """,
+        {"days": days, "ppd": papers_per_day, "start": start, "topics": SEED_TOPICS},
+    )
+    conn.execute(
+        """
+        with c as (
+          select array_agg(category_id order by category_id) as ids, count(*)::int as k
+          from app.categories where category_name = any(%(names)s)
+        )
+        insert into app.paper_categories (paper_id, category_id)
+        select p.paper_id, c.ids[1 + (p.paper_id %% c.k)] from app.papers p, c
+        union
+        select p.paper_id, c.ids[1 + ((p.paper_id + 1) %% c.k)] from app.papers p, c where random() < %(crosslist)s
+        on conflict do nothing
+        """,
+        {"names": names, "crosslist": crosslist},
+    )
+    conn.execute(
+        """
+        insert into app.analysis_results (paper_id, prompt_id, analysis_result, update_date)
+        select p.paper_id, pr.prompt_id,
+               jsonb_build_object('pass_filter', p.paper_id %% 3 = 0, 'raw_score', p.paper_id %% 10, 'norm_score', (p.paper_id %% 10) / 10.0),
+               p.update_date
+        from app.papers p
+        join app.prompts pr on pr.prompt_name = %(prompt)s
+        where random() < %(analyzed)s
+        """,
+        {"prompt": PROMPT_NAME, "analyzed": analyzed},
+    )
+    conn.execute(
+        """
+        update app.papers
+        set author_affiliation = json_build_array(
+          format('Synthetic Lab %%s', paper_id %% %(labs)s),
+          format('The Synthetic University %%s.', paper_id %% 37)
+        )::text
+        where paper_id %% 3 = 0
+        """,
+        {"labs": SEED_LABS},
+    )
+    conn.execute("select app.backfill_paper_affiliations()")
+    conn.execute("vacuum analyze")
+    counts = {
+        table: conn.execute(f"select count(*) from app.{table}").fetchone()[0]
+        for table in ("papers", "paper_categories", "analysis_results", "paper_affiliations")
+    }
+    print(f"🌱 [计划检测] 合成数据已生成: {counts}")
+    return {"days": days, "papers_per_day": papers_per_day, "categories": len(names), "crosslist": crosslist, "analyzed": analyzed, "start": start.isoformat(), "rows": counts}
+
+
+def _walk(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []) or []:
+        yield from _walk(child)
+
+
+def _node_label(node: Dict[str, Any]) -> str:
+    target = node.get("Index Name") or node.get("Relation Name") or ""
+    return f"{node['Node Type']}({target})" if target else node["Node Type"]
+
+
+def analyze_plan(plan: Dict[str, Any], table_rows: Dict[str, float], seq_scan_min_rows: int, estimate_factor: float) -> Dict[str, Any]:
+    """提取计划形状，并标记大表顺序扫描与行数估计偏差。"""
+    flags: List[str] = []
+    shape: List[str] = []
+    for node in _walk(plan["Plan"]):
+        shape.append(_node_label(node))
+        relation = node.get("Relation Name")
+        if node["Node Type"] == "Seq Scan" and table_rows.get(relation, 0) >= seq_scan_min_rows:
+            flags.append(f"seq_scan:{relation}")
+        est, act = node.get("Plan Rows", 0), node.get("Actual Rows", 0)
+        if max(est, act) >= 100 and max(est, act) / max(1, min(est, act)) >= estimate_factor:
+            flags.append(f"estimate:{_node_label(node)} est={est} actual={act}")
+    top = plan["Plan"]
+    return {
+        "shape": shape,
+        "flags": flags,
+        "shared_hit": top.get("Shared Hit Blocks", 0),
+        "shared_read": top.get("Shared Read Blocks", 0),
+    }
+
+
+def _params(conn: Any, date: dt.date, category: str) -> Dict[str, Any]:
+    category_id = conn.execute("select category_id from app.categories where category_name = %s", (category,)).fetchone()
+    prompt = conn.execute("select prompt_id from app.prompts where prompt_name = %s", (PROMPT_NAME,)).fetchone()
+    base_ids = [r[0] for r in conn.execute(
+        "select arxiv_base_id from app.papers where update_date = %s order by paper_id limit 200", (date,)
+    ).fetchall()]
+    return {
+        "date": date,
+        "category": category,
+        "category_id": category_id[0] if category_id else -1,
+        "prompt_id": str(prompt[0]) if prompt else "00000000-0000-0000-0000-000000000000",
+        "base_ids": base_ids,
+        "month_start": date.replace(day=1),
+        "affiliation": "synthetic lab 7",
+    }
+
+
+def run_cases(conn: Any, date: dt.date, category: str, repeat: int, seq_scan_min_rows: int, estimate_factor: float) -> Dict[str, Any]:
+    params = _params(conn, date, category)
+    literals = {k: sql.Literal(v) for k, v in params.items()}
+    table_rows = dict(conn.execute(
+        "select c.relname, c.reltuples from pg_class c join pg_namespace n on n.oid = c.relnamespace "
+        "where n.nspname = 'app' and c.relkind in ('r', 'p')"
+    ).fetchall())
+    results: Dict[str, Any] = {}
+    for name, repo_fn, text in CASES:
+        query = sql.SQL("explain (analyze, buffers, format json) ") + sql.SQL(text.strip()).format(**literals)
+        try:
+            timings, plan = [], None
+            for _ in range(max(1, repeat)):
+                plan = conn.execute(query).fetchone()[0][0]
+                timings.append(plan["Execution Time"])
+        except Exception as e:
+            results[name] = {"repo": repo_fn, "error": str(e).strip()}
+            print(f"❌ [计划检测] {name}: {e}")
+            continue
+        summary = analyze_plan(plan, table_rows, seq_scan_min_rows, estimate_factor)
+        results[name] = {
+            "repo": repo_fn,
+            "execution_ms": round(statistics.median(timings), 3),
+            "planning_ms": round(plan.get("Planning Time", 0.0), 3),
+            **summary,
+            "plan": plan,
+        }
+        flag_text = f" ⚠️ {', '.join(summary['flags'])}" if summary["flags"] else ""
+        print(f"🔎 [计划检测] {name:<36}{results[name]['execution_ms']:>10.2f} ms  {' > '.join(summary['shape'][:4])}{flag_text}")
+    return results
+
+
+def run_write_checks(conn: Any, date: dt.date, category: str) -> Dict[str, Any]:
+    """覆盖导入写路径检测（sql/018 分区后）：在回滚的事务中执行，不改动合成数据。
+
+    - postgrest_overwrite：repo.overwrite_papers_bulk 调用的 SQL 函数 overwrite_papers（sql/020）成批 update，
+      日期跨月时行移动分区；未登记的论文不处理、不返回
+    - pg_overwrite：pg_backend.overwrite_papers 的临时表 + paper_keys 连接 update
+    - upsert_skips_existing：以 (arxiv_base_id, update_date) 为冲突目标的 upsert 对已存在论文不生效（覆盖导入不能走 upsert）
+    """
+    results: Dict[str, Any] = {}
+
+    def record(name: str, ok: bool, detail: str) -> None:
+        results[name] = {"ok": ok, "detail": detail}
+        print(f"{'✅' if ok else '❌'} [写入检测] {name:<28}{detail}")
+
+    with conn.transaction(force_rollback=True):
+        picked = conn.execute(
+            """
+            select p.paper_id, p.arxiv_base_id from app.papers p
+            join app.paper_categories pc on pc.paper_id = p.paper_id
+            join app.categories c on c.category_id = pc.category_id and c.category_name = %s
+            where p.update_date = %s and exists (select 1 from app.analysis_results ar where ar.paper_id = p.paper_id)
+            order by p.paper_id limit 2
+            """,
+            (category, date),
+        ).fetchall()
+        if len(picked) < 2:
+            record("postgrest_overwrite", False, f"{date} {category} 没有可用的已分析论文")
+            return results
+        (pid, base), (pid2, base2) = picked
+        moved_to = date + dt.timedelta(days=40)
+
+        payload = [
+            {"arxiv_id": f"{base}v9", "title": "overwritten", "update_date": moved_to.isoformat()},
+            {"arxiv_id": "0000.00000v1", "title": "not registered", "update_date": date.isoformat()},
+        ]
+        returned = conn.execute("select arxiv_base_id, paper_id from app.overwrite_papers(%s::jsonb)", (json.dumps(payload),)).fetchall()
+        row = conn.execute(
+            "select tableoid::regclass::text, title, update_date from app.papers where paper_id = %s", (pid,)
+        ).fetchall()
+        key_date = conn.execute("select update_date from app.paper_keys where paper_id = %s", (pid,)).fetchone()[0]
+        ar_dates = {r[0] for r in conn.execute("select update_date from app.analysis_results where paper_id = %s", (pid,))}
+        ok = returned == [(base, pid)] and len(row) == 1 and row[0][1] == "overwritten" and key_date == moved_to and ar_dates == {moved_to}
+        record("postgrest_overwrite", ok, f"returned={returned} rows={row} paper_keys={key_date} analysis_dates={sorted(ar_dates)}")
+
+        conn.execute("create temp table _check_overwrite on commit drop as select arxiv_base_id, title from app.papers with no data")
+        conn.execute("insert into _check_overwrite values (%s, 'overwritten via stage')", (base2,))
+        cur = conn.execute(
+            "update app.papers p set title = s.title from _check_overwrite s join app.paper_keys k on k.arxiv_base_id = s.arxiv_base_id "
+            "where p.paper_id = k.paper_id and p.update_date = k.update_date"
+        )
+        title = conn.execute("select title from app.papers where paper_id = %s", (pid2,)).fetchone()[0]
+        record("pg_overwrite", cur.rowcount == 1 and title == "overwritten via stage", f"updated={cur.rowcount} title={title!r}")
+
+        cur = conn.execute(
+            "insert into app.papers (arxiv_id, title, update_date) values (%s, 'upsert attempt', %s) "
+            "on conflict (arxiv_base_id, update_date) do update set title = excluded.title",
+            (f"{base2}v9", date),
+        )
+        title = conn.execute("select title from app.papers where paper_id = %s", (pid2,)).fetchone()[0]
+        record("upsert_skips_existing", cur.rowcount == 0 and title == "overwritten via stage", f"affected={cur.rowcount} title={title!r}")
+
+        drift = conn.execute(
+            """
+            select count(*) from (
+              select pc.category_id, p.update_date, count(*) as n
+              from app.paper_categories pc join app.papers p on p.paper_id = pc.paper_id
+              where p.update_date in (%(a)s, %(b)s) group by 1, 2
+            ) actual
+            full join (
+              select category_id, update_date, paper_count as n from app.category_day_counts
+              where update_date in (%(a)s, %(b)s) and paper_count > 0
+            ) counted using (category_id, update_date)
+            where actual.n is distinct from counted.n
+            """,
+            {"a": date, "b": moved_to},
+        ).fetchone()[0]
+        record("counts_after_overwrite", drift == 0, f"category_day_counts 偏差 {drift} 处")
+    return results
+
+
+def diff_baseline(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float, min_delta_ms: float) -> List[str]:
+    """对比基线：耗时超出容忍倍数、计划形状变化、新增标记、报错均视为回归。"""
+    regressions: List[str] = []
+    for name, cur in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            continue
+        if "error" in cur:
+            if "error" not in base:
+                regressions.append(f"{name}: 查询失败 {cur['error']}")
+            continue
+        if "error" in base:
+            continue
+        if cur["execution_ms"] > base["execution_ms"] * tolerance and cur["execution_ms"] - base["execution_ms"] > min_delta_ms:
+            regressions.append(f"{name}: 耗时 {base['execution_ms']}ms -> {cur['execution_ms']}ms")
+        if cur["shape"] != base["shape"]:
+            regressions.append(f"{name}: 计划变化 {' > '.join(base['shape'])}  =>  {' > '.join(cur['shape'])}")
+        new_flags = sorted(set(cur["flags"]) - set(base["flags"]))
+        if new_flags:
+            regressions.append(f"{name}: 新增标记 {', '.join(new_flags)}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="repo 查询计划回归检测（本地 Postgres）")
+    parser.add_argument("--dsn", default=os.getenv("PLAN_HARNESS_DSN"), help="本地 Postgres 连接串（或 PLAN_HARNESS_DSN）")
+    parser.add_argument("--setup", action="store_true", help="先执行 sql/ 全部迁移（用于空库）")
+    parser.add_argument("--seed", action="store_true", help="清空论文相关表并生成合成数据")
+    parser.add_argument("--days", type=int, default=30, help="合成数据天数（默认 30）")
+    parser.add_argument("--papers-per-day", type=int, default=2000, help="每天论文数（默认 2000）")
+    parser.add_argument("--categories", type=int, default=8, help="分类数（默认 8）")
+    parser.add_argument("--crosslist", type=float, default=0.3, help="交叉列出到第二个分类的比例（默认 0.3）")
+    parser.add_argument("--analyzed", type=float, default=0.5, help="已有分析结果的比例（默认 0.5）")
+    parser.add_argument("--start", default="2025-07-01", help="合成数据起始日期")
+    parser.add_argument("--date", default=None, help="查询日期（默认合成数据的中间一天）")
+    parser.add_argument("--category", default="cs.CV", help="查询分类（默认 cs.CV）")
+    parser.add_argument("--repeat", type=int, default=3, help="每条查询执行次数，取中位数（默认 3）")
+    parser.add_argument("--seq-scan-min-rows", type=int, default=10000, help="对多大的表标记顺序扫描（默认 10000 行）")
+    parser.add_argument("--estimate-factor", type=float, default=10.0, help="估计行数与实际偏差多少倍时标记（默认 10）")
+    parser.add_argument("--baseline", default="plan_baseline.json", help="基线文件路径")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基线")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="耗时回归容忍倍数（默认 1.5）")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="耗时增加少于该值时忽略（默认 1ms）")
+    args = parser.parse_args(argv)
+
+    if psycopg is None:
+        print("需要安装 psycopg：pip install \"psycopg[binary]\"")
+        return 2
+    if not args.dsn:
+        print("请通过 --dsn 或 PLAN_HARNESS_DSN 指定本地 Postgres")
+        return 2
+    if args.seed and args.dsn in (os.getenv("SUPABASE_DB_URL"), os.getenv("DATABASE_URL")):
+        print("❌ --seed 会清空论文相关表，拒绝在 SUPABASE_DB_URL/DATABASE_URL 指向的库上执行")
+        return 2
+
+    start = dt.date.fromisoformat(args.start)
+    date = dt.date.fromisoformat(args.date) if args.date else start + dt.timedelta(days=args.days // 2)
+    report: Dict[str, Any] = {"generated_at": dt.datetime.now(dt.timezone.utc).isoformat(), "date": date.isoformat(), "category": args.category}
+
+    # ClientCursor：客户端绑定参数，迁移文件可整文件作为多语句执行
+    with psycopg.connect(args.dsn, autocommit=True, cursor_factory=psycopg.ClientCursor) as conn:
+        report["server_version"] = conn.execute("show server_version").fetchone()[0]
+        if args.setup:
+            report["migrations"] = setup_schema(conn)
+        if args.seed:
+            report["seed"] = seed(conn, args.days, args.papers_per_day, args.categories, args.crosslist, args.analyzed, start)
+        report["cases"] = run_cases(conn, date, args.category, args.repeat, args.seq_scan_min_rows, args.estimate_factor)
+        report["writes"] = run_write_checks(conn, date, args.category)
+    write_failures = [name for name, r in report["writes"].items() if not r["ok"]]
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    regressions: List[str] = []
+    if baseline and not args.update_baseline:
+        regressions = diff_baseline(baseline, report, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print(f"\n⚠️  [计划检测] 与基线 {args.baseline} 相比发现 {len(regressions)} 处回归:")
+            for line in regressions:
+                print(f"   - {line}")
+        else:
+            print(f"\n✅ [计划检测] 与基线 {args.baseline} 一致")
+
+    if args.update_baseline or baseline is None:
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, ensure_ascii=False, indent=2, default=str)
+        print(f"💾 [计划检测] 基线已写入 {args.baseline}")
+    return 1 if regressions or write_failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
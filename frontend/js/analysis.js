@@ -283,6 +283,22 @@ async function loadAnalysisResults(rangeTypeToLoad = 'full') {
         setButtonLoading('showExistingBtn', true, '加载中...');
         const overlay = document.getElementById('overlayLoading');
         if (overlay) overlay.style.display = 'flex';
+
+        if (rangeTypeToLoad === 'full') {
+            // 全部结果按游标分页获取：首页到达即渲染，全部到齐后再统一显示并创建批次按钮
+            const result = await fetchAnalysisResultsPaged(selectedDate, selectedCategory, (firstPage) => {
+                if (overlay) overlay.style.display = 'none';
+                displayAnalysisResults(firstPage);
+            });
+            if (result.error) {
+                showError(result.error);
+                return;
+            }
+            await showAnalysisResultsWithBatchesOptimized(result.articles, result.articles.length, selectedDate, selectedCategory);
+            updateUrlState('analysis', selectedDate, selectedCategory, 'full');
+            return;
+        }
+
         const response = await fetch('/api/get_analysis_results', {
             method: 'POST',
             headers: {
@@ -323,6 +339,35 @@ async function loadAnalysisResults(rangeTypeToLoad = 'full') {
     }
 }
 
+async function fetchAnalysisResultsPaged(date, category, onFirstPage) {
+    // 依次请求 /api/get_analysis_results_paged 直到没有下一页；返回 {articles} 或 {error}
+    let articles = [];
+    let cursor = null;
+    do {
+        const response = await fetch('/api/get_analysis_results_paged', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                date: date,
+                category: category,
+                cursor: cursor
+            })
+        });
+        const data = await response.json();
+        if (!response.ok) {
+            return { error: data.error || '加载分析结果失败' };
+        }
+        if (!cursor && onFirstPage && data.articles.length > 0) {
+            onFirstPage(data.articles);
+        }
+        articles = articles.concat(data.articles);
+        cursor = data.has_more ? data.next_cursor : null;
+    } while (cursor);
+    return { articles: articles };
+}
+
 function retryAnalysis() {
     // 获取当前的日期和分类
     const selectedDate = document.getElementById('dateSelect').value;
@@ -32,8 +32,7 @@ document.addEventListener('DOMContentLoaded', async function() {
     
     // 加载可用的日期列表
     try {
-        const response = await fetch('/api/available_dates');
-        const data = await response.json();
+        const data = await fetchAvailableDates();
         
         if (data.dates && data.dates.length > 0) {
             // 更新日期选择器的提示
@@ -60,3 +59,20 @@ document.addEventListener('DOMContentLoaded', async function() {
     }
 });
 
+async function fetchAvailableDates() {
+    // 最近日期短缓存；已定型部分按 settled_before 取，URL 每天只变一次，浏览器可长期缓存
+    const recentResponse = await fetch('/api/available_dates?recent=1');
+    const recent = await recentResponse.json();
+    if (!recentResponse.ok || !recent.settled_before) {
+        return recent;
+    }
+    const settledResponse = await fetch(`/api/available_dates?settled_before=${recent.settled_before}`);
+    const settled = await settledResponse.json();
+    if (!settledResponse.ok) {
+        return recent;
+    }
+    return {
+        dates: recent.dates.concat(settled.dates),
+        counts: Object.assign({}, settled.counts, recent.counts)
+    };
+}
@@ -12,18 +12,12 @@ async function searchArticles() {
     }
 
     showLoading();
+    // 每次搜索递增，翻页过程中发起了新搜索时旧的翻页循环自行退出
+    const searchToken = (window.AppState.searchToken || 0) + 1;
+    window.AppState.searchToken = searchToken;
 
     try {
-        const response = await fetch('/api/search_articles', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                date: selectedDate,
-                category: selectedCategory
-            })
-        });
+        const response = await fetchArticlesPage(selectedDate, selectedCategory, null);
 
         const data = await response.json();
 
@@ -39,7 +33,11 @@ async function searchArticles() {
             
             displayArticles(data.articles);
             updateStats(data.articles);
-            showSuccess(`日期分类筛选完成！成功加载 ${selectedDate} 的文章数据，共 ${data.total} 篇文章`);
+            if (data.has_more) {
+                showSuccess(`已加载 ${selectedDate} 的前 ${data.articles.length} 篇文章，其余文章加载中...`);
+            } else {
+                showSuccess(`日期分类筛选完成！成功加载 ${selectedDate} 的文章数据，共 ${data.articles.length} 篇文章`);
+            }
             
             // 启用普通分析按钮
             document.getElementById('analyzeBtn').disabled = false;
@@ -64,6 +62,10 @@ async function searchArticles() {
             
             // 更新URL状态
             updateUrlState('search', selectedDate, selectedCategory);
+
+            if (data.has_more) {
+                await loadRemainingPages(selectedDate, selectedCategory, data.next_cursor, searchToken);
+            }
         } else {
             // 如果有search_url，显示带链接的错误消息
             if (data.search_url) {
@@ -84,8 +86,46 @@ async function searchArticles() {
     }
 }
 
-function displayArticles(articles) {
+function fetchArticlesPage(selectedDate, selectedCategory, cursor) {
+    return fetch('/api/search_articles_paged', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            date: selectedDate,
+            category: selectedCategory,
+            cursor: cursor
+        })
+    });
+}
+
+async function loadRemainingPages(selectedDate, selectedCategory, cursor, searchToken) {
+    // 首页已渲染，后续页按游标依次获取并追加到表格末尾
+    while (cursor) {
+        const response = await fetchArticlesPage(selectedDate, selectedCategory, cursor);
+        const data = await response.json();
+        if (window.AppState.searchToken !== searchToken) {
+            return;
+        }
+        if (!response.ok) {
+            showError(data.error || '加载后续文章失败');
+            return;
+        }
+        window.AppState.currentArticles = window.AppState.currentArticles.concat(data.articles);
+        displayArticles(data.articles, true);
+        cursor = data.has_more ? data.next_cursor : null;
+    }
+    updateStats(window.AppState.currentArticles);
+    showSuccess(`日期分类筛选完成！成功加载 ${selectedDate} 的文章数据，共 ${window.AppState.currentArticles.length} 篇文章`);
+}
+
+function displayArticles(articles, append = false) {
     const tableBody = document.getElementById('tableBody');
+    if (append) {
+        appendArticleRows(tableBody, articles);
+        return;
+    }
     tableBody.innerHTML = '';
 
     // 更新表头为搜索结果格式
@@ -97,6 +137,12 @@ function displayArticles(articles) {
         <th class="abstract-cell">摘要</th>
     `;
 
+    appendArticleRows(tableBody, articles);
+
+    document.getElementById('tableContainer').style.display = 'block';
+}
+
+function appendArticleRows(tableBody, articles) {
     articles.forEach(article => {
         const row = document.createElement('tr');
         row.innerHTML = `
@@ -124,6 +170,4 @@ function displayArticles(articles) {
         `;
         tableBody.appendChild(row);
     });
-
-    document.getElementById('tableContainer').style.display = 'block';
 }
\ No newline at end of file
@@ -8,7 +8,7 @@ import threading
 import subprocess
 import hmac
 import hashlib
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # 加载环境变量文件
 try:
@@ -19,12 +19,18 @@ except ImportError:
 
 # 导入重构后的服务层
 from backend.services.analysis_service import analyze_paper
+from backend.services.analysis_sink import AnalysisResultSink
 from backend.services.arxiv_service import import_arxiv_papers
 from backend.services.affiliation_service import get_author_affiliations, clear_affiliation_cache
 from backend.services.concurrent_analysis_service import get_concurrent_service, run_performance_comparison
 from backend.services.smart_search_service import smart_search_papers
+from backend.services.preingest_service import start_preingest_scheduler, get_preingest_scheduler, latest_closed_date
 from backend.clients.ai_client import DoubaoClient
+from backend.clients.arxiv_client import configured_categories
+from backend.clients.feed_cache import clear_feed_cache
+from backend.clients import rate_limiter
 from backend.db import repo as db_repo
+from backend.db import registry as db_registry
 
 # 向后兼容的别名
 import_arxiv_papers_to_db = import_arxiv_papers
@@ -33,6 +39,9 @@ import_arxiv_papers_to_db = import_arxiv_papers
 _search_cache = {}
 _cache_expiry = {}
 CACHE_TTL = 300  # 5分钟缓存
+PREINGEST_CACHE_TTL = int(os.getenv('PREINGEST_CACHE_TTL', '21600'))  # 预导入预热的缓存保留6小时
+AVAILABLE_DATES_MAX_AGE = int(os.getenv('AVAILABLE_DATES_MAX_AGE', '300'))  # 日期列表的浏览器缓存时间
+AVAILABLE_DATES_PAST_MAX_AGE = int(os.getenv('AVAILABLE_DATES_PAST_MAX_AGE', '86400'))  # 已定型日期的浏览器缓存时间
 
 app = Flask(__name__)
 CORS(app)  # 允许跨域请求
@@ -68,9 +77,161 @@ def health_check():
         'status': 'healthy',
         'service': 'arxiv-accelerator',
         'timestamp': datetime.now().isoformat(),
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'arxiv_rate_limits': rate_limiter.snapshot(),
+        'preingest': (get_preingest_scheduler().last_run or None) if get_preingest_scheduler() else None,
+        'registry': db_registry.snapshot()
     })
 
+def warm_search_cache(date_str, categories, stats=None):
+    """预导入完成后预热搜索缓存：写入当日各分类列表，并标记为已导入。
+
+    只处理库中已有论文的分类；空分类不打导入标记，交互搜索仍会自行从 arXiv 导入。
+    """
+    current_time = time.time()
+    for category in categories:
+        articles = db_repo.list_papers_by_date_category(date_str, category)
+        if not articles:
+            continue
+        _cache_expiry[f"import_{date_str}_{category}"] = current_time + PREINGEST_CACHE_TTL
+        cache_key = f"{date_str}_{category}"
+        _search_cache[cache_key] = {
+            'articles': articles,
+            'total': len(articles),
+            'debug': {'processed': len(articles), 'db_count': len(articles), 'category': category, 'date': date_str, 'preingest': True}
+        }
+        _cache_expiry[cache_key] = current_time + PREINGEST_CACHE_TTL
+        print(f"🔥 [预导入] 缓存已预热 | key={cache_key} total={len(articles)} ttl={PREINGEST_CACHE_TTL}s")
+
+
+def arxiv_search_url(selected_date, selected_category):
+    """构建arXiv搜索URL供用户直接查看（窗口：前一日 20:00 ET ~ 当日 20:00 ET）"""
+    import datetime as dt
+    import pytz
+    target_date = dt.datetime.strptime(selected_date, "%Y-%m-%d").date()
+    et_tz = pytz.timezone("US/Eastern")
+    start_et = et_tz.localize(dt.datetime.combine(target_date - dt.timedelta(days=1), dt.time(20, 0)))
+    end_et = et_tz.localize(dt.datetime.combine(target_date, dt.time(20, 0)))
+    start_date_str = start_et.astimezone(dt.timezone.utc).strftime("%Y%m%d%H%M%S")
+    end_date_str = end_et.astimezone(dt.timezone.utc).strftime("%Y%m%d%H%M%S")
+    
+    base = os.getenv("ARXIV_API_BASE", "https://export.arxiv.org/api/query")
+    return (
+        f"{base}?"
+        f"search_query=cat:{selected_category}+AND+submittedDate:[{start_date_str}+TO+{end_date_str}]&"
+        "sortBy=submittedDate&sortOrder=descending&"
+        "max_results=2000"
+    )
+
+
+def refresh_day_import(selected_date, selected_category):
+    """按需从 arXiv 刷新某日期+分类的论文（30分钟内只刷新一次），返回 (stats, import_time)。"""
+    # 🚀 新策略：基于时间的智能缓存（而非完全跳过API）
+    import_time = 0
+    stats = {'processed': 0, 'total_upsert': 0}
+    current_time = time.time()
+
+    # 检查最近是否已经导入过（短时间缓存）
+    import_cache_key = f"import_{selected_date}_{selected_category}"
+    should_skip_import = False
+
+    if import_cache_key in _cache_expiry:
+        if current_time < _cache_expiry[import_cache_key]:
+            # 30分钟内已导入过，跳过ArXiv API
+            should_skip_import = True
+            print(f"⚡ [搜索性能] 30分钟内已导入，跳过ArXiv API调用")
+
+    # 初始化变量
+    import_time = 0
+    stats = {'processed': 0, 'total_upsert': 0}
+    skip_db_read = False
+
+    watermark = None if should_skip_import else db_repo.get_ingest_watermark(selected_date, selected_category)
+    if watermark:
+        # 📈 已有导入水位线：只查询水位线之后的新提交，跳过全窗口ID检查
+        try:
+            import_start = time.time()
+            stats = import_arxiv_papers_to_db(selected_date, selected_category, limit=None, skip_if_exists=True, incremental=True)
+            import_time = time.time() - import_start
+            print(f"⏱️  [搜索性能] 增量刷新完成，耗时: {import_time:.2f}s | 新增processed={stats.get('processed', 0)} upserted={stats.get('total_upsert', 0)}")
+            if stats.get('total_upsert', 0) or stats.get('total_link', 0):
+                _cache_expiry.pop(f"{selected_date}_{selected_category}", None)
+        except Exception as e:
+            import_time = time.time() - import_start
+            print(f"❌ [搜索性能] 增量刷新失败，耗时: {import_time:.2f}s | 错误: {e}")
+        # 增量统计只含新增部分，不参与与DB数量的一致性对比
+        stats = {}
+        _cache_expiry[import_cache_key] = current_time + 1800
+    elif not should_skip_import:
+        # 🚀 新策略：智能检查是否真的需要导入
+        smart_check_start = time.time()
+
+        # 1) 先获取ArXiv API数据（轻量级，只获取ID列表）
+        arxiv_ids = db_repo.get_arxiv_ids_from_api(selected_date, selected_category)
+        api_check_time = time.time() - smart_check_start
+        print(f"⏱️  [搜索性能] ArXiv API ID检查完成，耗时: {api_check_time:.2f}s | ArXiv返回 {len(arxiv_ids)} 条")
+
+        if not arxiv_ids:
+            print(f"📭 [搜索性能] ArXiv API无数据，跳过导入")
+            import_time = 0
+        else:
+            # 🚀 新优化：一体化检查+读取，避免两次DB查询
+            unified_start = time.time()
+            result = db_repo.smart_check_and_read(selected_date, selected_category, arxiv_ids)
+            unified_time = time.time() - unified_start
+
+            existing_ids = result.get('existing_ids', [])
+            cached_articles = result.get('articles', [])
+
+            print(f"⏱️  [搜索性能] 一体化查询完成，耗时: {unified_time:.2f}s | 该分类已有 {len(existing_ids)} 条")
+
+            missing_ids = set(arxiv_ids) - set(existing_ids)
+
+            # 🔧 修复：检查分类关联的完整性
+            expected_linked_count = len(existing_ids)  # 已存在的论文数量
+            actual_linked_count = len(cached_articles)  # 已建立分类关联的论文数量
+
+            if not missing_ids and expected_linked_count == actual_linked_count and len(cached_articles) >= len(existing_ids):
+                # 所有数据都已存在且分类关联完整，跳过导入
+                print(f"⚡ [搜索性能] 所有数据已存在且分类关联完整({actual_linked_count}/{expected_linked_count})，跳过导入")
+                import_time = 0
+                stats = {'processed': len(existing_ids), 'total_upsert': 0}
+                # 🔧 修复：一体化查询可能返回旧数据，强制使用标准DB查询
+                print(f"⚠️  [搜索性能] 为确保数据完整性，使用标准DB查询而非缓存数据")
+                skip_db_read = False
+            elif not missing_ids:
+                # 论文已存在但分类关联不完整，需要补建关联
+                print(f"🔗 [搜索性能] 论文已存在但分类关联不完整({actual_linked_count}/{expected_linked_count})，补建关联")
+                skip_db_read = False
+                try:
+                    import_start = time.time()
+                    stats = import_arxiv_papers_to_db(selected_date, selected_category, limit=None, skip_if_exists=True)
+                    import_time = time.time() - import_start
+                    print(f"⏱️  [搜索性能] 补建关联完成，耗时: {import_time:.2f}s | processed={stats.get('processed', 0)} links={stats.get('total_link', 0)}")
+                except Exception as e:
+                    import_time = time.time() - import_start if 'import_start' in locals() else 0
+                    print(f"❌ [搜索性能] 补建关联失败，耗时: {import_time:.2f}s | 错误: {e}")
+                    skip_db_read = False
+            elif missing_ids:
+                # 导入缺失的数据
+                print(f"📥 [搜索性能] 发现 {len(missing_ids)} 条新数据，开始增量导入")
+                skip_db_read = False
+                try:
+                    import_start = time.time()
+                    stats = import_arxiv_papers_to_db(selected_date, selected_category, limit=None, skip_if_exists=True)
+                    import_time = time.time() - import_start
+                    print(f"⏱️  [搜索性能] 增量导入完成，耗时: {import_time:.2f}s | processed={stats.get('processed', 0)} upserted={stats.get('total_upsert', 0)}")
+                except Exception as e:
+                    import_time = time.time() - import_start if 'import_start' in locals() else 0
+                    print(f"❌ [搜索性能] 导入失败，耗时: {import_time:.2f}s | 错误: {e}")
+                    skip_db_read = False
+
+            # 设置导入缓存（30分钟）
+            _cache_expiry[import_cache_key] = current_time + 1800
+
+    return stats, import_time
+
+
 @app.route('/api/search_articles', methods=['POST'])
 def search_articles():
     import time
@@ -87,92 +248,9 @@ def search_articles():
 
         print(f"🚀 [搜索性能] 开始搜索 | date={selected_date} category={selected_category}")
 
-        # 🚀 新策略：基于时间的智能缓存（而非完全跳过API）
-        import_time = 0
-        stats = {'processed': 0, 'total_upsert': 0}
         current_time = time.time()
-        
-        # 检查最近是否已经导入过（短时间缓存）
-        import_cache_key = f"import_{selected_date}_{selected_category}"
-        should_skip_import = False
-        
-        if import_cache_key in _cache_expiry:
-            if current_time < _cache_expiry[import_cache_key]:
-                # 30分钟内已导入过，跳过ArXiv API
-                should_skip_import = True
-                print(f"⚡ [搜索性能] 30分钟内已导入，跳过ArXiv API调用")
-        
-        # 初始化变量
-        import_time = 0
-        stats = {'processed': 0, 'total_upsert': 0}
+        stats, import_time = refresh_day_import(selected_date, selected_category)
         skip_db_read = False
-        
-        if not should_skip_import:
-            # 🚀 新策略：智能检查是否真的需要导入
-            smart_check_start = time.time()
-            
-            # 1) 先获取ArXiv API数据（轻量级，只获取ID列表）
-            arxiv_ids = db_repo.get_arxiv_ids_from_api(selected_date, selected_category)
-            api_check_time = time.time() - smart_check_start
-            print(f"⏱️  [搜索性能] ArXiv API ID检查完成，耗时: {api_check_time:.2f}s | ArXiv返回 {len(arxiv_ids)} 条")
-            
-            if not arxiv_ids:
-                print(f"📭 [搜索性能] ArXiv API无数据，跳过导入")
-                import_time = 0
-            else:
-                # 🚀 新优化：一体化检查+读取，避免两次DB查询
-                unified_start = time.time()
-                result = db_repo.smart_check_and_read(selected_date, selected_category, arxiv_ids)
-                unified_time = time.time() - unified_start
-                
-                existing_ids = result.get('existing_ids', [])
-                cached_articles = result.get('articles', [])
-                
-                print(f"⏱️  [搜索性能] 一体化查询完成，耗时: {unified_time:.2f}s | 该分类已有 {len(existing_ids)} 条")
-                
-                missing_ids = set(arxiv_ids) - set(existing_ids)
-                
-                # 🔧 修复：检查分类关联的完整性
-                expected_linked_count = len(existing_ids)  # 已存在的论文数量
-                actual_linked_count = len(cached_articles)  # 已建立分类关联的论文数量
-                
-                if not missing_ids and expected_linked_count == actual_linked_count and len(cached_articles) >= len(existing_ids):
-                    # 所有数据都已存在且分类关联完整，跳过导入
-                    print(f"⚡ [搜索性能] 所有数据已存在且分类关联完整({actual_linked_count}/{expected_linked_count})，跳过导入")
-                    import_time = 0
-                    stats = {'processed': len(existing_ids), 'total_upsert': 0}
-                    # 🔧 修复：一体化查询可能返回旧数据，强制使用标准DB查询
-                    print(f"⚠️  [搜索性能] 为确保数据完整性，使用标准DB查询而非缓存数据")
-                    skip_db_read = False
-                elif not missing_ids:
-                    # 论文已存在但分类关联不完整，需要补建关联
-                    print(f"🔗 [搜索性能] 论文已存在但分类关联不完整({actual_linked_count}/{expected_linked_count})，补建关联")
-                    skip_db_read = False
-                    try:
-                        import_start = time.time()
-                        stats = import_arxiv_papers_to_db(selected_date, selected_category, limit=None, skip_if_exists=True)
-                        import_time = time.time() - import_start
-                        print(f"⏱️  [搜索性能] 补建关联完成，耗时: {import_time:.2f}s | processed={stats.get('processed', 0)} links={stats.get('total_link', 0)}")
-                    except Exception as e:
-                        import_time = time.time() - import_start if 'import_start' in locals() else 0
-                        print(f"❌ [搜索性能] 补建关联失败，耗时: {import_time:.2f}s | 错误: {e}")
-                        skip_db_read = False
-                elif missing_ids:
-                    # 导入缺失的数据
-                    print(f"📥 [搜索性能] 发现 {len(missing_ids)} 条新数据，开始增量导入")
-                    skip_db_read = False
-                    try:
-                        import_start = time.time()
-                        stats = import_arxiv_papers_to_db(selected_date, selected_category, limit=None, skip_if_exists=True)
-                        import_time = time.time() - import_start
-                        print(f"⏱️  [搜索性能] 增量导入完成，耗时: {import_time:.2f}s | processed={stats.get('processed', 0)} upserted={stats.get('total_upsert', 0)}")
-                    except Exception as e:
-                        import_time = time.time() - import_start if 'import_start' in locals() else 0
-                        print(f"❌ [搜索性能] 导入失败，耗时: {import_time:.2f}s | 错误: {e}")
-                        skip_db_read = False
-                
-                # 设置导入缓存（30分钟）
-                _cache_expiry[import_cache_key] = current_time + 1800
 
         # 2) 从数据库读取并返回给前端（保持原协议字段）
         # 🚀 缓存策略：检查缓存
@@ -228,29 +306,9 @@ def search_articles():
             return jsonify({'error': f'从数据库读取失败: {e}'}), 500
 
         if len(articles) == 0:
-            # 构建arXiv搜索URL供用户直接查看
-            import datetime as dt
-            import pytz
-            target_date = dt.datetime.strptime(selected_date, "%Y-%m-%d").date()
-            et_tz = pytz.timezone("US/Eastern")
-            start_et = et_tz.localize(dt.datetime.combine(target_date - dt.timedelta(days=1), dt.time(20, 0)))
-            end_et = et_tz.localize(dt.datetime.combine(target_date, dt.time(20, 0)))
-            start_utc = start_et.astimezone(dt.timezone.utc)
-            end_utc = end_et.astimezone(dt.timezone.utc)
-            start_date_str = start_utc.strftime("%Y%m%d%H%M%S")
-            end_date_str = end_utc.strftime("%Y%m%d%H%M%S")
-            
-            base = os.getenv("ARXIV_API_BASE", "https://export.arxiv.org/api/query")
-            search_url = (
-                f"{base}?"
-                f"search_query=cat:{selected_category}+AND+submittedDate:[{start_date_str}+TO+{end_date_str}]&"
-                "sortBy=submittedDate&sortOrder=descending&"
-                "max_results=2000"
-            )
-            
             return jsonify({
                 'error': f'当天没有新的{selected_category}论文被提交到arXiv，或数据尚未同步。请稍后重试。',
-                'search_url': search_url
+                'search_url': arxiv_search_url(selected_date, selected_category)
             }), 404
 
         # 🚀 更新缓存
@@ -284,6 +342,172 @@ def search_articles():
     except Exception as e:
         return jsonify({'error': f'服务器错误: {str(e)}'}), 500
 
+@app.route('/api/search_articles_paged', methods=['POST'])
+def search_articles_paged():
+    """分页版搜索：按 arxiv_id 倒序返回一页论文和 next_cursor
+
+    请求: {date, category, cursor?, page_size?}；第一页（无 cursor）时按需刷新导入，后续页只读库。
+    """
+    try:
+        data = request.get_json() or {}
+        selected_date = data.get('date')
+        selected_category = data.get('category', 'cs.CV')
+        cursor = data.get('cursor')
+        if not selected_date:
+            return jsonify({'error': '请选择日期'}), 400
+
+        start = time.time()
+        import_time = 0
+        if not cursor:
+            _, import_time = refresh_day_import(selected_date, selected_category)
+
+        # 与 /api/search_articles 共用缓存（含预导入预热的列表）；游标按 arxiv_id 定位，缓存页与数据库页可混用
+        cache_key = f"{selected_date}_{selected_category}"
+        cached = _search_cache.get(cache_key) if time.time() < _cache_expiry.get(cache_key, 0) else None
+        try:
+            if cached:
+                print(f"⚡ [搜索性能] 分页缓存命中，跳过DB查询 | key={cache_key}")
+                page = db_repo.page_articles(cached['articles'], cursor=cursor, page_size=data.get('page_size'))
+            else:
+                page = db_repo.list_papers_page(selected_date, selected_category, cursor=cursor, page_size=data.get('page_size'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if not cursor and not page['articles']:
+            return jsonify({
+                'error': f'当天没有新的{selected_category}论文被提交到arXiv，或数据尚未同步。请稍后重试。',
+                'search_url': arxiv_search_url(selected_date, selected_category)
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'articles': page['articles'],
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more'],
+            'date': selected_date,
+            'category': selected_category,
+            'performance': {
+                'total_time': round(time.time() - start, 2),
+                'import_time': round(import_time, 2),
+                'cache_hit': bool(cached)
+            }
+        })
+    except Exception as e:
+        return jsonify({'error': f'服务器错误: {str(e)}'}), 500
+
+@app.route('/api/fulltext_search', methods=['POST'])
+def fulltext_search():
+    """标题/摘要全文检索：按相关度分页返回论文
+
+    请求: {query, date?, date_from?, date_to?, category?, pass_filter?, cursor?, page_size?}
+    date 为单日检索的简写；pass_filter 为 true/false 时只返回已分析且结果匹配的论文。
+    """
+    try:
+        data = request.get_json() or {}
+        query = (data.get('query') or '').strip()
+        if not query:
+            return jsonify({'error': '请输入检索关键词'}), 400
+
+        date_from = data.get('date_from') or data.get('date')
+        date_to = data.get('date_to') or data.get('date')
+        try:
+            for value in (date_from, date_to):
+                if value:
+                    datetime.strptime(value, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            return jsonify({'error': '日期格式应为 YYYY-MM-DD'}), 400
+
+        pass_filter = data.get('pass_filter')
+        if pass_filter is not None and not isinstance(pass_filter, bool):
+            return jsonify({'error': 'pass_filter 应为 true/false'}), 400
+
+        prompt_id = db_repo.get_prompt_id_by_name("multi-modal-llm") or db_repo.get_prompt_id_by_name("system_default")
+        if pass_filter is not None and not prompt_id:
+            return jsonify({'error': '缺少 prompt: multi-modal-llm'}), 500
+
+        start = time.time()
+        try:
+            page = db_repo.fulltext_search_papers(
+                query,
+                date_from=date_from,
+                date_to=date_to,
+                category=data.get('category'),
+                prompt_id=prompt_id,
+                pass_filter=pass_filter,
+                cursor=data.get('cursor'),
+                page_size=data.get('page_size'),
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({
+            'success': True,
+            'query': query,
+            'articles': page['articles'],
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more'],
+            'performance': {
+                'total_time': round(time.time() - start, 3)
+            }
+        })
+    except Exception as e:
+        return jsonify({'error': f'服务器错误: {str(e)}'}), 500
+
+@app.route('/api/papers_by_affiliation', methods=['POST'])
+def papers_by_affiliation():
+    """按作者机构查询论文：日期倒序分页返回
+
+    请求: {affiliation, month?, date_from?, date_to?, cursor?, page_size?}
+    month 为 YYYY-MM，是整月检索的简写；机构名按整词匹配规范化后的机构名（'MIT' 命中 'MIT CSAIL'）。
+    """
+    try:
+        data = request.get_json() or {}
+        affiliation = (data.get('affiliation') or '').strip()
+        if not affiliation:
+            return jsonify({'error': '请输入机构名称'}), 400
+
+        date_from = data.get('date_from')
+        date_to = data.get('date_to')
+        month = data.get('month')
+        try:
+            if month:
+                first = datetime.strptime(month, '%Y-%m').date()
+                next_month = (first.replace(day=28) + timedelta(days=4)).replace(day=1)
+                date_from = first.isoformat()
+                date_to = (next_month - timedelta(days=1)).isoformat()
+            for value in (date_from, date_to):
+                if value:
+                    datetime.strptime(value, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            return jsonify({'error': '日期格式应为 YYYY-MM-DD，月份格式应为 YYYY-MM'}), 400
+
+        start = time.time()
+        try:
+            page = db_repo.papers_by_affiliation(
+                affiliation,
+                date_from=date_from,
+                date_to=date_to,
+                cursor=data.get('cursor'),
+                page_size=data.get('page_size'),
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({
+            'success': True,
+            'affiliation': affiliation,
+            'date_from': date_from,
+            'date_to': date_to,
+            'articles': page['articles'],
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more'],
+            'performance': {
+                'total_time': round(time.time() - start, 3)
+            }
+        })
+    except Exception as e:
+        return jsonify({'error': f'服务器错误: {str(e)}'}), 500
+
 # def parse_markdown_file(filepath, category_filter=''):
 #     """⚠️ 已废弃：解析markdown文件并提取文章信息（已改用数据库）"""
 
@@ -514,6 +738,7 @@ def performance_comparison():
 def run_db_analysis_task(task_id, pending_papers, selected_date, selected_category, prompt_id):
     """基于数据库待分析集合的后台任务。仅对未分析论文调用模型并写入DB。"""
     import sys
+    result_sink = None
     try:
         with analysis_lock:
             analysis_progress[task_id] = {
@@ -534,6 +759,8 @@ def run_db_analysis_task(task_id, pending_papers, selected_date, selected_catego
 
         success_count = 0
         error_count = 0
+        # 分析结果批量写库（按条数/时间刷写），任务结束前统一落库
+        result_sink = AnalysisResultSink(name=task_id)
 
         for i, m in enumerate(pending_papers):
             paper = {
@@ -560,7 +787,7 @@ def run_db_analysis_task(task_id, pending_papers, selected_date, selected_catego
                 except Exception:
                     ar = { 'raw': result }
 
-                db_repo.insert_analysis_result(
+                result_sink.add(
                     paper_id=paper['paper_id'],
                     prompt_id=prompt_id,
                     analysis_json=ar,
@@ -592,9 +819,7 @@ def run_db_analysis_task(task_id, pending_papers, selected_date, selected_catego
                         
                         affiliations = get_author_affiliations(paper['link'], progress_callback=update_progress)
                         if affiliations:
-                            import json as _json
-                            aff_json = _json.dumps(affiliations, ensure_ascii=False)
-                            db_repo.update_paper_author_affiliation(paper['paper_id'], aff_json)
+                            db_repo.set_paper_affiliations(paper['paper_id'], affiliations)
                         
                         # 恢复处理状态
                         with analysis_lock:
@@ -622,12 +847,15 @@ def run_db_analysis_task(task_id, pending_papers, selected_date, selected_catego
                     analysis_progress[task_id]['error_count'] = error_count
                 continue
 
+        result_sink.close()
         with analysis_lock:
             analysis_progress[task_id]['status'] = 'completed'
             analysis_progress[task_id]['final_success_count'] = success_count
             analysis_progress[task_id]['final_error_count'] = error_count
     except Exception as e:
         print(f"❌ run_db_analysis_task 失败: {e}")
+        if result_sink is not None:
+            result_sink.close()
         with analysis_lock:
             analysis_progress[task_id]['status'] = 'error'
             analysis_progress[task_id]['error'] = str(e)
@@ -793,9 +1021,7 @@ def fetch_affiliations_api():
         aff = get_author_affiliations(link, use_cache=False)  # 强制不使用缓存
         
         if aff and len(aff) > 0:
-            import json as _json
-            aff_json = _json.dumps(aff, ensure_ascii=False)
-            db_repo.update_paper_author_affiliation(int(paper_id), aff_json)
+            db_repo.set_paper_affiliations(int(paper_id), aff)
             print(f"[API] ✅ 成功获取并写入数据库: {len(aff)} 个机构")
             return jsonify({'success': True, 'affiliations': aff})
         else:
@@ -849,6 +1075,46 @@ def get_analysis_results():
     except Exception as e:
         return jsonify({'error': f'服务器错误: {str(e)}'}), 500
 
+@app.route('/api/get_analysis_results_paged', methods=['POST'])
+def get_analysis_results_paged():
+    """分页获取分析结果：按 arxiv_id 倒序返回一页和 next_cursor
+
+    请求: {date, category, cursor?, page_size?, time_filter?, batch_filter?}
+    """
+    try:
+        data = request.get_json() or {}
+        selected_date = data.get('date')
+        selected_category = data.get('category', 'cs.CV')
+        if not selected_date:
+            return jsonify({'error': '请选择日期'}), 400
+
+        prompt_id = db_repo.get_prompt_id_by_name("multi-modal-llm") or db_repo.get_prompt_id_by_name("system_default")
+        if not prompt_id:
+            return jsonify({'error': '缺少 prompt: multi-modal-llm'}), 500
+        try:
+            page = db_repo.get_analysis_results_page(
+                date=selected_date,
+                category=selected_category,
+                prompt_id=prompt_id,
+                cursor=data.get('cursor'),
+                page_size=data.get('page_size'),
+                time_filter=data.get('time_filter'),
+                batch_filter=data.get('batch_filter'),
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        return jsonify({
+            'success': True,
+            'articles': page['articles'],
+            'next_cursor': page['next_cursor'],
+            'has_more': page['has_more'],
+            'date': selected_date,
+            'category': selected_category
+        })
+    except Exception as e:
+        return jsonify({'error': f'服务器错误: {str(e)}'}), 500
+
 @app.route('/api/get_analysis_results_by_ids', methods=['POST'])
 def get_analysis_results_by_ids():
     """获取智能搜索分析结果（基于paper_ids）"""
@@ -895,10 +1161,52 @@ def get_analysis_results_by_ids():
 
 @app.route('/api/available_dates', methods=['GET'])
 def get_available_dates():
-    """获取可用的日期列表"""
+    """获取可用的日期列表（含各分类论文数），带 ETag 与 Cache-Control
+
+    已截止超过 1 天的日期（早于 settled_before）内容基本不再变化，允许浏览器长期缓存：
+    - ?recent=1 只返回 settled_before 及之后的日期（短缓存），响应中带 settled_before；
+    - ?settled_before=YYYY-MM-DD 只返回早于该日期的已定型部分（长缓存，URL 每天变化一次）；
+    - ?date=YYYY-MM-DD 只返回该日期的计数；无参数时返回完整列表（短缓存）。
+    """
     try:
-        dates = db_repo.list_available_dates()
-        return jsonify({'dates': dates})
+        selected_date = request.args.get('date')
+        before = request.args.get('settled_before')
+        for value in (selected_date, before):
+            if value:
+                try:
+                    datetime.strptime(value, '%Y-%m-%d')
+                except ValueError:
+                    return jsonify({'error': '日期格式应为 YYYY-MM-DD'}), 400
+
+        try:
+            entries = db_repo.list_available_date_counts()
+        except Exception as e:
+            print(f"⚠️  日期汇总查询失败，回退到扫描: {e}")
+            entries = [{'date': d, 'category_counts': {}} for d in db_repo.list_available_dates_scan()]
+        
+        settled_before = (latest_closed_date() - timedelta(days=1)).isoformat()
+        max_age = AVAILABLE_DATES_MAX_AGE
+        if selected_date:
+            entries = [e for e in entries if e['date'] == selected_date]
+            if selected_date < settled_before:
+                max_age = AVAILABLE_DATES_PAST_MAX_AGE
+        elif before:
+            entries = [e for e in entries if e['date'] < before]
+            if before <= settled_before:
+                max_age = AVAILABLE_DATES_PAST_MAX_AGE
+        elif request.args.get('recent'):
+            entries = [e for e in entries if e['date'] >= settled_before]
+        
+        payload = {
+            'dates': [e['date'] for e in entries],
+            'counts': {e['date']: e['category_counts'] for e in entries},
+            'settled_before': settled_before
+        }
+        body = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+        resp = jsonify(payload)
+        resp.set_etag(hashlib.sha256(body.encode('utf-8')).hexdigest()[:32])
+        resp.headers['Cache-Control'] = f'public, max-age={max_age}'
+        return resp.make_conditional(request)
         
     except Exception as e:
         return jsonify({'error': f'获取日期列表失败: {str(e)}'}), 500
@@ -1071,6 +1379,17 @@ def clear_cache():
             _cache_expiry.pop(key, None)
         print("🗑️  已清理导入缓存")
     
+    if cache_type in ['all', 'registry', 'prompts']:
+        if cache_type == 'prompts':
+            db_registry.invalidate_prompts()
+        else:
+            db_registry.invalidate_all()
+        print("🗑️  已清理分类/提示词注册表缓存")
+    
+    if cache_type in ['all', 'import', 'feed']:
+        removed = clear_feed_cache()
+        print(f"🗑️  已清理arXiv feed缓存: {removed} 条")
+    
     try:
         clear_affiliation_cache()
         print("🗑️  已清理机构信息缓存")
@@ -1205,6 +1524,17 @@ if __name__ == '__main__':
     
     # 在生产环境中禁用debug模式，但保持日志输出
     is_production = os.getenv('RENDER') is not None
+    
+    # 预热分类/提示词注册表，避免每个请求重复查询
+    try:
+        db_registry.warm(configured_categories())
+        print(f"📒 注册表已预热: {db_registry.snapshot()}")
+    except Exception as e:
+        print(f"⚠️  注册表预热失败（首次请求时再加载）: {e}")
+    
+    # 定时预导入：debug 模式下只在 reloader 子进程中启动，避免重复调度
+    if is_production or os.getenv('WERKZEUG_RUN_MAIN') == 'true':
+        start_preingest_scheduler(on_ingested=warm_search_cache)
     if is_production:
         print("🌐 检测到Render生产环境，优化日志配置")
         print(f"访问地址: https://你的render域名")
@@ -0,0 +1,12 @@
+-- 导入水位线：记录每个 (日期, 分类) 最近一次成功导入时见到的最新提交时间
+-- 刷新时只查询水位线之后的提交，避免重复拉取整个 24 小时窗口
+
+create table if not exists app.ingest_watermarks (
+  update_date date not null,
+  category_id bigint not null references app.categories(category_id) on delete cascade,
+  last_submitted_at timestamptz not null,           -- 已导入论文中最新的 published 时间
+  window_end_at timestamptz not null,               -- 该日期提交窗口的结束时间（20:00 ET）
+  paper_count integer not null default 0,           -- 最近一次导入处理的论文数
+  last_success_at timestamptz not null default now(),
+  primary key (update_date, category_id)
+);
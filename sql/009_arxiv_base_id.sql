@@ -0,0 +1,55 @@
+-- 版本无关的论文标识：arxiv_base_id = 去掉版本号的 arxiv_id（2508.05636v2 -> 2508.05636）
+-- 导入保存带版本号的 ID，智能搜索保存不带版本号的 ID；统一按 arxiv_base_id 查找与去重
+-- 执行前会合并同一论文的重复行（保留版本号最大的一行，迁移分类关联与分析结果）
+
+begin;
+
+-- 1) 生成列
+alter table app.papers
+  add column if not exists arxiv_base_id text
+  generated always as (regexp_replace(arxiv_id, 'v[0-9]+$', '')) stored;
+
+-- 2) 找出重复行：每个 base id 保留版本号最大（相同时 paper_id 最小）的一行
+create temp table _paper_dups on commit drop as
+select paper_id, keep_id
+from (
+  select
+    paper_id,
+    first_value(paper_id) over (
+      partition by arxiv_base_id
+      order by coalesce(substring(arxiv_id from 'v([0-9]+)$')::int, 0) desc, paper_id
+    ) as keep_id
+  from app.papers
+) ranked
+where paper_id <> keep_id;
+
+-- 3) 把分类关联、分析结果与机构信息迁移到保留行
+insert into app.paper_categories (paper_id, category_id)
+select d.keep_id, pc.category_id
+from app.paper_categories pc
+join _paper_dups d on d.paper_id = pc.paper_id
+on conflict do nothing;
+
+insert into app.analysis_results (paper_id, prompt_id, analysis_result, created_by, created_at)
+select d.keep_id, ar.prompt_id, ar.analysis_result, ar.created_by, ar.created_at
+from app.analysis_results ar
+join _paper_dups d on d.paper_id = ar.paper_id
+on conflict (paper_id, prompt_id) do nothing;
+
+update app.papers k
+set author_affiliation = dup.author_affiliation
+from _paper_dups d
+join app.papers dup on dup.paper_id = d.paper_id
+where k.paper_id = d.keep_id
+  and coalesce(k.author_affiliation, '') = ''
+  and coalesce(dup.author_affiliation, '') <> '';
+
+-- 4) 删除重复行（级联删除其关联）
+delete from app.papers p
+using _paper_dups d
+where p.paper_id = d.paper_id;
+
+-- 5) 唯一索引：按 base id 的 IN 查询与 upsert 冲突目标
+create unique index if not exists uq_papers_arxiv_base_id on app.papers(arxiv_base_id);
+
+commit;
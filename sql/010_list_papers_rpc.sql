@@ -0,0 +1,28 @@
+-- 某日期+分类的论文列表：一次索引查询返回按 arxiv_id 倒序的行
+-- 通过 PostgREST RPC 调用：app_schema().rpc('list_papers_by_date_category', {p_date, p_category})
+-- 依赖索引：idx_papers_update_date_paper(update_date, paper_id)、paper_categories 主键(paper_id, category_id)
+
+create or replace function app.list_papers_by_date_category(p_date date, p_category text)
+returns table (
+  paper_id bigint,
+  arxiv_id text,
+  title text,
+  authors text,
+  abstract text,
+  link text,
+  author_affiliation text
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  select p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  join app.categories c on c.category_id = pc.category_id
+  where p.update_date = p_date
+    and c.category_name = p_category
+  order by p.arxiv_id desc;
+$$;
+
+grant execute on function app.list_papers_by_date_category(date, text) to service_role;
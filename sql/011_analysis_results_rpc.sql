@@ -0,0 +1,45 @@
+-- 某日期+分类+prompt 的分析结果：按日期限定范围的一次查询，排序与截断在 SQL 中完成
+-- 通过 PostgREST RPC 调用：app_schema().rpc('list_analysis_results_by_date_category', {...})
+-- p_after_18: 只返回 update_time 在 18:00 之后的论文（对应 time_filter='after_18'）
+-- p_paper_ids: 只返回这些 paper_id（对应 batch_filter），null 表示不过滤
+-- p_limit: 最多返回条数，null 表示不限
+
+create or replace function app.list_analysis_results_by_date_category(
+  p_date date,
+  p_category text,
+  p_prompt_id uuid,
+  p_after_18 boolean default false,
+  p_paper_ids bigint[] default null,
+  p_limit integer default null
+)
+returns table (
+  paper_id bigint,
+  arxiv_id text,
+  title text,
+  authors text,
+  abstract text,
+  link text,
+  author_affiliation text,
+  update_time time,
+  analysis_result jsonb
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  select
+    p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation, p.update_time,
+    ar.analysis_result
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  join app.categories c on c.category_id = pc.category_id
+  join app.analysis_results ar on ar.paper_id = p.paper_id and ar.prompt_id = p_prompt_id
+  where p.update_date = p_date
+    and c.category_name = p_category
+    and (not p_after_18 or p.update_time between time '18:00:00' and time '23:59:59')
+    and (p_paper_ids is null or p.paper_id = any(p_paper_ids))
+  order by p.arxiv_id desc
+  limit p_limit;
+$$;
+
+grant execute on function app.list_analysis_results_by_date_category(date, text, uuid, boolean, bigint[], integer) to service_role;
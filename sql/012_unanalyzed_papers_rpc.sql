@@ -0,0 +1,40 @@
+-- 某日期+分类下尚未被指定 prompt 分析的论文：NOT EXISTS 反连接，排序与截断在 SQL 中完成
+-- 通过 PostgREST RPC 调用：app_schema().rpc('list_unanalyzed_papers', {p_date, p_category, p_prompt_id, p_limit})
+-- 依赖 analysis_results 的唯一约束 (paper_id, prompt_id) 做反连接探测
+
+create or replace function app.list_unanalyzed_papers(
+  p_date date,
+  p_category text,
+  p_prompt_id uuid,
+  p_limit integer default null
+)
+returns table (
+  paper_id bigint,
+  arxiv_id text,
+  title text,
+  authors text,
+  abstract text,
+  link text,
+  author_affiliation text
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  select p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  join app.categories c on c.category_id = pc.category_id
+  where p.update_date = p_date
+    and c.category_name = p_category
+    and not exists (
+      select 1
+      from app.analysis_results ar
+      where ar.paper_id = p.paper_id
+        and ar.prompt_id = p_prompt_id
+    )
+  order by p.arxiv_id
+  limit p_limit;
+$$;
+
+grant execute on function app.list_unanalyzed_papers(date, text, uuid, integer) to service_role;
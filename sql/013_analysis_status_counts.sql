@@ -0,0 +1,256 @@
+-- 分析进度计数表：由触发器维护，进度查询从"读出全部行再计数"变为主键查找
+--   category_day_counts:    (update_date, category_id)            -> paper_count（当天该分类论文数）
+--   analysis_status_counts: (update_date, category_id, prompt_id) -> completed（其中已被该 prompt 分析的篇数）
+-- total 与 prompt 无关，单独存一张表，避免每新增一篇论文就要更新所有 prompt 的行
+-- 触发器为语句级（transition table），批量写入时每条语句只按分组更新一次计数
+-- 计数出现偏差时可执行 select app.refresh_status_counts('2025-08-07') 按日期重算（不传日期则全量重算）
+
+begin;
+
+-- 1) 计数表
+create table if not exists app.category_day_counts (
+  update_date date not null,
+  category_id bigint not null references app.categories(category_id) on delete cascade,
+  paper_count integer not null default 0,
+  primary key (update_date, category_id)
+);
+
+create table if not exists app.analysis_status_counts (
+  update_date date not null,
+  category_id bigint not null references app.categories(category_id) on delete cascade,
+  prompt_id uuid not null references app.prompts(prompt_id) on delete cascade,
+  completed integer not null default 0,
+  primary key (update_date, category_id, prompt_id)
+);
+
+-- 2) paper_categories 新增/删除：调整当天分类总数，以及该论文已有分析结果的完成数
+create or replace function app.trg_paper_categories_counts()
+returns trigger
+language plpgsql
+set search_path = app, public
+as $$
+declare
+  v_sign integer := case when tg_op = 'INSERT' then 1 else -1 end;
+begin
+  insert into app.category_day_counts as t (update_date, category_id, paper_count)
+  select p.update_date, c.category_id, v_sign * count(*)
+  from changed_rows c
+  join app.papers p on p.paper_id = c.paper_id
+  where p.update_date is not null
+  group by p.update_date, c.category_id
+  on conflict (update_date, category_id)
+  do update set paper_count = t.paper_count + excluded.paper_count;
+
+  insert into app.analysis_status_counts as t (update_date, category_id, prompt_id, completed)
+  select p.update_date, c.category_id, ar.prompt_id, v_sign * count(*)
+  from changed_rows c
+  join app.papers p on p.paper_id = c.paper_id
+  join app.analysis_results ar on ar.paper_id = c.paper_id
+  where p.update_date is not null
+  group by p.update_date, c.category_id, ar.prompt_id
+  on conflict (update_date, category_id, prompt_id)
+  do update set completed = t.completed + excluded.completed;
+
+  return null;
+end;
+$$;
+
+drop trigger if exists paper_categories_counts_ins on app.paper_categories;
+create trigger paper_categories_counts_ins
+  after insert on app.paper_categories
+  referencing new table as changed_rows
+  for each statement execute function app.trg_paper_categories_counts();
+
+drop trigger if exists paper_categories_counts_del on app.paper_categories;
+create trigger paper_categories_counts_del
+  after delete on app.paper_categories
+  referencing old table as changed_rows
+  for each statement execute function app.trg_paper_categories_counts();
+
+-- 3) analysis_results 新增/删除：调整该论文所属各分类的完成数
+create or replace function app.trg_analysis_results_counts()
+returns trigger
+language plpgsql
+set search_path = app, public
+as $$
+declare
+  v_sign integer := case when tg_op = 'INSERT' then 1 else -1 end;
+begin
+  insert into app.analysis_status_counts as t (update_date, category_id, prompt_id, completed)
+  select p.update_date, pc.category_id, c.prompt_id, v_sign * count(*)
+  from changed_rows c
+  join app.papers p on p.paper_id = c.paper_id
+  join app.paper_categories pc on pc.paper_id = c.paper_id
+  where p.update_date is not null
+  group by p.update_date, pc.category_id, c.prompt_id
+  on conflict (update_date, category_id, prompt_id)
+  do update set completed = t.completed + excluded.completed;
+
+  return null;
+end;
+$$;
+
+drop trigger if exists analysis_results_counts_ins on app.analysis_results;
+create trigger analysis_results_counts_ins
+  after insert on app.analysis_results
+  referencing new table as changed_rows
+  for each statement execute function app.trg_analysis_results_counts();
+
+drop trigger if exists analysis_results_counts_del on app.analysis_results;
+create trigger analysis_results_counts_del
+  after delete on app.analysis_results
+  referencing old table as changed_rows
+  for each statement execute function app.trg_analysis_results_counts();
+
+-- 4) papers.update_date 变化（重新导入时会刷新）：计数从旧日期移到新日期
+create or replace function app.trg_papers_date_counts()
+returns trigger
+language plpgsql
+set search_path = app, public
+as $$
+begin
+  -- 大多数更新（如写入机构信息）不改日期，直接返回
+  if not exists (
+    select 1 from old_rows o join new_rows n on n.paper_id = o.paper_id
+    where o.update_date is distinct from n.update_date
+  ) then
+    return null;
+  end if;
+
+  with moved as (
+    select o.paper_id, o.update_date, -1 as delta
+    from old_rows o join new_rows n on n.paper_id = o.paper_id
+    where o.update_date is distinct from n.update_date and o.update_date is not null
+    union all
+    select n.paper_id, n.update_date, 1
+    from old_rows o join new_rows n on n.paper_id = o.paper_id
+    where o.update_date is distinct from n.update_date and n.update_date is not null
+  )
+  insert into app.category_day_counts as t (update_date, category_id, paper_count)
+  select m.update_date, pc.category_id, sum(m.delta)
+  from moved m
+  join app.paper_categories pc on pc.paper_id = m.paper_id
+  group by m.update_date, pc.category_id
+  on conflict (update_date, category_id)
+  do update set paper_count = t.paper_count + excluded.paper_count;
+
+  with moved as (
+    select o.paper_id, o.update_date, -1 as delta
+    from old_rows o join new_rows n on n.paper_id = o.paper_id
+    where o.update_date is distinct from n.update_date and o.update_date is not null
+    union all
+    select n.paper_id, n.update_date, 1
+    from old_rows o join new_rows n on n.paper_id = o.paper_id
+    where o.update_date is distinct from n.update_date and n.update_date is not null
+  )
+  insert into app.analysis_status_counts as t (update_date, category_id, prompt_id, completed)
+  select m.update_date, pc.category_id, ar.prompt_id, sum(m.delta)
+  from moved m
+  join app.paper_categories pc on pc.paper_id = m.paper_id
+  join app.analysis_results ar on ar.paper_id = m.paper_id
+  group by m.update_date, pc.category_id, ar.prompt_id
+  on conflict (update_date, category_id, prompt_id)
+  do update set completed = t.completed + excluded.completed;
+
+  return null;
+end;
+$$;
+
+drop trigger if exists papers_date_counts on app.papers;
+create trigger papers_date_counts
+  after update on app.papers
+  referencing old table as old_rows new table as new_rows
+  for each statement execute function app.trg_papers_date_counts();
+
+-- 5) 删除论文：级联删除子行时论文行已不存在，子表触发器无法取得日期，在删除前扣减
+create or replace function app.trg_papers_delete_counts()
+returns trigger
+language plpgsql
+set search_path = app, public
+as $$
+begin
+  if old.update_date is not null then
+    update app.category_day_counts t
+    set paper_count = t.paper_count - 1
+    from app.paper_categories pc
+    where pc.paper_id = old.paper_id
+      and t.update_date = old.update_date
+      and t.category_id = pc.category_id;
+
+    update app.analysis_status_counts t
+    set completed = t.completed - 1
+    from app.paper_categories pc
+    join app.analysis_results ar on ar.paper_id = pc.paper_id
+    where pc.paper_id = old.paper_id
+      and t.update_date = old.update_date
+      and t.category_id = pc.category_id
+      and t.prompt_id = ar.prompt_id;
+  end if;
+  return old;
+end;
+$$;
+
+drop trigger if exists papers_delete_counts on app.papers;
+create trigger papers_delete_counts
+  before delete on app.papers
+  for each row execute function app.trg_papers_delete_counts();
+
+-- 6) 重算（回填 / 修复）：p_date 为空时重算全部日期
+create or replace function app.refresh_status_counts(p_date date default null)
+returns void
+language plpgsql
+set search_path = app, public
+as $$
+begin
+  delete from app.category_day_counts where p_date is null or update_date = p_date;
+  delete from app.analysis_status_counts where p_date is null or update_date = p_date;
+
+  insert into app.category_day_counts (update_date, category_id, paper_count)
+  select p.update_date, pc.category_id, count(*)
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  where p.update_date is not null and (p_date is null or p.update_date = p_date)
+  group by p.update_date, pc.category_id;
+
+  insert into app.analysis_status_counts (update_date, category_id, prompt_id, completed)
+  select p.update_date, pc.category_id, ar.prompt_id, count(*)
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  join app.analysis_results ar on ar.paper_id = p.paper_id
+  where p.update_date is not null and (p_date is null or p.update_date = p_date)
+  group by p.update_date, pc.category_id, ar.prompt_id;
+end;
+$$;
+
+-- 7) 进度查询：两次主键查找，一次 RPC 返回
+-- 通过 PostgREST RPC 调用：app_schema().rpc('get_analysis_status_counts', {p_date, p_category, p_prompt_id})
+create or replace function app.get_analysis_status_counts(
+  p_date date,
+  p_category text,
+  p_prompt_id uuid
+)
+returns table (total integer, completed integer, pending integer)
+language sql
+stable
+set search_path = app, public
+as $$
+  select
+    coalesce(d.paper_count, 0) as total,
+    coalesce(s.completed, 0) as completed,
+    greatest(coalesce(d.paper_count, 0) - coalesce(s.completed, 0), 0) as pending
+  from app.categories c
+  left join app.category_day_counts d
+    on d.update_date = p_date and d.category_id = c.category_id
+  left join app.analysis_status_counts s
+    on s.update_date = p_date and s.category_id = c.category_id and s.prompt_id = p_prompt_id
+  where c.category_name = p_category;
+$$;
+
+grant execute on function app.refresh_status_counts(date) to service_role;
+grant execute on function app.get_analysis_status_counts(date, text, uuid) to service_role;
+
+-- 8) 回填：阻止回填期间的并发写入，保证触发器接管前后计数一致
+lock table app.papers, app.paper_categories, app.analysis_results in share row exclusive mode;
+select app.refresh_status_counts();
+
+commit;
@@ -0,0 +1,22 @@
+-- 可用日期列表：从 category_day_counts（sql/013 触发器维护）按日期汇总，不再扫描 papers 全表
+-- 通过 PostgREST RPC 调用：app_schema().rpc('list_available_dates', {})
+-- 每个日期返回一行：category_counts 为 {分类名: 论文数}，只包含论文数大于 0 的分类
+
+create or replace function app.list_available_dates()
+returns table (
+  update_date date,
+  category_counts jsonb
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  select d.update_date, jsonb_object_agg(c.category_name, d.paper_count order by c.category_name)
+  from app.category_day_counts d
+  join app.categories c on c.category_id = d.category_id
+  where d.paper_count > 0
+  group by d.update_date
+  order by d.update_date desc;
+$$;
+
+grant execute on function app.list_available_dates() to service_role;
@@ -0,0 +1,37 @@
+-- 导入批次分组：按 ingest_at 所在小时（UTC）在 SQL 中分组，每个批次一行
+-- 通过 PostgREST RPC 调用：app_schema().rpc('list_ingest_batches', {p_date, p_category})
+-- 返回行数只与当天的批次数有关（通常个位数），paper_ids 按 ingest_at 排序
+
+-- 按日期取论文时直接按 ingest_at 有序读取（CONCURRENTLY 不能放在事务中执行）
+create index concurrently if not exists idx_papers_update_date_ingest
+on app.papers(update_date, ingest_at);
+
+create or replace function app.list_ingest_batches(
+  p_date date,
+  p_category text
+)
+returns table (
+  batch_hour timestamp,
+  start_time timestamp,
+  paper_count integer,
+  paper_ids bigint[]
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  select
+    date_trunc('hour', p.ingest_at at time zone 'UTC') as batch_hour,
+    min(p.ingest_at at time zone 'UTC') as start_time,
+    count(*)::integer as paper_count,
+    array_agg(p.paper_id order by p.ingest_at, p.paper_id) as paper_ids
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  join app.categories c on c.category_id = pc.category_id
+  where p.update_date = p_date
+    and c.category_name = p_category
+  group by 1
+  order by 1;
+$$;
+
+grant execute on function app.list_ingest_batches(date, text) to service_role;
@@ -0,0 +1,77 @@
+-- 游标分页（keyset）：按 arxiv_id 倒序，每次从上一页最后一个 arxiv_id 之后继续取 p_limit 行
+-- 与 sql/010、sql/011 返回相同的列与顺序，只是多了 p_after_arxiv_id / p_limit 两个参数
+-- 通过 PostgREST RPC 调用：app_schema().rpc('list_papers_page', {...}) / rpc('list_analysis_results_page', {...})
+-- 依赖索引：idx_papers_date_arxiv(update_date desc, arxiv_id desc)（sql/006）
+
+create or replace function app.list_papers_page(
+  p_date date,
+  p_category text,
+  p_after_arxiv_id text default null,
+  p_limit integer default 100
+)
+returns table (
+  paper_id bigint,
+  arxiv_id text,
+  title text,
+  authors text,
+  abstract text,
+  link text,
+  author_affiliation text
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  select p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  join app.categories c on c.category_id = pc.category_id
+  where p.update_date = p_date
+    and c.category_name = p_category
+    and (p_after_arxiv_id is null or p.arxiv_id < p_after_arxiv_id)
+  order by p.arxiv_id desc
+  limit p_limit;
+$$;
+
+create or replace function app.list_analysis_results_page(
+  p_date date,
+  p_category text,
+  p_prompt_id uuid,
+  p_after_18 boolean default false,
+  p_paper_ids bigint[] default null,
+  p_after_arxiv_id text default null,
+  p_limit integer default 100
+)
+returns table (
+  paper_id bigint,
+  arxiv_id text,
+  title text,
+  authors text,
+  abstract text,
+  link text,
+  author_affiliation text,
+  update_time time,
+  analysis_result jsonb
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  select
+    p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation, p.update_time,
+    ar.analysis_result
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  join app.categories c on c.category_id = pc.category_id
+  join app.analysis_results ar on ar.paper_id = p.paper_id and ar.prompt_id = p_prompt_id
+  where p.update_date = p_date
+    and c.category_name = p_category
+    and (not p_after_18 or p.update_time between time '18:00:00' and time '23:59:59')
+    and (p_paper_ids is null or p.paper_id = any(p_paper_ids))
+    and (p_after_arxiv_id is null or p.arxiv_id < p_after_arxiv_id)
+  order by p.arxiv_id desc
+  limit p_limit;
+$$;
+
+grant execute on function app.list_papers_page(date, text, text, integer) to service_role;
+grant execute on function app.list_analysis_results_page(date, text, uuid, boolean, bigint[], text, integer) to service_role;
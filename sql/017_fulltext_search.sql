@@ -0,0 +1,72 @@
+-- 标题/摘要全文检索：papers.search_vector 生成列 + GIN 索引 + 排序分页 RPC
+-- 标题权重 A、摘要权重 B，ts_rank 下标题命中排在只有摘要命中的论文之前
+-- 通过 PostgREST RPC 调用：app_schema().rpc('fulltext_search_papers', {p_query, ...})
+-- 查询串按 websearch_to_tsquery 解析：支持 "短语"、or、-排除词，不会因语法报错
+
+-- 1) 生成列（新增 stored 生成列会重写 papers 表并持有排他锁，请在导入空闲时执行）
+alter table app.papers
+  add column if not exists search_vector tsvector
+  generated always as (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(abstract, '')), 'B')
+  ) stored;
+
+-- 2) GIN 索引（CONCURRENTLY 不能放在事务中执行）
+create index concurrently if not exists idx_papers_search_vector
+on app.papers using gin (search_vector);
+
+-- 3) 检索函数：先由 GIN 索引取出匹配行，再按日期/分类/pass_filter 过滤并按相关度排序
+--    p_date_from / p_date_to / p_category / p_pass_filter 为空表示不限制
+--    p_pass_filter 取 p_prompt_id 对应的分析结果，未分析的论文在指定 p_pass_filter 时不返回
+--    同分按 paper_id 倒序（较新的论文在前），保证 offset 分页稳定
+create or replace function app.fulltext_search_papers(
+  p_query text,
+  p_date_from date default null,
+  p_date_to date default null,
+  p_category text default null,
+  p_prompt_id uuid default null,
+  p_pass_filter boolean default null,
+  p_offset integer default 0,
+  p_limit integer default 20
+)
+returns table (
+  paper_id bigint,
+  arxiv_id text,
+  title text,
+  authors text,
+  abstract text,
+  link text,
+  author_affiliation text,
+  update_date date,
+  rank real,
+  pass_filter boolean
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  with q as (
+    select websearch_to_tsquery('english', p_query) as query
+  )
+  select
+    p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation, p.update_date,
+    ts_rank(p.search_vector, q.query) as rank,
+    ar.pass_filter
+  from q
+  join app.papers p on p.search_vector @@ q.query
+  left join app.analysis_results ar on ar.paper_id = p.paper_id and ar.prompt_id = p_prompt_id
+  where (p_date_from is null or p.update_date >= p_date_from)
+    and (p_date_to is null or p.update_date <= p_date_to)
+    and (p_category is null or exists (
+      select 1
+      from app.paper_categories pc
+      join app.categories c on c.category_id = pc.category_id
+      where pc.paper_id = p.paper_id and c.category_name = p_category
+    ))
+    and (p_pass_filter is null or ar.pass_filter = p_pass_filter)
+  order by rank desc, p.paper_id desc
+  offset p_offset
+  limit p_limit;
+$$;
+
+grant execute on function app.fulltext_search_papers(text, date, date, text, uuid, boolean, integer, integer) to service_role;
@@ -0,0 +1,620 @@
+-- papers / analysis_results 改为按 update_date 的月度范围分区
+-- 所有热点查询都按日期过滤，分区后只访问对应月份的分区：按天读取的成本不随历史增长，
+-- vacuum / 建索引也只作用于单个月份分区，旧月份不再被反复扫描
+--
+-- 分区表的主键 / 唯一约束必须包含分区键，因此：
+--   * papers 主键改为 (paper_id, update_date)，导入冲突目标改为 (arxiv_base_id, update_date)
+--   * 新增未分区的 app.paper_keys(paper_id, arxiv_base_id, update_date)：
+--     保证 paper_id / arxiv_base_id 全局唯一，并作为 paper_categories、analysis_results 的外键目标
+--     （papers 的 BEFORE INSERT 触发器维护；同一论文已存在于其它日期时跳过插入，等价于 on conflict do nothing）
+--   * analysis_results 新增冗余列 update_date（= 所属论文的日期，写入方负责带上），唯一约束为 (paper_id, prompt_id, update_date)
+--   * papers.update_date 变化时（跨分区移动）由语句级触发器同步 paper_keys 与 analysis_results 的日期
+--
+-- 分区：每月一个分区 <表名>_yYYYYmMM，另有默认分区 <表名>_default 接收尚未建分区的月份（如智能搜索导入的旧论文）
+-- 新分区由 app.ensure_monthly_partitions() 创建（预导入每次运行前调用；装有 pg_cron 时每天自动执行），
+-- 默认分区中已有该月数据时会搬入新建的月分区
+-- 回填历史月份：select app.ensure_monthly_partitions('2024-01-01');
+--
+-- ⚠️ 迁移会复制两张表的全部数据并持有排他锁，请在导入/分析空闲时执行；删除论文请删除 app.papers 中的行
+
+begin;
+
+lock table app.papers, app.paper_categories, app.analysis_results in access exclusive mode;
+
+-- 1) 分区键不能为空：缺失日期的旧行按入库日期补齐
+update app.papers set update_date = (ingest_at at time zone 'UTC')::date where update_date is null;
+
+-- 2) 旧表改名，序列改为独立对象（删除旧表时保留，新表继续使用）
+alter table app.papers rename to papers_unpartitioned;
+alter table app.analysis_results rename to analysis_results_unpartitioned;
+alter sequence app.papers_paper_id_seq owned by none;
+alter sequence app.analysis_results_analysis_id_seq owned by none;
+alter table app.paper_categories drop constraint if exists paper_categories_paper_id_fkey;
+
+-- 3) 全局键表
+create table if not exists app.paper_keys (
+  paper_id bigint primary key,
+  arxiv_base_id text not null unique,
+  update_date date not null
+);
+
+-- 4) 分区父表（列顺序与旧表一致；索引与约束在删除旧表后创建，避免索引重名）
+create table app.papers (
+  paper_id bigint not null default nextval('app.papers_paper_id_seq'),
+  arxiv_id text not null,
+  title text not null,
+  authors text,
+  author_affiliation text,
+  abstract text,
+  link text,
+  update_date date not null,
+  update_time time,
+  primary_category text,
+  ingest_at timestamptz not null default now(),
+  arxiv_base_id text generated always as (regexp_replace(arxiv_id, 'v[0-9]+$', '')) stored,
+  search_vector tsvector generated always as (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(abstract, '')), 'B')
+  ) stored
+) partition by range (update_date);
+
+create table app.analysis_results (
+  analysis_id bigint not null default nextval('app.analysis_results_analysis_id_seq'),
+  paper_id bigint not null references app.paper_keys(paper_id) on delete cascade,
+  prompt_id uuid not null references app.prompts(prompt_id) on delete cascade,
+  analysis_result jsonb not null,
+  pass_filter boolean generated always as ((analysis_result->>'pass_filter')::boolean) stored,
+  raw_score numeric generated always as ((analysis_result->>'raw_score')::numeric) stored,
+  norm_score numeric generated always as ((analysis_result->>'norm_score')::numeric) stored,
+  created_by uuid null references auth.users(id),
+  created_at timestamptz not null default now(),
+  update_date date not null
+) partition by range (update_date);
+
+create table app.papers_default partition of app.papers default;
+create table app.analysis_results_default partition of app.analysis_results default;
+
+-- 5) 分区维护
+create or replace function app._create_month_partition(p_table text, p_month date)
+returns void
+language plpgsql
+set search_path = app, public
+as $$
+declare
+  v_name text := format('%s_y%sm%s', p_table, to_char(p_month, 'YYYY'), to_char(p_month, 'MM'));
+  v_default text := p_table || '_default';
+  v_next date := (p_month + interval '1 month')::date;
+  v_cols text;
+  v_has_rows boolean;
+begin
+  execute format(
+    'select exists (select 1 from app.%I where update_date >= %L and update_date < %L)',
+    v_default, p_month, v_next
+  ) into v_has_rows;
+
+  if not v_has_rows then
+    execute format('create table app.%I partition of app.%I for values from (%L) to (%L)', v_name, p_table, p_month, v_next);
+    return;
+  end if;
+
+  -- 默认分区已有该月数据：摘下默认分区 → 建月分区 → 搬数据 → 挂回默认分区
+  -- 直接写入分区表不会触发父表的语句级计数触发器，计数保持不变
+  select string_agg(quote_ident(attname), ', ' order by attnum) into v_cols
+  from pg_attribute
+  where attrelid = format('app.%I', p_table)::regclass
+    and attnum > 0 and not attisdropped and attgenerated = '';
+
+  execute format('alter table app.%I detach partition app.%I', p_table, v_default);
+  execute format('create table app.%I partition of app.%I for values from (%L) to (%L)', v_name, p_table, p_month, v_next);
+  execute format(
+    'insert into app.%I (%s) select %s from app.%I where update_date >= %L and update_date < %L',
+    v_name, v_cols, v_cols, v_default, p_month, v_next
+  );
+  execute format('delete from app.%I where update_date >= %L and update_date < %L', v_default, p_month, v_next);
+  execute format('alter table app.%I attach partition app.%I default', p_table, v_default);
+end;
+$$;
+
+-- 确保从 p_from（默认当前月）到当前月之后 p_months_ahead 个月都有分区，返回新建的分区数
+-- security definer：建分区需要表的属主权限，service_role 通过 RPC 调用
+create or replace function app.ensure_monthly_partitions(
+  p_from date default null,
+  p_months_ahead integer default 3
+)
+returns integer
+language plpgsql
+security definer
+set search_path = app, public
+as $$
+declare
+  v_month date := date_trunc('month', coalesce(p_from, current_date))::date;
+  v_last date := (date_trunc('month', current_date) + make_interval(months => greatest(p_months_ahead, 0)))::date;
+  v_table text;
+  v_created integer := 0;
+begin
+  -- 串行化并发调用（预导入与 pg_cron 同时执行时）
+  perform pg_advisory_xact_lock(hashtext('app.ensure_monthly_partitions'));
+  v_last := greatest(v_last, v_month);
+  while v_month <= v_last loop
+    foreach v_table in array array['papers', 'analysis_results'] loop
+      if to_regclass(format('app.%I', format('%s_y%sm%s', v_table, to_char(v_month, 'YYYY'), to_char(v_month, 'MM')))) is null then
+        perform app._create_month_partition(v_table, v_month);
+        v_created := v_created + 1;
+      end if;
+    end loop;
+    v_month := (v_month + interval '1 month')::date;
+  end loop;
+  return v_created;
+end;
+$$;
+
+revoke execute on function app._create_month_partition(text, date) from public;
+revoke execute on function app.ensure_monthly_partitions(date, integer) from public;
+grant execute on function app.ensure_monthly_partitions(date, integer) to service_role;
+
+select app.ensure_monthly_partitions((select min(update_date) from app.papers_unpartitioned));
+
+-- 6) 键表维护：插入 papers 时登记全局键
+create or replace function app.trg_papers_keys()
+returns trigger
+language plpgsql
+set search_path = app, public
+as $$
+declare
+  -- 生成列在 BEFORE 触发器之后才计算，这里按相同规则取 base id
+  v_base text := regexp_replace(new.arxiv_id, 'v[0-9]+$', '');
+begin
+  insert into app.paper_keys (paper_id, arxiv_base_id, update_date)
+  values (new.paper_id, v_base, new.update_date)
+  on conflict do nothing;
+  if found then
+    return new;
+  end if;
+  -- update_date 变化导致的跨分区移动会以插入新分区的形式触发：同一篇论文放行
+  if exists (select 1 from app.paper_keys where paper_id = new.paper_id and arxiv_base_id = v_base) then
+    return new;
+  end if;
+  -- 该论文已以其它日期存在：跳过
+  return null;
+end;
+$$;
+
+create trigger papers_keys
+  before insert on app.papers
+  for each row execute function app.trg_papers_keys();
+
+-- 7) 复制数据（papers 经触发器生成 paper_keys）
+insert into app.papers (paper_id, arxiv_id, title, authors, author_affiliation, abstract, link, update_date, update_time, primary_category, ingest_at)
+select paper_id, arxiv_id, title, authors, author_affiliation, abstract, link, update_date, update_time, primary_category, ingest_at
+from app.papers_unpartitioned;
+
+insert into app.analysis_results (analysis_id, paper_id, prompt_id, analysis_result, created_by, created_at, update_date)
+select ar.analysis_id, ar.paper_id, ar.prompt_id, ar.analysis_result, ar.created_by, ar.created_at, k.update_date
+from app.analysis_results_unpartitioned ar
+join app.paper_keys k on k.paper_id = ar.paper_id;
+
+alter table app.paper_categories
+  add constraint paper_categories_paper_id_fkey
+  foreign key (paper_id) references app.paper_keys(paper_id) on delete cascade;
+
+drop table app.analysis_results_unpartitioned;
+drop table app.papers_unpartitioned;
+drop function if exists app.trg_papers_delete_counts();
+
+alter sequence app.papers_paper_id_seq owned by app.papers.paper_id;
+alter sequence app.analysis_results_analysis_id_seq owned by app.analysis_results.analysis_id;
+
+-- 8) 约束与索引（在父表上创建，自动作用于现有与以后的分区）
+alter table app.papers add constraint papers_pkey primary key (paper_id, update_date);
+alter table app.papers add constraint uq_papers_arxiv_base_id_date unique (arxiv_base_id, update_date);
+create index idx_papers_update_date_paper on app.papers(update_date, paper_id);
+create index idx_papers_date_arxiv on app.papers(update_date desc, arxiv_id desc);
+create index idx_papers_update_date_ingest on app.papers(update_date, ingest_at);
+create index idx_papers_search_vector on app.papers using gin (search_vector);
+
+alter table app.analysis_results add constraint analysis_results_pkey primary key (analysis_id, update_date);
+alter table app.analysis_results add constraint uq_analysis_results_paper_prompt_date unique (paper_id, prompt_id, update_date);
+-- 按天读取分析结果：月分区内按日期 + prompt 定位
+create index idx_analysis_results_date_prompt on app.analysis_results(update_date, prompt_id, paper_id);
+create index idx_analysis_results_created_at on app.analysis_results(created_at);
+create index idx_analysis_results_pass_filter on app.analysis_results(pass_filter);
+create index idx_analysis_results_raw_score on app.analysis_results(raw_score desc);
+create index idx_analysis_results_norm_score on app.analysis_results(norm_score desc);
+create index idx_analysis_results_jsonb on app.analysis_results using gin (analysis_result);
+
+-- 9) 计数触发器（sql/013）：日期改从 paper_keys 取，分析结果按日期连接以便裁剪分区
+create or replace function app.trg_paper_categories_counts()
+returns trigger
+language plpgsql
+set search_path = app, public
+as $$
+declare
+  v_sign integer := case when tg_op = 'INSERT' then 1 else -1 end;
+begin
+  insert into app.category_day_counts as t (update_date, category_id, paper_count)
+  select k.update_date, c.category_id, v_sign * count(*)
+  from changed_rows c
+  join app.paper_keys k on k.paper_id = c.paper_id
+  group by k.update_date, c.category_id
+  on conflict (update_date, category_id)
+  do update set paper_count = t.paper_count + excluded.paper_count;
+
+  insert into app.analysis_status_counts as t (update_date, category_id, prompt_id, completed)
+  select k.update_date, c.category_id, ar.prompt_id, v_sign * count(*)
+  from changed_rows c
+  join app.paper_keys k on k.paper_id = c.paper_id
+  join app.analysis_results ar on ar.paper_id = c.paper_id and ar.update_date = k.update_date
+  group by k.update_date, c.category_id, ar.prompt_id
+  on conflict (update_date, category_id, prompt_id)
+  do update set completed = t.completed + excluded.completed;
+
+  return null;
+end;
+$$;
+
+-- 论文被删除时键表行已不存在，级联删除的分析结果不再重复扣减
+create or replace function app.trg_analysis_results_counts()
+returns trigger
+language plpgsql
+set search_path = app, public
+as $$
+declare
+  v_sign integer := case when tg_op = 'INSERT' then 1 else -1 end;
+begin
+  insert into app.analysis_status_counts as t (update_date, category_id, prompt_id, completed)
+  select k.update_date, pc.category_id, c.prompt_id, v_sign * count(*)
+  from changed_rows c
+  join app.paper_keys k on k.paper_id = c.paper_id
+  join app.paper_categories pc on pc.paper_id = c.paper_id
+  group by k.update_date, pc.category_id, c.prompt_id
+  on conflict (update_date, category_id, prompt_id)
+  do update set completed = t.completed + excluded.completed;
+
+  return null;
+end;
+$$;
+
+create trigger analysis_results_counts_ins
+  after insert on app.analysis_results
+  referencing new table as changed_rows
+  for each statement execute function app.trg_analysis_results_counts();
+
+create trigger analysis_results_counts_del
+  after delete on app.analysis_results
+  referencing old table as changed_rows
+  for each statement execute function app.trg_analysis_results_counts();
+
+-- papers.update_date 变化：移动计数，并同步键表与分析结果的日期（分析结果随之移到新分区）
+create or replace function app.trg_papers_date_counts()
+returns trigger
+language plpgsql
+set search_path = app, public
+as $$
+begin
+  if not exists (
+    select 1 from old_rows o join new_rows n on n.paper_id = o.paper_id
+    where o.update_date <> n.update_date
+  ) then
+    return null;
+  end if;
+
+  with moved as (
+    select o.paper_id, o.update_date, -1 as delta
+    from old_rows o join new_rows n on n.paper_id = o.paper_id
+    where o.update_date <> n.update_date
+    union all
+    select n.paper_id, n.update_date, 1
+    from old_rows o join new_rows n on n.paper_id = o.paper_id
+    where o.update_date <> n.update_date
+  )
+  insert into app.category_day_counts as t (update_date, category_id, paper_count)
+  select m.update_date, pc.category_id, sum(m.delta)
+  from moved m
+  join app.paper_categories pc on pc.paper_id = m.paper_id
+  group by m.update_date, pc.category_id
+  on conflict (update_date, category_id)
+  do update set paper_count = t.paper_count + excluded.paper_count;
+
+  with moved as (
+    select o.paper_id, o.update_date, -1 as delta
+    from old_rows o join new_rows n on n.paper_id = o.paper_id
+    where o.update_date <> n.update_date
+    union all
+    select n.paper_id, n.update_date, 1
+    from old_rows o join new_rows n on n.paper_id = o.paper_id
+    where o.update_date <> n.update_date
+  )
+  insert into app.analysis_status_counts as t (update_date, category_id, prompt_id, completed)
+  select m.update_date, pc.category_id, ar.prompt_id, sum(m.delta)
+  from moved m
+  join app.paper_categories pc on pc.paper_id = m.paper_id
+  join app.analysis_results ar on ar.paper_id = m.paper_id
+  group by m.update_date, pc.category_id, ar.prompt_id
+  on conflict (update_date, category_id, prompt_id)
+  do update set completed = t.completed + excluded.completed;
+
+  update app.paper_keys k
+  set update_date = n.update_date
+  from new_rows n
+  where k.paper_id = n.paper_id and k.update_date <> n.update_date;
+
+  update app.analysis_results ar
+  set update_date = n.update_date
+  from old_rows o
+  join new_rows n on n.paper_id = o.paper_id
+  where o.update_date <> n.update_date
+    and ar.paper_id = o.paper_id
+    and ar.update_date = o.update_date;
+
+  return null;
+end;
+$$;
+
+create trigger papers_date_counts
+  after update on app.papers
+  referencing old table as old_rows new table as new_rows
+  for each statement execute function app.trg_papers_date_counts();
+
+-- 删除论文：先扣减计数（分类关联与分析结果仍在），再删除键表行级联删除子行
+-- 语句级触发器不会被跨分区移动（内部的 DELETE + INSERT）触发
+create or replace function app.trg_papers_delete_keys()
+returns trigger
+language plpgsql
+set search_path = app, public
+as $$
+begin
+  insert into app.category_day_counts as t (update_date, category_id, paper_count)
+  select o.update_date, pc.category_id, -count(*)
+  from old_rows o
+  join app.paper_categories pc on pc.paper_id = o.paper_id
+  group by o.update_date, pc.category_id
+  on conflict (update_date, category_id)
+  do update set paper_count = t.paper_count + excluded.paper_count;
+
+  insert into app.analysis_status_counts as t (update_date, category_id, prompt_id, completed)
+  select o.update_date, pc.category_id, ar.prompt_id, -count(*)
+  from old_rows o
+  join app.paper_categories pc on pc.paper_id = o.paper_id
+  join app.analysis_results ar on ar.paper_id = o.paper_id and ar.update_date = o.update_date
+  group by o.update_date, pc.category_id, ar.prompt_id
+  on conflict (update_date, category_id, prompt_id)
+  do update set completed = t.completed + excluded.completed;
+
+  delete from app.paper_keys k using old_rows o where k.paper_id = o.paper_id;
+  return null;
+end;
+$$;
+
+create trigger papers_delete_keys
+  after delete on app.papers
+  referencing old table as old_rows
+  for each statement execute function app.trg_papers_delete_keys();
+
+create or replace function app.refresh_status_counts(p_date date default null)
+returns void
+language plpgsql
+set search_path = app, public
+as $$
+begin
+  delete from app.category_day_counts where p_date is null or update_date = p_date;
+  delete from app.analysis_status_counts where p_date is null or update_date = p_date;
+
+  insert into app.category_day_counts (update_date, category_id, paper_count)
+  select p.update_date, pc.category_id, count(*)
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  where p_date is null or p.update_date = p_date
+  group by p.update_date, pc.category_id;
+
+  insert into app.analysis_status_counts (update_date, category_id, prompt_id, completed)
+  select p.update_date, pc.category_id, ar.prompt_id, count(*)
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  join app.analysis_results ar on ar.paper_id = p.paper_id and ar.update_date = p.update_date
+  where p_date is null or p.update_date = p_date
+  group by p.update_date, pc.category_id, ar.prompt_id;
+end;
+$$;
+
+-- 10) 按日期读取分析结果的 RPC（sql/011、012、016、017）：连接条件带上 ar.update_date，
+--     执行器初始化时即可只保留当天所在月份的分区
+create or replace function app.list_analysis_results_by_date_category(
+  p_date date,
+  p_category text,
+  p_prompt_id uuid,
+  p_after_18 boolean default false,
+  p_paper_ids bigint[] default null,
+  p_limit integer default null
+)
+returns table (
+  paper_id bigint,
+  arxiv_id text,
+  title text,
+  authors text,
+  abstract text,
+  link text,
+  author_affiliation text,
+  update_time time,
+  analysis_result jsonb
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  select
+    p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation, p.update_time,
+    ar.analysis_result
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  join app.categories c on c.category_id = pc.category_id
+  join app.analysis_results ar
+    on ar.paper_id = p.paper_id and ar.prompt_id = p_prompt_id and ar.update_date = p_date
+  where p.update_date = p_date
+    and c.category_name = p_category
+    and (not p_after_18 or p.update_time between time '18:00:00' and time '23:59:59')
+    and (p_paper_ids is null or p.paper_id = any(p_paper_ids))
+  order by p.arxiv_id desc
+  limit p_limit;
+$$;
+
+create or replace function app.list_unanalyzed_papers(
+  p_date date,
+  p_category text,
+  p_prompt_id uuid,
+  p_limit integer default null
+)
+returns table (
+  paper_id bigint,
+  arxiv_id text,
+  title text,
+  authors text,
+  abstract text,
+  link text,
+  author_affiliation text
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  select p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  join app.categories c on c.category_id = pc.category_id
+  where p.update_date = p_date
+    and c.category_name = p_category
+    and not exists (
+      select 1
+      from app.analysis_results ar
+      where ar.paper_id = p.paper_id
+        and ar.prompt_id = p_prompt_id
+        and ar.update_date = p_date
+    )
+  order by p.arxiv_id
+  limit p_limit;
+$$;
+
+create or replace function app.list_analysis_results_page(
+  p_date date,
+  p_category text,
+  p_prompt_id uuid,
+  p_after_18 boolean default false,
+  p_paper_ids bigint[] default null,
+  p_after_arxiv_id text default null,
+  p_limit integer default 100
+)
+returns table (
+  paper_id bigint,
+  arxiv_id text,
+  title text,
+  authors text,
+  abstract text,
+  link text,
+  author_affiliation text,
+  update_time time,
+  analysis_result jsonb
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  select
+    p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation, p.update_time,
+    ar.analysis_result
+  from app.papers p
+  join app.paper_categories pc on pc.paper_id = p.paper_id
+  join app.categories c on c.category_id = pc.category_id
+  join app.analysis_results ar
+    on ar.paper_id = p.paper_id and ar.prompt_id = p_prompt_id and ar.update_date = p_date
+  where p.update_date = p_date
+    and c.category_name = p_category
+    and (not p_after_18 or p.update_time between time '18:00:00' and time '23:59:59')
+    and (p_paper_ids is null or p.paper_id = any(p_paper_ids))
+    and (p_after_arxiv_id is null or p.arxiv_id < p_after_arxiv_id)
+  order by p.arxiv_id desc
+  limit p_limit;
+$$;
+
+-- 日期范围写成 coalesce 区间（而不是 "is null or"），未指定时为全部分区，指定时可裁剪
+create or replace function app.fulltext_search_papers(
+  p_query text,
+  p_date_from date default null,
+  p_date_to date default null,
+  p_category text default null,
+  p_prompt_id uuid default null,
+  p_pass_filter boolean default null,
+  p_offset integer default 0,
+  p_limit integer default 20
+)
+returns table (
+  paper_id bigint,
+  arxiv_id text,
+  title text,
+  authors text,
+  abstract text,
+  link text,
+  author_affiliation text,
+  update_date date,
+  rank real,
+  pass_filter boolean
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  with q as (
+    select websearch_to_tsquery('english', p_query) as query
+  )
+  select
+    p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation, p.update_date,
+    ts_rank(p.search_vector, q.query) as rank,
+    ar.pass_filter
+  from q
+  join app.papers p on p.search_vector @@ q.query
+  left join app.analysis_results ar
+    on ar.paper_id = p.paper_id and ar.prompt_id = p_prompt_id and ar.update_date = p.update_date
+  where p.update_date between coalesce(p_date_from, '-infinity'::date) and coalesce(p_date_to, 'infinity'::date)
+    and (p_category is null or exists (
+      select 1
+      from app.paper_categories pc
+      join app.categories c on c.category_id = pc.category_id
+      where pc.paper_id = p.paper_id and c.category_name = p_category
+    ))
+    and (p_pass_filter is null or ar.pass_filter = p_pass_filter)
+  order by rank desc, p.paper_id desc
+  offset p_offset
+  limit p_limit;
+$$;
+
+-- 11) PostgREST 内联 JOIN（paper_categories → papers!inner(...)）原先依赖外键，
+--     外键改指 paper_keys 后用计算关系保持 repo 中回退查询可用
+create or replace function app.papers(app.paper_categories)
+returns setof app.papers
+rows 1
+language sql
+stable
+as $$
+  select * from app.papers p where p.paper_id = $1.paper_id;
+$$;
+
+-- 12) 权限：新表不一定由设置默认权限的角色创建，显式授权
+grant all privileges on app.papers, app.analysis_results, app.paper_keys to service_role;
+grant usage, select, update on sequence app.papers_paper_id_seq, app.analysis_results_analysis_id_seq to service_role;
+
+-- 13) 重算计数并收集统计信息
+select app.refresh_status_counts();
+analyze app.papers;
+analyze app.analysis_results;
+analyze app.paper_keys;
+
+-- 14) 装有 pg_cron 时每天检查一次分区（未安装时依赖预导入调用）
+do $$
+begin
+  if exists (select 1 from pg_extension where extname = 'pg_cron') then
+    perform cron.schedule('app_ensure_monthly_partitions', '30 0 * * *', 'select app.ensure_monthly_partitions()');
+  end if;
+end
+$$;
+
+notify pgrst, 'reload schema';
+
+commit;
@@ -0,0 +1,223 @@
+-- 作者机构规范化：app.affiliations（规范名）+ app.paper_affiliations（论文-机构关联）
+-- papers.author_affiliation 仍保留 JSON 数组文本供前端展示；按机构查论文改走关联表索引，
+-- 不再需要下载多天数据后在客户端逐条扫描
+--
+-- 规范化：name_key = 小写、标点与空白折叠为单个空格、去掉开头的 "the "，
+--   "Tsinghua University" / "tsinghua university." 归为同一机构；name 保留第一次出现的写法
+-- 写入：app.set_paper_affiliations(paper_id, names[]) 同时更新 author_affiliation 与关联表（机构获取流程调用）
+-- 回填：迁移末尾执行一次 app.backfill_paper_affiliations()，可重复执行（只处理尚无关联的论文）
+-- 查询：app.papers_by_affiliation(p_affiliation, p_date_from, p_date_to, ...)，
+--   按整词匹配规范名（'MIT' 命中 'MIT CSAIL'，不命中 'Smith College'），由 pg_trgm GIN 索引取候选机构
+
+create extension if not exists pg_trgm with schema public;
+
+-- 1) 规范化函数（immutable，用于唯一键与表达式索引）
+create or replace function app.affiliation_key(p_name text)
+returns text
+language sql
+immutable
+parallel safe
+as $$
+  select nullif(
+    regexp_replace(
+      btrim(regexp_replace(lower(coalesce(p_name, '')), '[[:punct:][:space:]]+', ' ', 'g')),
+      '^the ', ''
+    ),
+    ''
+  );
+$$;
+
+-- 2) 表
+create table if not exists app.affiliations (
+  affiliation_id bigserial primary key,
+  name text not null,
+  name_key text not null unique,
+  created_at timestamptz not null default now()
+);
+
+-- 整词匹配：两端补空格后做 like '% key %'，trigram 索引建在同一表达式上
+create index if not exists idx_affiliations_name_key_trgm
+on app.affiliations using gin ((' ' || name_key || ' ') gin_trgm_ops);
+
+-- paper_id 指向 paper_keys（papers 已按月分区，见 sql/018）；删除论文时随 paper_keys 级联删除
+create table if not exists app.paper_affiliations (
+  paper_id bigint not null references app.paper_keys(paper_id) on delete cascade,
+  affiliation_id bigint not null references app.affiliations(affiliation_id) on delete cascade,
+  position smallint not null,
+  primary key (paper_id, affiliation_id)
+);
+
+create index if not exists idx_paper_affiliations_affiliation
+on app.paper_affiliations (affiliation_id, paper_id);
+
+-- 3) 解析旧的 author_affiliation 文本：JSON 数组，否则按行拆分（与前端 renderAffiliationsCell 一致）
+create or replace function app.parse_affiliation_text(p_text text)
+returns text[]
+language plpgsql
+immutable
+as $$
+begin
+  if p_text is null or btrim(p_text) = '' then
+    return '{}';
+  end if;
+  if left(btrim(p_text), 1) = '[' then
+    begin
+      return array(
+        select btrim(x) from jsonb_array_elements_text(p_text::jsonb) as x where btrim(x) <> ''
+      );
+    exception when others then
+      null;  -- 不是合法 JSON 数组，按行拆分
+    end;
+  end if;
+  return array(
+    select btrim(x) from regexp_split_to_table(p_text, '\n') as x where btrim(x) <> ''
+  );
+end;
+$$;
+
+-- 4) 替换一篇论文的机构关联（内部函数）；同一 name_key 只保留第一次出现的位置
+create or replace function app._link_paper_affiliations(p_paper_id bigint, p_names text[])
+returns integer
+language plpgsql
+as $$
+declare
+  v_names text[];
+  v_keys text[];
+  v_positions integer[];
+  v_count integer;
+begin
+  delete from app.paper_affiliations where paper_id = p_paper_id;
+
+  select array_agg(s.name order by s.ord), array_agg(s.k order by s.ord), array_agg(s.ord::integer order by s.ord)
+  into v_names, v_keys, v_positions
+  from (
+    select distinct on (k) btrim(n.name) as name, k, n.ord
+    from unnest(coalesce(p_names, '{}')) with ordinality as n(name, ord)
+    cross join lateral app.affiliation_key(n.name) as k
+    where k is not null
+    order by k, n.ord
+  ) s;
+  if v_keys is null then
+    return 0;
+  end if;
+
+  insert into app.affiliations (name, name_key)
+  select * from unnest(v_names, v_keys)
+  on conflict (name_key) do nothing;
+
+  insert into app.paper_affiliations (paper_id, affiliation_id, position)
+  select p_paper_id, a.affiliation_id, least(u.position, 32767)
+  from unnest(v_keys, v_positions) as u(name_key, position)
+  join app.affiliations a on a.name_key = u.name_key;
+  get diagnostics v_count = row_count;
+  return v_count;
+end;
+$$;
+
+-- 5) 写入入口：更新展示用文本 + 关联表，返回关联的机构数；论文不存在时返回 0
+create or replace function app.set_paper_affiliations(p_paper_id bigint, p_affiliations text[])
+returns integer
+language plpgsql
+set search_path = app, public
+as $$
+declare
+  v_date date;
+begin
+  select update_date into v_date from app.paper_keys where paper_id = p_paper_id;
+  if not found then
+    return 0;
+  end if;
+  -- 带上分区键，只更新所在月份分区
+  update app.papers
+  set author_affiliation = to_jsonb(coalesce(p_affiliations, '{}'))::text
+  where paper_id = p_paper_id and update_date = v_date;
+  return app._link_paper_affiliations(p_paper_id, p_affiliations);
+end;
+$$;
+
+-- 6) 回填：把已有 author_affiliation 文本拆入关联表，返回处理的论文数；p_limit 为空表示全部
+create or replace function app.backfill_paper_affiliations(p_limit integer default null)
+returns integer
+language plpgsql
+set search_path = app, public
+as $$
+declare
+  r record;
+  v_done integer := 0;
+begin
+  for r in
+    select p.paper_id, p.author_affiliation
+    from app.papers p
+    where p.author_affiliation is not null
+      and btrim(p.author_affiliation) not in ('', '[]')
+      and not exists (select 1 from app.paper_affiliations pa where pa.paper_id = p.paper_id)
+    order by p.paper_id
+    limit p_limit
+  loop
+    perform app._link_paper_affiliations(r.paper_id, app.parse_affiliation_text(r.author_affiliation));
+    v_done := v_done + 1;
+  end loop;
+  return v_done;
+end;
+$$;
+
+-- 7) 按机构查论文：机构名整词匹配 → 关联表 → paper_keys 按日期过滤 → 回表取论文
+--    按 update_date、paper_id 倒序分页；affiliations 为该论文命中的机构规范名
+create or replace function app.papers_by_affiliation(
+  p_affiliation text,
+  p_date_from date default null,
+  p_date_to date default null,
+  p_offset integer default 0,
+  p_limit integer default 50
+)
+returns table (
+  paper_id bigint,
+  arxiv_id text,
+  title text,
+  authors text,
+  abstract text,
+  link text,
+  author_affiliation text,
+  update_date date,
+  affiliations text[]
+)
+language sql
+stable
+set search_path = app, public
+as $$
+  with matched as (
+    select a.affiliation_id, a.name
+    from app.affiliations a
+    where (' ' || a.name_key || ' ') like '% ' || app.affiliation_key(p_affiliation) || ' %'
+  ),
+  hits as (
+    select pk.paper_id, pk.update_date, array_agg(m.name order by pa.position) as affiliations
+    from matched m
+    join app.paper_affiliations pa on pa.affiliation_id = m.affiliation_id
+    join app.paper_keys pk on pk.paper_id = pa.paper_id
+    where pk.update_date >= coalesce(p_date_from, '-infinity'::date)
+      and pk.update_date <= coalesce(p_date_to, 'infinity'::date)
+    group by pk.paper_id, pk.update_date
+    order by pk.update_date desc, pk.paper_id desc
+    offset p_offset
+    limit p_limit
+  )
+  select p.paper_id, p.arxiv_id, p.title, p.authors, p.abstract, p.link, p.author_affiliation, p.update_date, h.affiliations
+  from hits h
+  join app.papers p on p.paper_id = h.paper_id and p.update_date = h.update_date
+  order by h.update_date desc, h.paper_id desc;
+$$;
+
+-- 8) 权限
+grant all privileges on app.affiliations, app.paper_affiliations to service_role;
+grant usage, select, update on sequence app.affiliations_affiliation_id_seq to service_role;
+grant execute on function app.set_paper_affiliations(bigint, text[]) to service_role;
+grant execute on function app.backfill_paper_affiliations(integer) to service_role;
+grant execute on function app.papers_by_affiliation(text, date, date, integer, integer) to service_role;
+
+-- 9) 回填已有数据
+select app.backfill_paper_affiliations();
+analyze app.affiliations;
+analyze app.paper_affiliations;
+
+notify pgrst, 'reload schema';
@@ -0,0 +1,42 @@
+-- 覆盖写入已有论文（导入 skip_if_exists=false）：一次请求按 jsonb 数组批量 update
+-- papers 按月分区后 BEFORE INSERT 触发器会跳过 base id 已登记的行（sql/018），upsert 无法覆盖已有论文，
+-- 这里按 paper_keys 定位 (paper_id, update_date) 更新；update_date 变化时行随之移动分区，
+-- paper_keys / analysis_results 的日期由 sql/018 的语句级触发器同步
+--
+-- p_rows: [{arxiv_id, title, authors, author_affiliation, abstract, link, update_date, update_time, primary_category}, ...]
+--   只覆盖对象中出现的键（未提供的字段如作者机构保持不变）；同一 base id 多次出现时以最后一个为准
+-- 返回被更新论文的 (arxiv_base_id, paper_id)；base id 尚未登记的行不处理，由调用方插入
+-- 通过 PostgREST RPC 调用：app_schema().rpc('overwrite_papers', {'p_rows': [...]})
+
+create or replace function app.overwrite_papers(p_rows jsonb)
+returns table (arxiv_base_id text, paper_id bigint)
+language sql
+set search_path = app, public
+as $$
+  with src as (
+    select distinct on (b.base) b.base, e.r
+    from jsonb_array_elements(p_rows) with ordinality as e(r, ord)
+    cross join lateral (select regexp_replace(e.r->>'arxiv_id', 'v[0-9]+$', '') as base) b
+    where e.r->>'arxiv_id' is not null
+    order by b.base, e.ord desc
+  )
+  update app.papers p
+  set arxiv_id = s.r->>'arxiv_id',
+      title = case when s.r ? 'title' then s.r->>'title' else p.title end,
+      authors = case when s.r ? 'authors' then s.r->>'authors' else p.authors end,
+      author_affiliation = case when s.r ? 'author_affiliation' then s.r->>'author_affiliation' else p.author_affiliation end,
+      abstract = case when s.r ? 'abstract' then s.r->>'abstract' else p.abstract end,
+      link = case when s.r ? 'link' then s.r->>'link' else p.link end,
+      update_date = case when s.r ? 'update_date' then (s.r->>'update_date')::date else p.update_date end,
+      update_time = case when s.r ? 'update_time' then (s.r->>'update_time')::time else p.update_time end,
+      primary_category = case when s.r ? 'primary_category' then s.r->>'primary_category' else p.primary_category end
+  from src s
+  join app.paper_keys k on k.arxiv_base_id = s.base
+  where p.paper_id = k.paper_id
+    and p.update_date = k.update_date
+  returning k.arxiv_base_id, p.paper_id;
+$$;
+
+grant execute on function app.overwrite_papers(jsonb) to service_role;
+
+notify pgrst, 'reload schema';